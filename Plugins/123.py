@@ -5,14 +5,20 @@ from typing import Optional, List, Dict, Any, Tuple
 from threading import Lock
 
 import requests
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.date import DateTrigger
+from fastapi.responses import PlainTextResponse
 
 from app.core.config import settings
 from app.log import logger
 from app.plugins import _PluginBase
 from app.utils.http import RequestUtils
 
+from .mteamapi import Hedger, request_not_sent, endpoint_health, GameDiff, Game, \
+    parse_games, BetDispatcher, clock_sync, BetHistoryStore, SnapshotStore, \
+    decode_json, game_list_client, game_feed, GameEvent, ADDED, ODDS_CHANGED, GameState, \
+    rate_limiter, BET, DeadlineRetry, async_engine, AsyncResponse, Account, parse_accounts, account_summary, \
+    bet_timer, metrics, PROMETHEUS_CONTENT_TYPE, BET_REQUEST_SECONDS, BET_DEADLINE_SLACK_SECONDS, \
+    BetTrace, tracing, trace_rows, trace_verdict, STARTED, SENT, ACKED
+
 
 class MTeamBetHelper(_PluginBase):
     # 插件元信息
@@ -30,20 +36,48 @@ class MTeamBetHelper(_PluginBase):
     _notify: bool = False
     _use_proxy: bool = True
     _onlyonce: bool = False
-    _scheduler: Optional[BackgroundScheduler] = None
+    _hedger: Optional[Hedger] = None
+    _dispatcher: Optional[BetDispatcher] = None
+    _history_store: Optional[BetHistoryStore] = None
+    _snapshot: Optional[SnapshotStore] = None
     _lock = Lock()
     
     # 配置参数
     _api_key: str = ""
+    # 多账号配置，每行一个账号：名称|API Key|下注金额|策略
+    _accounts_text: str = ""
     _auto_bet: bool = False
     _bet_seconds_before: int = 10
     _bet_amount: str = "100"
-    _main_api_url: str = "https://api.m-team.io"
-    _backup_api_url: str = "https://api.m-team.cc"
+    _pool_size: int = 4
+    _pool_idle_timeout: int = 60
+    _warmup_seconds: int = 5
+    _hedge_enabled: bool = False
+    _hedge_delay: float = 1.0
+    _adaptive_poll: bool = True
+    _poll_min_interval: int = 30
+    _poll_max_interval: int = 900
+    _poll_hourly_budget: int = 60
+    _sync_min_gap: int = 10
+    _rate_limit: float = 2.0
+    _rate_burst: int = 10
+    _async_engine: bool = False
+    _bet_batch_window_ms: int = 200
+    _bet_max_parallel: int = 4
+    _history_size: int = 200
+    _history_retention_days: int = 90
     
     # 数据存储
-    _bet_games: List[Dict] = []
-    _bet_history: List[Dict] = []
+    # 当前比赛状态，整体替换而不原地修改，页面读取时无需加锁
+    _state: GameState = GameState()
+    # 各比赛已安排的调度任务ID
+    _bet_jobs: Dict[str, List[str]] = {}
+    # 已安排的下注计划，按任务ID索引，随比赛快照一起落盘
+    _bet_plan: Dict[str, Dict] = {}
+    # 下注账号，各自使用独立的长连接池
+    _accounts: List[Account] = []
+    # 预热阶段构建好的下注请求，按账号与选项ID索引
+    _prepared_bets: Dict[str, requests.PreparedRequest] = {}
     
     def init_plugin(self, config: Optional[dict] = None):
         """初始化插件"""
@@ -53,24 +87,89 @@ class MTeamBetHelper(_PluginBase):
             self._use_proxy = config.get("use_proxy", True)
             self._onlyonce = config.get("onlyonce", False)
             self._api_key = config.get("api_key", "")
+            self._accounts_text = config.get("accounts", "")
             self._auto_bet = config.get("auto_bet", False)
             self._bet_seconds_before = int(config.get("bet_seconds_before", 10))
             self._bet_amount = config.get("bet_amount", "100")
+            self._pool_size = int(config.get("pool_size", 4))
+            self._pool_idle_timeout = int(config.get("pool_idle_timeout", 60))
+            self._warmup_seconds = int(config.get("warmup_seconds", 5))
+            self._hedge_enabled = config.get("hedge_enabled", False)
+            self._hedge_delay = float(config.get("hedge_delay", 1.0))
+            self._adaptive_poll = config.get("adaptive_poll", True)
+            self._poll_min_interval = int(config.get("poll_min_interval", 30))
+            self._poll_max_interval = int(config.get("poll_max_interval", 900))
+            self._poll_hourly_budget = int(config.get("poll_hourly_budget", 60))
+            self._sync_min_gap = int(config.get("sync_min_gap", 10))
+            self._rate_limit = float(config.get("rate_limit", 2.0))
+            self._rate_burst = int(config.get("rate_burst", 10))
+            self._async_engine = config.get("async_engine", False)
+            self._bet_batch_window_ms = int(config.get("bet_batch_window_ms", 200))
+            self._bet_max_parallel = int(config.get("bet_max_parallel", 4))
+            self._history_size = int(config.get("history_size", 200))
+            self._history_retention_days = int(config.get("history_retention_days", 90))
+            
+        # 下注历史写入数据目录下的SQLite，页面只读取内存中的最近记录
+        if self._history_store:
+            self._history_store.close()
+        try:
+            self._history_store = BetHistoryStore(self.get_data_path() / "bet_history.db",
+                                                  ring_size=self._history_size,
+                                                  retention_days=self._history_retention_days)
+        except Exception as e:
+            self._history_store = None
+            logger.error(f"打开下注历史存储失败: {str(e)}")
             
         if self._enabled:
-            # 启动定时任务调度器
-            if not self._scheduler:
-                self._scheduler = BackgroundScheduler(timezone=settings.TZ)
-                self._scheduler.start()
+            endpoint_health.configure(proxies=self._get_proxies())
+            rate_limiter.configure(rate=self._rate_limit, burst=self._rate_burst)
+            
+            # 每个账号按API地址复用独立的长连接，配置变更时重建
+            for account in self._accounts:
+                account.close()
+            self._accounts = parse_accounts(self._accounts_text, self._api_key, self._bet_amount,
+                                            pool_size=self._pool_size, idle_timeout=self._pool_idle_timeout)
+            self._hedger = Hedger(delay=self._hedge_delay) if self._hedge_enabled else None
+            
+            # 异步引擎：下注与预热以协程在共享的事件循环线程上执行
+            if self._async_engine and not async_engine.use(self.__class__.__name__):
+                logger.warning("未安装 aiohttp，异步引擎不可用，继续使用线程执行下注")
+                self._async_engine = False
+            if not self._async_engine:
+                async_engine.release(self.__class__.__name__)
+                
+            # 同一时刻截止的比赛合并为一批并发下注
+            if self._dispatcher:
+                self._dispatcher.close()
+            self._dispatcher = BetDispatcher(
+                schedule=lambda job_id, func, run_date: bet_timer.add(self.__timer_id(job_id), run_date, func),
+                unschedule=lambda job_id: bet_timer.cancel(self.__timer_id(job_id)),
+                window=self._bet_batch_window_ms / 1000,
+                # 每个账号的连接池最多同时使用 pool_size 个连接，更高的并发只会排队等待连接
+                max_parallel=min(self._bet_max_parallel, self._pool_size * max(len(self._accounts), 1))
+            )
+                
+            # 从上次保存的快照恢复比赛列表与下注计划，无需等待首次同步
+            self._snapshot = SnapshotStore(self.get_data_path() / "snapshot.json")
+            self.__restore_snapshot()
+                
+            # 订阅共享的比赛事件源，只处理新增、变化与消失的比赛；
+            # 自适应轮询由事件源按最近的截止时间统一安排，关闭时由定时服务驱动轮询
+            game_feed.subscribe(
+                self.__class__.__name__, self.__on_game_events,
+                api_key=self._api_key or (self._accounts[0].api_key if self._accounts else ""),
+                proxies=self._get_proxies(),
+                auto_poll=self._adaptive_poll,
+                min_interval=self._poll_min_interval,
+                max_interval=self._poll_max_interval,
+                hourly_budget=self._poll_hourly_budget,
+                hedger=self._hedger,
+                replay=True
+            )
                 
             # 如果启用了立即运行一次
             if self._onlyonce:
-                self._scheduler.add_job(
-                    func=self.__sync_bet_games,
-                    trigger='date',
-                    run_date=datetime.now() + timedelta(seconds=3),
-                    name="M-Team菠菜比赛同步"
-                )
+                bet_timer.add(self.__timer_id("sync"), datetime.now() + timedelta(seconds=3), self.__sync_bet_games)
                 # 重置一次性运行状态
                 self._onlyonce = False
                 self.update_config({
@@ -79,238 +178,592 @@ class MTeamBetHelper(_PluginBase):
                     "notify": self._notify,
                     "use_proxy": self._use_proxy,
                     "api_key": self._api_key,
+                    "accounts": self._accounts_text,
                     "auto_bet": self._auto_bet,
                     "bet_seconds_before": self._bet_seconds_before,
-                    "bet_amount": self._bet_amount
+                    "bet_amount": self._bet_amount,
+                    "pool_size": self._pool_size,
+                    "pool_idle_timeout": self._pool_idle_timeout,
+                    "warmup_seconds": self._warmup_seconds,
+                    "hedge_enabled": self._hedge_enabled,
+                    "hedge_delay": self._hedge_delay,
+                    "adaptive_poll": self._adaptive_poll,
+                    "poll_min_interval": self._poll_min_interval,
+                    "poll_max_interval": self._poll_max_interval,
+                    "poll_hourly_budget": self._poll_hourly_budget,
+                    "sync_min_gap": self._sync_min_gap,
+                    "rate_limit": self._rate_limit,
+                    "rate_burst": self._rate_burst,
+                    "async_engine": self._async_engine,
+                    "bet_batch_window_ms": self._bet_batch_window_ms,
+                    "bet_max_parallel": self._bet_max_parallel,
+                    "history_size": self._history_size,
+                    "history_retention_days": self._history_retention_days
                 })
                 
             logger.info("M-Team菠菜助手插件已启动")
             
     def __sync_bet_games(self):
-        """同步比赛数据"""
-        try:
-            with self._lock:
-                logger.info("开始同步M-Team菠菜比赛数据...")
-                
-                # 获取比赛列表
-                games = self.__get_live_games()
-                if not games:
-                    logger.warning("未获取到比赛数据")
-                    return
-                    
-                self._bet_games = games
-                logger.info(f"成功获取到 {len(games)} 场比赛")
-                
-                # 如果启用了自动下注，为每场比赛安排下注任务
-                if self._auto_bet:
-                    self.__schedule_auto_bets(games)
-                    
-                # 发送通知
-                if self._notify:
-                    self.post_message(
-                        mtype="info",
-                        title="M-Team菠菜助手",
-                        text=f"成功同步 {len(games)} 场比赛数据"
-                    )
-                    
-        except Exception as e:
-            logger.error(f"同步比赛数据失败: {str(e)}")
+        """立即同步比赛数据，变化通过比赛事件回调处理"""
+        logger.info("开始同步M-Team菠菜比赛数据...")
+        # 同步进行中时并入当前同步，距上次实际请求不足最小间隔时直接复用上次结果
+        if game_feed.poll(max_age=self._sync_min_gap) is None:
+            logger.warning("未获取到比赛数据")
             if self._notify:
                 self.post_message(
                     mtype="error",
                     title="M-Team菠菜助手",
-                    text=f"同步比赛数据失败: {str(e)}"
+                    text="同步比赛数据失败"
                 )
                 
-    def __get_live_games(self) -> List[Dict]:
-        """获取LIVE比赛列表"""
+    def __on_game_events(self, events: List[GameEvent]):
+        """处理比赛事件：为新增和变更的比赛调整下注任务，并取消已消失比赛的任务"""
         try:
-            # 首先尝试主API
-            api_url = self._main_api_url
-            games = self.__fetch_games_from_api(api_url)
+            # 在锁外计算差异，锁只保护状态替换
+            state = self._state
+            games = game_feed.games
+            current = {game.id: game for game in games}
+            # 同一批事件可能跨越多次轮询，以事件源的最新比赛为准
+            touched = {event.game.id for event in events if event.kind in (ADDED, ODDS_CHANGED)}
+            diff = GameDiff()
+            for game_id in touched:
+                game = current.get(game_id)
+                if not game:
+                    continue
+                previous = state.by_id.get(game_id)
+                if previous is None:
+                    diff.added.append(game)
+                elif previous.digest != game.digest:
+                    diff.changed.append(game)
+            # 快照恢复的比赛若已不在列表中同样视为消失
+            diff.removed = [game for game_id, game in state.by_id.items() if game_id not in current]
+            diff.unchanged = len(current) - len(diff.added) - len(diff.changed)
+            with self._lock:
+                self._state = self._state.evolve(games, diff)
+            if not (diff.added or diff.changed or diff.removed):
+                return
+            logger.info(f"比赛列表更新：共 {len(current)} 场比赛，{diff.summary()}")
             
-            if not games:
-                # 如果主API失败，尝试备用API
-                logger.warning("主API获取失败，尝试备用API")
-                api_url = self._backup_api_url
-                games = self.__fetch_games_from_api(api_url)
+            if self._auto_bet:
+                self.__cancel_auto_bets(diff.removed + diff.changed)
+                self.__schedule_auto_bets(diff.added + diff.changed)
+            self.__save_snapshot()
                 
-            return games if games else []
-            
-        except Exception as e:
-            logger.error(f"获取比赛列表失败: {str(e)}")
-            return []
-            
-    def __fetch_games_from_api(self, api_url: str) -> Optional[List[Dict]]:
-        """从指定API获取比赛数据"""
-        try:
-            url = f"{api_url}/api/bet/findBetgameList"
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "x-api-key": self._api_key
-            }
-            data = {
-                "active": "LIVE",
-                "fix": 0
-            }
-            
-            response = RequestUtils(
-                proxies=self._get_proxies() if self._use_proxy else None,
-                timeout=30
-            ).post(url, headers=headers, data=data)
-            
-            if response and response.status_code == 200:
-                result = response.json()
-                if result.get("success"):
-                    return result.get("data", [])
-                else:
-                    logger.error(f"API返回错误: {result.get('message', 'Unknown error')}")
-            else:
-                logger.error(f"API请求失败，状态码: {response.status_code if response else 'None'}")
+            # 发送通知
+            if self._notify:
+                self.post_message(
+                    mtype="info",
+                    title="M-Team菠菜助手",
+                    text=f"比赛列表已更新：共 {len(current)} 场比赛，{diff.summary()}"
+                )
                 
         except Exception as e:
-            logger.error(f"请求API失败: {str(e)}")
-            
-        return None
-        
-    def __schedule_auto_bets(self, games: List[Dict]):
+            logger.error(f"处理比赛事件失败: {str(e)}")
+                
+    def __schedule_auto_bets(self, games: List[Game]):
         """为比赛安排自动下注任务"""
         if not games:
             return
             
         for game in games:
             try:
-                # 解析比赛截止时间
-                end_time_str = game.get("endTime")
-                if not end_time_str:
+                if not game.deadline:
                     continue
                     
-                # 假设时间格式为ISO格式或时间戳
-                if isinstance(end_time_str, str):
-                    end_time = datetime.fromisoformat(end_time_str.replace('Z', '+00:00'))
-                else:
-                    end_time = datetime.fromtimestamp(end_time_str)
-                    
-                # 计算下注时间（比赛截止前N秒）
+                # 截止时间按服务器时钟给出，换算为本地时间后计算下注时间（比赛截止前N秒）
+                end_time = datetime.fromtimestamp(clock_sync.to_local(game.deadline))
                 bet_time = end_time - timedelta(seconds=self._bet_seconds_before)
                 
                 # 如果下注时间已过，跳过
                 if bet_time <= datetime.now():
                     continue
                     
-                # 获取投注选项（这里需要根据实际数据结构调整）
-                bet_options = game.get("betOptions", [])
-                if not bet_options:
-                    continue
-                    
-                # 选择第一个投注选项（可以根据策略调整）
-                opt_id = bet_options[0].get("id")
-                if not opt_id:
-                    continue
-                    
-                # 添加定时下注任务
-                job_id = f"auto_bet_{game.get('id')}_{opt_id}"
-                self._scheduler.add_job(
-                    func=self.__auto_bet,
-                    trigger=DateTrigger(run_date=bet_time),
-                    args=[opt_id, self._bet_amount],
-                    id=job_id,
-                    name=f"自动下注-{game.get('name', 'Unknown')}",
-                    replace_existing=True
-                )
-                
-                logger.info(f"已安排自动下注任务: {game.get('name')} 在 {bet_time}")
+                # 每个账号按各自的策略选择投注选项，同一场比赛的下注在同一时刻并发发出
+                for account in self._accounts:
+                    option = account.choose(game)
+                    if not option:
+                        continue
+                    self.__plan_bet({
+                        "job_id": f"auto_bet_{game.id}_{account.name}_{option.id}",
+                        "game_id": game.id,
+                        "name": game.heading or "Unknown",
+                        "account": account.name,
+                        "opt_id": option.id,
+                        "bonus": account.bonus,
+                        "fire_time": bet_time.timestamp(),
+                        "scheduled_at": time.time()
+                    })
+                logger.info(f"已为 {len(self._accounts)} 个账号安排自动下注任务: {game.heading} 在 {bet_time}")
                 
             except Exception as e:
                 logger.error(f"安排自动下注任务失败: {str(e)}")
                 
-    def __auto_bet(self, opt_id: str, bonus: str):
-        """执行自动下注"""
+    def __plan_bet(self, entry: Dict):
+        """按下注计划安排下注及预热任务"""
+        job_id = entry["job_id"]
+        game_id = entry["game_id"]
+        bet_time = datetime.fromtimestamp(entry["fire_time"])
+        
+        # 交由下注调度器安排，同一时刻截止的比赛合并为一批
+        self._dispatcher.submit(job_id, bet_time, self.__auto_bet, entry["opt_id"], entry["bonus"], game_id,
+                                entry.get("account"),
+                                BetTrace(planned=entry["fire_time"], scheduled=entry.get("scheduled_at")))
+        
+        # 下注前提前预热连接并构建请求，同一场比赛的各账号共用一个预热任务
+        warmup_time = bet_time - timedelta(seconds=self._warmup_seconds)
+        jobs = self._bet_jobs.setdefault(game_id, [])
+        if self._warmup_seconds > 0 and warmup_time > datetime.now():
+            warmup_id = f"warmup_{game_id}"
+            bet_timer.add(self.__timer_id(warmup_id), warmup_time, self.__warm_up_bets, game_id)
+            if warmup_id not in jobs:
+                jobs.append(warmup_id)
+        jobs.append(job_id)
+        self._bet_plan[job_id] = entry
+        
+    def __save_snapshot(self):
+        """保存比赛快照与下注计划"""
+        if not self._snapshot:
+            return
         try:
-            logger.info(f"开始执行自动下注: 选项ID={opt_id}, 金额={bonus}")
-            
-            # 首先尝试主API
-            api_url = self._main_api_url
-            success = self.__place_bet(api_url, opt_id, bonus)
+            self._snapshot.save([game.raw for game in self._state.games], list(self._bet_plan.values()), meta={
+                "auto_bet": self._auto_bet,
+                "bet_seconds_before": self._bet_seconds_before,
+                "bet_amount": self._bet_amount,
+                "accounts": [account.signature() for account in self._accounts]
+            })
+        except Exception as e:
+            logger.error(f"保存比赛快照失败: {str(e)}")
             
-            if not success:
-                # 如果主API失败，尝试备用API
-                logger.warning("主API下注失败，尝试备用API")
-                api_url = self._backup_api_url
-                success = self.__place_bet(api_url, opt_id, bonus)
+    def __restore_snapshot(self):
+        """从快照恢复比赛列表与下注计划，已过触发时间的计划直接丢弃"""
+        raw_games, plan, meta = self._snapshot.load()
+        games = parse_games(raw_games)
+        self._bet_jobs = {}
+        self._bet_plan = {}
+        if not games:
+            return
+        with self._lock:
+            self._state = self._state.evolve(games)
+        if self._auto_bet:
+            if meta.get("auto_bet") \
+                    and meta.get("bet_seconds_before") == self._bet_seconds_before \
+                    and meta.get("bet_amount") == self._bet_amount \
+                    and meta.get("accounts") == [account.signature() for account in self._accounts]:
+                for entry in plan:
+                    try:
+                        self.__plan_bet(entry)
+                    except Exception as e:
+                        logger.error(f"恢复下注计划失败: {str(e)}")
+                # 没有下注计划的比赛同样安排，恢复的比赛不会再作为新增比赛处理
+                self.__schedule_auto_bets([game for game in games if game.id not in self._bet_jobs])
+            else:
+                # 下注配置已变更，按快照中的比赛重新生成计划
+                self.__schedule_auto_bets(games)
+        logger.info(f"已从快照恢复 {len(games)} 场比赛、{len(self._bet_plan)} 个下注计划")
+        
+    def __cancel_auto_bets(self, games: List[Game]):
+        """取消比赛已安排的下注任务"""
+        for game in games:
+            for job_id in self._bet_jobs.pop(game.id, []):
+                self._bet_plan.pop(job_id, None)
+                if self._dispatcher and self._dispatcher.cancel(job_id):
+                    continue
+                # 预热任务；已执行或已被移除时忽略
+                bet_timer.cancel(self.__timer_id(job_id))
                 
-            # 记录下注历史
-            bet_record = {
-                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                "opt_id": opt_id,
-                "bonus": bonus,
-                "success": success,
-                "api_url": api_url
-            }
-            self._bet_history.append(bet_record)
+    def __timer_id(self, job_id: str) -> str:
+        """共享定时器中的任务ID，以插件类名为前缀区分各插件的任务"""
+        return f"{self.__class__.__name__}_{job_id}"
+                    
+    def __warm_up_bets(self, game_id: str):
+        """
+        下注预热：在各账号的连接池中建立到主API的连接并预先构建该场比赛的下注请求；
+        预热窗口内已预热过的账号与地址不再重复请求，多场比赛先后截止时不会集中消耗限速额度
+        """
+        try:
+            api_url = endpoint_health.best()
+            if self._async_engine:
+                # 异步下注使用引擎会话中的连接，预构建的请求不适用
+                async_engine.submit(async_engine.warm_up(api_url, proxies=self._get_proxies(),
+                                                         max_age=self._warmup_seconds))
+                return
+            for job_id in list(self._bet_jobs.get(game_id, [])):
+                entry = self._bet_plan.get(job_id)
+                account = self.__account(entry.get("account")) if entry else None
+                if not account:
+                    continue
+                if not account.pool.warm_up(api_url, proxies=self._get_proxies(), max_age=self._warmup_seconds):
+                    logger.warning(f"下注预热连接失败: {account.name} {api_url}")
+                self._prepared_bets[f"{account.name}:{entry['opt_id']}"] = account.pool.prepare(
+                    api_url,
+                    url=f"{api_url}/api/bet/betgameOdds",
+                    headers=account.headers,
+                    data={"optId": entry["opt_id"], "bonus": entry["bonus"]}
+                )
+                logger.debug(f"下注预热完成: 账号={account.name}, 选项ID={entry['opt_id']}")
+        except Exception as e:
+            logger.error(f"下注预热失败: {str(e)}")
             
-            # 发送通知
-            if self._notify:
-                status = "成功" if success else "失败"
-                self.post_message(
-                    mtype="success" if success else "error",
-                    title="M-Team菠菜助手",
-                    text=f"自动下注{status}: 选项ID={opt_id}, 金额={bonus}"
+    def __account(self, name: Optional[str]) -> Optional[Account]:
+        """按名称查找下注账号，未指定时（旧版本的下注计划）使用第一个账号"""
+        if not name:
+            return self._accounts[0] if self._accounts else None
+        for account in self._accounts:
+            if account.name == name:
+                return account
+        return None
+        
+    def __auto_bet(self, opt_id: str, bonus: str, game_id: Optional[str] = None,
+                   account_name: Optional[str] = None, trace: Optional[BetTrace] = None):
+        """执行自动下注，启用异步引擎时交由事件循环执行并返回Future"""
+        trace = trace or BetTrace()
+        trace.mark(STARTED)
+        account = self.__account(account_name)
+        if not account:
+            logger.warning(f"下注账号 {account_name} 已被移除，跳过下注: 选项ID={opt_id}")
+            return
+        if self._async_engine and async_engine.running:
+            return async_engine.submit(self.__auto_bet_async(account, opt_id, bonus, game_id, trace))
+        try:
+            logger.info(f"开始执行自动下注: 账号={account.name}, 选项ID={opt_id}, 金额={bonus}")
+            main_url, backup_url = self.__api_urls()
+            # 所有尝试共用截止前的剩余时间
+            retry = self.__bet_retry(game_id)
+            
+            if self._hedger:
+                # 对冲模式：仅在主API连接未建立、下注请求确认未发出时改发备用API，避免重复下注
+                success, index = self._hedger.failover_unsent(
+                    "bet",
+                    lambda ct: self.__place_bet(account, main_url, opt_id, bonus, retry, trace, connect_timeout=ct),
+                    lambda ct: self.__place_bet(account, backup_url, opt_id, bonus, retry, trace, connect_timeout=ct)
                 )
+                api_url = backup_url if index == 1 else main_url
+            else:
+                # 首先尝试主API，仅在请求确认未发出时改发备用API；
+                # 连接中断或5xx时服务端可能已受理，改发会重复下注
+                api_url = main_url
+                try:
+                    success = self.__place_bet(account, api_url, opt_id, bonus, retry, trace, raise_unsent=True)
+                    failover = False
+                except Exception:
+                    success, failover = False, True
+                
+                if failover and retry.timeout():
+                    # 如果主API请求未发出且仍有时间，尝试备用API
+                    logger.warning("主API下注请求未发出，尝试备用API")
+                    api_url = backup_url
+                    success = self.__place_bet(account, api_url, opt_id, bonus, retry, trace)
+                
+            self.__finish_bet(account, opt_id, bonus, game_id, success, api_url, retry.attempts, trace)
                 
         except Exception as e:
-            logger.error(f"执行自动下注失败: {str(e)}")
-            if self._notify:
-                self.post_message(
-                    mtype="error",
-                    title="M-Team菠菜助手",
-                    text=f"自动下注失败: {str(e)}"
+            self.__bet_failed(e)
+            
+    async def __auto_bet_async(self, account: Account, opt_id: str, bonus: str, game_id: Optional[str] = None,
+                               trace: Optional[BetTrace] = None):
+        """协程版本的自动下注，失败处理与线程版本一致，写历史与发通知放到线程池中执行"""
+        try:
+            logger.info(f"开始执行自动下注: 账号={account.name}, 选项ID={opt_id}, 金额={bonus}")
+            main_url, backup_url = self.__api_urls()
+            retry = self.__bet_retry(game_id)
+            # 预热阶段构建的请求只用于线程模式
+            self._prepared_bets.pop(f"{account.name}:{opt_id}", None)
+            
+            api_url = main_url
+            try:
+                # 对冲模式下主API以对冲延迟作为连接超时，只尝试一次
+                success = await self.__place_bet_async(
+                    account, main_url, opt_id, bonus, retry, trace,
+                    connect_timeout=self._hedge_delay if self._hedger else None, raise_unsent=True
                 )
+                failover = False
+            except Exception:
+                # 主API请求确认未发出，改发备用API不会重复下注
+                success, failover = False, True
+            if failover and retry.timeout():
+                logger.warning("主API下注请求未发出，尝试备用API")
+                api_url = backup_url
+                success = await self.__place_bet_async(account, api_url, opt_id, bonus, retry, trace)
                 
-    def __place_bet(self, api_url: str, opt_id: str, bonus: str) -> bool:
-        """发送下注请求"""
-        try:
-            url = f"{api_url}/api/bet/betgameOdds"
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "x-api-key": self._api_key
-            }
-            data = {
-                "optId": opt_id,
-                "bonus": bonus
-            }
+            await async_engine.offload(self.__finish_bet, account, opt_id, bonus, game_id, success, api_url,
+                                       retry.attempts, trace)
             
-            response = RequestUtils(
-                proxies=self._get_proxies() if self._use_proxy else None,
-                timeout=30
-            ).post(url, headers=headers, data=data)
+        except Exception as e:
+            await async_engine.offload(self.__bet_failed, e)
             
-            if response and response.status_code == 200:
-                result = response.json()
-                if result.get("success"):
-                    logger.info(f"下注成功: {result}")
-                    return True
-                else:
-                    logger.error(f"下注失败: {result.get('message', 'Unknown error')}")
-            else:
-                logger.error(f"下注请求失败，状态码: {response.status_code if response else 'None'}")
-                
+    def __finish_bet(self, account: Account, opt_id: str, bonus: str, game_id: Optional[str], success: bool,
+                     api_url: str, attempts: int, trace: Optional[BetTrace] = None):
+        """按账号记录下注历史（含下注时间线）并发送通知"""
+        game = self._state.by_id.get(str(game_id)) if game_id else None
+        if success and game and game.deadline:
+            # 下注确认时距比赛截止还剩的时间，用于调整提前下注秒数
+            metrics.observe(BET_DEADLINE_SLACK_SECONDS, clock_sync.to_local(game.deadline) - time.time())
+        bet_record = {
+            "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "account": account.name,
+            "game_id": game_id,
+            "opt_id": opt_id,
+            "bonus": bonus,
+            "success": success,
+            "api_url": api_url,
+            "attempts": attempts,
+            "trace": trace.to_dict() if trace else None
+        }
+        if self._history_store:
+            self._history_store.add(bet_record)
+        
+        # 发送通知
+        if self._notify:
+            status = "成功" if success else "失败"
+            self.post_message(
+                mtype="success" if success else "error",
+                title="M-Team菠菜助手",
+                text=f"自动下注{status}: 账号={account.name}, 选项ID={opt_id}, 金额={bonus}"
+            )
+            
+    def __bet_failed(self, e: Exception):
+        logger.error(f"执行自动下注失败: {str(e)}")
+        if self._notify:
+            self.post_message(
+                mtype="error",
+                title="M-Team菠菜助手",
+                text=f"自动下注失败: {str(e)}"
+            )
+            
+    def __bet_retry(self, game_id: Optional[str]) -> DeadlineRetry:
+        """按比赛截止时间建立下注预算，找不到比赛时沿用30秒"""
+        game = self._state.by_id.get(str(game_id)) if game_id else None
+        if game and game.deadline:
+            return DeadlineRetry(clock_sync.to_local(game.deadline))
+        return DeadlineRetry.within(30)
+        
+    def __place_bet(self, account: Account, api_url: str, opt_id: str, bonus: str, retry: DeadlineRetry,
+                    trace: BetTrace, connect_timeout: Optional[float] = None, raise_unsent: bool = False) -> bool:
+        """
+        发送下注请求，超时取自截止前的剩余时间，请求确认未发出时在预算内带抖动重试；
+        指定连接超时时（对冲主API）只尝试一次；指定连接超时或 raise_unsent 时，请求确认未发出则抛出异常，
+        交由调用方改发备用API
+        """
+        url = f"{api_url}/api/bet/betgameOdds"
+        # 优先使用预热阶段构建好的请求，直接写入已建立的连接
+        prepared = self._prepared_bets.pop(f"{account.name}:{opt_id}", None)
+        if not (prepared and prepared.url == url):
+            prepared = None
+        try:
+            response = retry.run(
+                lambda timeout: self.__send_bet(account, api_url, url, opt_id, bonus, prepared, timeout, trace),
+                max_attempts=1 if connect_timeout else None,
+                connect_timeout=connect_timeout
+            )
+            success = self.__bet_result(response)
+            trace.mark(ACKED)
+            return success
         except Exception as e:
+            if (connect_timeout or raise_unsent) and request_not_sent(e):
+                logger.warning(f"下注请求未能建立连接: {api_url}")
+                raise
             logger.error(f"发送下注请求失败: {str(e)}")
+            metrics.record_bet(False, type(e).__name__)
             
         return False
         
+    async def __place_bet_async(self, account: Account, api_url: str, opt_id: str, bonus: str,
+                                retry: DeadlineRetry, trace: BetTrace,
+                                connect_timeout: Optional[float] = None, raise_unsent: bool = False) -> bool:
+        """__place_bet 的协程版本，通过异步引擎发送"""
+        try:
+            response = await retry.run_async(
+                lambda timeout: self.__send_bet_async(account, api_url, opt_id, bonus, timeout, trace),
+                max_attempts=1 if connect_timeout else None,
+                connect_timeout=connect_timeout
+            )
+            success = self.__bet_result(response)
+            trace.mark(ACKED)
+            return success
+        except Exception as e:
+            if (connect_timeout or raise_unsent) and request_not_sent(e):
+                logger.warning(f"下注请求未能建立连接: {api_url}")
+                raise
+            logger.error(f"发送下注请求失败: {str(e)}")
+            metrics.record_bet(False, type(e).__name__)
+            
+        return False
+        
+    @staticmethod
+    def __bet_result(response) -> bool:
+        """解析下注响应"""
+        if response.status_code == 200:
+            result = decode_json(response)
+            if result.get("success") or str(result.get("code")) == "0":
+                logger.info(f"下注成功: {result}")
+                metrics.record_bet(True)
+                return True
+            else:
+                logger.error(f"下注失败: {result.get('message', 'Unknown error')}")
+                metrics.record_bet(False, result.get("message"))
+        else:
+            logger.error(f"下注请求失败，状态码: {response.status_code}")
+            metrics.record_bet(False, f"HTTP {response.status_code}")
+        return False
+        
+    def __send_bet(self, account: Account, api_url: str, url: str, opt_id: str, bonus: str,
+                   prepared: Optional[requests.PreparedRequest], timeout: Tuple[float, float],
+                   trace: BetTrace) -> requests.Response:
+        """
+        单次下注请求，通过账号自己的连接池发送，失败时抛出异常；
+        取得连接、发出请求与收到响应的时刻由连接池记录，建连耗时计入准备阶段
+        """
+        trace.attempt(api_url)
+        # 下注优先级最高且超时已按截止时间算好，限速时不等待，直接发送
+        if not rate_limiter.acquire(BET, timeout=0, force=True):
+            logger.warning("下注请求超出API限速，仍然发送")
+        start = time.monotonic()
+        try:
+            session = account.pool.get(api_url)
+            # 连接池无法记录时（如SOCKS代理）以此为发出时间，不记录取得连接
+            trace.mark(SENT)
+            with tracing(trace):
+                if prepared:
+                    response = session.send(prepared, proxies=self._get_proxies(), timeout=timeout)
+                else:
+                    response = RequestUtils(
+                        proxies=self._get_proxies() if self._use_proxy else None,
+                        session=session,
+                        timeout=timeout
+                    ).post(url, headers=account.headers, data={"optId": opt_id, "bonus": bonus},
+                           raise_exception=True)
+        except Exception:
+            endpoint_health.record(api_url, time.monotonic() - start, False)
+            raise
+        if response is None:
+            endpoint_health.record(api_url, time.monotonic() - start, False)
+            raise requests.exceptions.RequestException("下注请求无响应")
+        trace.received(response)
+        elapsed = time.monotonic() - start
+        endpoint_health.record(api_url, elapsed, response.status_code < 500)
+        metrics.observe(BET_REQUEST_SECONDS, elapsed, endpoint=api_url)
+        return response
+        
+    async def __send_bet_async(self, account: Account, api_url: str, opt_id: str, bonus: str,
+                               timeout: Tuple[float, float], trace: BetTrace) -> AsyncResponse:
+        """单次异步下注请求，限速器不可在事件循环中等待，令牌不足时直接发送"""
+        trace.attempt(api_url)
+        if not rate_limiter.acquire(BET, timeout=0, force=True):
+            logger.warning("下注请求超出API限速，仍然发送")
+        start = time.monotonic()
+        response = await async_engine.post(api_url, "/api/bet/betgameOdds", headers=account.headers,
+                                           data={"optId": opt_id, "bonus": bonus},
+                                           proxies=self._get_proxies(), timeout=timeout, trace=trace)
+        metrics.observe(BET_REQUEST_SECONDS, time.monotonic() - start, endpoint=api_url)
+        return response
+        
     def _get_proxies(self):
         """获取代理设置"""
         return settings.PROXY if self._use_proxy else None
         
+    @staticmethod
+    def __api_urls() -> Tuple[str, str]:
+        """按延迟与错误率排序，返回当前最优的主用与备用API"""
+        urls = endpoint_health.ordered()
+        return urls[0], urls[-1]
+        
+    def __health_summary(self) -> str:
+        """API健康状态摘要"""
+        parts = []
+        for stat in endpoint_health.snapshot():
+            state = "熔断" if stat["open"] else "正常"
+            latency = f"{stat['latency_ms']}ms" if stat["latency_ms"] is not None else "-"
+            parts.append(f"{stat['url']} {state} 延迟{latency} 错误率{stat['error_rate'] * 100:.0f}%")
+        return "；".join(parts)
+        
+    def __hedge_summary(self) -> str:
+        """对冲请求统计摘要"""
+        if not self._hedger:
+            return "对冲请求未启用"
+        names = {"poll": "比赛列表", "bet": "下注"}
+        parts = []
+        for kind, stat in self._hedger.stats().items():
+            rate = stat["won"] / stat["hedged"] * 100 if stat["hedged"] else 0
+            parts.append(f"{names.get(kind, kind)}: 共{stat['total']}次，触发备用{stat['hedged']}次，"
+                         f"备用胜出{stat['won']}次（{rate:.0f}%）")
+        return "；".join(parts) or "暂无对冲请求"
+        
+    def __dispatch_summary(self) -> str:
+        """批量下注统计摘要"""
+        if not self._dispatcher:
+            return "下注调度未启动"
+        stats = self._dispatcher.stats()
+        text = f"待下注 {self._dispatcher.pending} 笔，已执行 {len(stats)} 批；{self._dispatcher.summary()}"
+        if stats:
+            last = stats[-1]
+            text += (f"；最近一批 {last['size']} 笔，触发延迟 {last['lateness_ms']}ms，"
+                     f"整批耗时 {last['elapsed_ms']}ms（逐笔合计 {last['total_ms']}ms）")
+        return text
+        
     def refresh_bet_games(self):
         """手动刷新比赛列表"""
         self.__sync_bet_games()
         
+    @staticmethod
+    def __trace_panel(record: Dict[str, Any]) -> dict:
+        """单笔下注的时间线面板：标题给出结果与最慢的环节，展开后列出各阶段"""
+        trace = record.get('trace') or {}
+        status = '成功' if record.get('success') else '失败'
+        return {
+            'component': 'VExpansionPanel',
+            'content': [
+                {
+                    'component': 'VExpansionPanelTitle',
+                    'text': f"{record.get('time')} {record.get('account') or ''} 选项{record.get('opt_id')} "
+                            f"{status}，{trace_verdict(trace)}"
+                },
+                {
+                    'component': 'VExpansionPanelText',
+                    'content': [
+                        {
+                            'component': 'VDataTable',
+                            'props': {
+                                'headers': [
+                                    {'title': '阶段', 'key': 'stage'},
+                                    {'title': '时刻', 'key': 'time'},
+                                    {'title': '相对计划(ms)', 'key': 'offset_ms'},
+                                    {'title': '阶段耗时(ms)', 'key': 'delta_ms'}
+                                ],
+                                'items': trace_rows(trace),
+                                'density': 'compact',
+                                'hide-default-footer': True
+                            }
+                        },
+                        {
+                            'component': 'div',
+                            'props': {
+                                'class': 'text-caption mt-2'
+                            },
+                            'text': f"API地址：{trace.get('endpoint') or '-'}，尝试 {trace.get('attempts', 0)} 次"
+                        }
+                    ]
+                }
+            ]
+        }
+        
+    def get_api(self) -> List[Dict[str, Any]]:
+        """注册插件API，以 Prometheus 文本格式导出请求延迟、定时器延迟与截止余量等指标"""
+        return [{
+            "path": "/metrics",
+            "endpoint": self.__metrics,
+            "methods": ["GET"],
+            "summary": "M-Team菠菜指标",
+            "description": "Prometheus 文本格式的列表请求、下注请求、定时器延迟、截止余量与下注结果指标"
+        }]
+        
+    @staticmethod
+    def __metrics() -> PlainTextResponse:
+        """导出指标"""
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
+        
     def get_service(self) -> List[Dict[str, Any]]:
-        """注册定时任务服务"""
-        if self._enabled:
+        """注册定时任务服务，自适应轮询时由比赛事件源安排同步"""
+        if self._enabled and not self._adaptive_poll:
             return [{
                 "id": "MTeamBetSync",
                 "name": "M-Team菠菜比赛同步",
@@ -375,6 +828,17 @@ class MTeamBetHelper(_PluginBase):
                     'type': 'password'
                 }
             },
+            {
+                'component': 'VTextarea',
+                'props': {
+                    'model': 'accounts',
+                    'label': '下注账号',
+                    'rows': 3,
+                    'placeholder': '每行一个账号：名称|API Key|下注金额|策略',
+                    'hint': '策略可选 first（第一个选项）、best（最高赔率）、favorite（最低赔率），金额与策略可省略；留空时使用上方的API Key与下注金额',
+                    'persistent-hint': True
+                }
+            },
             {
                 'component': 'VSwitch',
                 'props': {
@@ -404,6 +868,187 @@ class MTeamBetHelper(_PluginBase):
                     'hint': '每次自动下注的积分数量',
                     'persistent-hint': True
                 }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'pool_size',
+                    'label': '连接池大小',
+                    'placeholder': '4',
+                    'hint': '每个API地址保持的长连接数量',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'pool_idle_timeout',
+                    'label': '连接空闲超时（秒）',
+                    'placeholder': '60',
+                    'hint': '连接空闲超过该时间后重新建立',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'warmup_seconds',
+                    'label': '下注预热秒数',
+                    'placeholder': '5',
+                    'hint': '下注前多少秒预先建立连接并构建请求，0为关闭',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VSwitch',
+                'props': {
+                    'model': 'hedge_enabled',
+                    'label': '对冲请求',
+                    'hint': '主API响应慢时并发请求备用API，采用先返回的结果',
+                    'persistent-hint': True
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'hedge_delay',
+                    'label': '对冲延迟（秒）',
+                    'placeholder': '1.0',
+                    'hint': '主API超过该时间未返回时请求备用API',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VSwitch',
+                'props': {
+                    'model': 'async_engine',
+                    'label': '异步引擎',
+                    'hint': '下注以协程在单个线程上执行，需要安装 aiohttp',
+                    'persistent-hint': True
+                }
+            },
+            {
+                'component': 'VSwitch',
+                'props': {
+                    'model': 'adaptive_poll',
+                    'label': '自适应同步',
+                    'hint': '按最近的比赛截止时间调整同步频率',
+                    'persistent-hint': True
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'poll_min_interval',
+                    'label': '最短同步间隔（秒）',
+                    'placeholder': '30',
+                    'hint': '截止临近时的最快同步频率',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'poll_max_interval',
+                    'label': '最长同步间隔（秒）',
+                    'placeholder': '900',
+                    'hint': '没有比赛临近截止时的同步间隔',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'poll_hourly_budget',
+                    'label': '每小时同步上限',
+                    'placeholder': '60',
+                    'hint': '限制每小时请求比赛列表的次数',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'sync_min_gap',
+                    'label': '同步最小间隔（秒）',
+                    'placeholder': '10',
+                    'hint': '手动刷新与定时同步在该间隔内复用上次获取的比赛列表',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'rate_limit',
+                    'label': 'API限速（次/秒）',
+                    'placeholder': '2',
+                    'hint': '所有M-Team请求共用的速率上限，令牌紧张时优先保证下注',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'rate_burst',
+                    'label': '突发请求数',
+                    'placeholder': '10',
+                    'hint': '短时间内允许连续发送的请求数',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'bet_batch_window_ms',
+                    'label': '合并下注窗口（毫秒）',
+                    'placeholder': '200',
+                    'hint': '触发时间相差在该范围内的下注合并为一批同时发送',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'bet_max_parallel',
+                    'label': '最大并发下注数',
+                    'placeholder': '4',
+                    'hint': '同一批下注同时发送的请求数上限，超过连接池大小×账号数时按该值限制',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'history_size',
+                    'label': '页面显示历史条数',
+                    'placeholder': '200',
+                    'hint': '页面展示最近的下注记录条数，全部记录保存在数据目录',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
+            },
+            {
+                'component': 'VTextField',
+                'props': {
+                    'model': 'history_retention_days',
+                    'label': '历史保留天数',
+                    'placeholder': '90',
+                    'hint': '超过该天数的下注记录会被自动清理',
+                    'persistent-hint': True,
+                    'type': 'number'
+                }
             }
         ]
         
@@ -413,193 +1058,45 @@ class MTeamBetHelper(_PluginBase):
             "notify": False,
             "onlyonce": False,
             "api_key": "",
+            "accounts": "",
             "auto_bet": False,
             "bet_seconds_before": 10,
-            "bet_amount": "100"
-        }
-        
-        return elements, config            'label': '启用插件',
-                                            'hint': '开启后将启用M-Team菠菜助手功能',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            },
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 6
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VSwitch',
-                                        'props': {
-                                            'model': 'use_proxy',
-                                            'label': '使用代理',
-                                            'hint': '访问M-Team API时是否使用代理',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            }
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 6
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VSwitch',
-                                        'props': {
-                                            'model': 'notify',
-                                            'label': '开启通知',
-                                            'hint': '运行结果是否发送通知',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            },
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 6
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VSwitch',
-                                        'props': {
-                                            'model': 'onlyonce',
-                                            'label': '立即运行一次',
-                                            'hint': '保存配置后立即运行一次',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            }
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VTextField',
-                                        'props': {
-                                            'model': 'api_key',
-                                            'label': 'M-Team API Key',
-                                            'placeholder': '请输入M-Team API密钥',
-                                            'hint': '在M-Team个人设置中获取API密钥',
-                                            'persistent-hint': True,
-                                            'type': 'password'
-                                        }
-                                    }
-                                ]
-                            }
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 4
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VSwitch',
-                                        'props': {
-                                            'model': 'auto_bet',
-                                            'label': '自动下注',
-                                            'hint': '是否启用自动下注功能',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            },
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 4
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VTextField',
-                                        'props': {
-                                            'model': 'bet_seconds_before',
-                                            'label': '提前下注秒数',
-                                            'placeholder': '10',
-                                            'hint': '比赛截止前多少秒开始下注',
-                                            'persistent-hint': True,
-                                            'type': 'number'
-                                        }
-                                    }
-                                ]
-                            },
-                            {
-                                'component': 'VCol',
-                                'props': {
-                                    'cols': 12,
-                                    'md': 4
-                                },
-                                'content': [
-                                    {
-                                        'component': 'VTextField',
-                                        'props': {
-                                            'model': 'bet_amount',
-                                            'label': '下注金额',
-                                            'placeholder': '100',
-                                            'hint': '每次自动下注的积分数量',
-                                            'persistent-hint': True
-                                        }
-                                    }
-                                ]
-                            }
-                        ]
-                    }
-                ]
-            }
-        ]
-        
-        config = {
-            "enabled": False,
-            "use_proxy": True,
-            "notify": False,
-            "onlyonce": False,
-            "api_key": "",
-            "auto_bet": False,
-            "bet_seconds_before": 10,
-            "bet_amount": "100"
+            "bet_amount": "100",
+            "pool_size": 4,
+            "pool_idle_timeout": 60,
+            "warmup_seconds": 5,
+            "hedge_enabled": False,
+            "hedge_delay": 1.0,
+            "adaptive_poll": True,
+            "poll_min_interval": 30,
+            "poll_max_interval": 900,
+            "poll_hourly_budget": 60,
+            "sync_min_gap": 10,
+            "rate_limit": 2.0,
+            "rate_burst": 10,
+            "async_engine": False,
+            "bet_batch_window_ms": 200,
+            "bet_max_parallel": 4,
+            "history_size": 200,
+            "history_retention_days": 90
         }
         
         return elements, config
         
     def get_page(self) -> List[dict]:
         """查询页面（比赛列表 + 下注历史）"""
+        # 整个页面基于同一版本的比赛状态构建，同步过程中也不会读到不一致的数据
+        state = self._state
+        
         # 构建比赛列表表格数据
         bet_games_data = []
-        for game in self._bet_games:
+        for game in state.games:
             bet_games_data.append({
-                'name': game.get('name', 'Unknown'),
-                'status': game.get('status', 'Unknown'),
-                'startTime': game.get('startTime', 'Unknown'),
-                'endTime': game.get('endTime', 'Unknown'),
-                'options': len(game.get('betOptions', []))
+                'name': game.heading or 'Unknown',
+                'status': game.raw.get('status', 'Unknown'),
+                'startTime': game.raw.get('startTime', 'Unknown'),
+                'endTime': game.end_text or 'Unknown',
+                'options': len(game.options)
             })
         
         # 构建比赛列表表格
@@ -676,6 +1173,7 @@ class MTeamBetHelper(_PluginBase):
         }
         
         # 构建下注历史表格
+        history = self._history_store.recent() if self._history_store else []
         bet_history_table = {
             'component': 'VCard',
             'props': {
@@ -706,12 +1204,15 @@ class MTeamBetHelper(_PluginBase):
                             'props': {
                                 'headers': [
                                     {'title': '时间', 'key': 'time'},
+                                    {'title': '账号', 'key': 'account'},
                                     {'title': '选项ID', 'key': 'opt_id'},
                                     {'title': '金额', 'key': 'bonus'},
                                     {'title': '结果', 'key': 'success'},
-                                    {'title': 'API地址', 'key': 'api_url'}
+                                    {'title': 'API地址', 'key': 'api_url'},
+                                    {'title': '尝试', 'key': 'attempts'},
+                                    {'title': '耗时', 'key': 'verdict'}
                                 ],
-                                'items': self._bet_history,
+                                'items': [dict(record, verdict=trace_verdict(record.get('trace'))) for record in history],
                                 'density': 'compact',
                                 'hover': True
                             }
@@ -721,16 +1222,148 @@ class MTeamBetHelper(_PluginBase):
             ]
         }
         
-        return [bet_games_table, bet_history_table]
+        # 构建下注时间线，逐笔展开查看各阶段的时刻与耗时
+        bet_trace_card = {
+            'component': 'VCard',
+            'props': {
+                'variant': 'tonal',
+                'class': 'mt-4'
+            },
+            'content': [
+                {
+                    'component': 'VCardTitle',
+                    'content': [
+                        {
+                            'component': 'VIcon',
+                            'props': {
+                                'icon': 'mdi-timeline-clock-outline',
+                                'class': 'me-2'
+                            }
+                        },
+                        {
+                            'component': 'span',
+                            'text': '下注时间线'
+                        }
+                    ]
+                },
+                {
+                    'component': 'VCardText',
+                    'content': [
+                        {
+                            'component': 'VExpansionPanels',
+                            'props': {
+                                'variant': 'accordion'
+                            },
+                            'content': [self.__trace_panel(record) for record in history[:20] if record.get('trace')]
+                        }
+                    ]
+                }
+            ]
+        }
+        
+        # 构建对冲请求统计
+        hedge_stats_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': f'对冲请求（延迟 {self._hedge_delay} 秒）：{self.__hedge_summary()}'
+            }
+        }
+        
+        # 构建最近一次同步的增量统计
+        sync_diff_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': f'最近同步：{state.diff.summary() if state.diff else "尚未同步"}'
+                        + (f'，下次同步 {datetime.fromtimestamp(game_feed.next_poll_time).strftime("%H:%M:%S")}'
+                           if self._adaptive_poll and game_feed.next_poll_time else '')
+                        + f'；{game_list_client.summary()}'
+            }
+        }
+        
+        # 构建限速统计，按优先级列出各类请求被推迟与丢弃的次数
+        rate_limit_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': rate_limiter.summary()
+            }
+        }
+        
+        # 构建指标摘要，完整数据见 /metrics 接口
+        metrics_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': f'指标：{metrics.summary()}'
+            }
+        }
+        
+        # 构建批量下注统计
+        dispatch_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': f'批量下注：{self.__dispatch_summary()}'
+                        + f'；{bet_timer.summary()}'
+                        + (f'；{async_engine.summary()}' if self._async_engine else '')
+                        + (f'；各账号：{account_summary(self._history_store.recent())}'
+                           if len(self._accounts) > 1 and self._history_store else '')
+            }
+        }
+        
+        # 构建API健康状态
+        health_alert = {
+            'component': 'VAlert',
+            'props': {
+                'type': 'info',
+                'variant': 'tonal',
+                'density': 'compact',
+                'class': 'mb-4',
+                'text': f'API状态：{self.__health_summary()}；服务器时钟偏差：{clock_sync.summary()}'
+            }
+        }
+        
+        return [health_alert, hedge_stats_alert, sync_diff_alert, rate_limit_alert, metrics_alert, dispatch_alert, bet_games_table, bet_history_table, bet_trace_card]
         
     def stop_service(self) -> None:
         """停止插件任务"""
         try:
-            if self._scheduler:
-                self._scheduler.remove_all_jobs()
-                if self._scheduler.running:
-                    self._scheduler.shutdown()
-                self._scheduler = None
+            game_feed.unsubscribe(self.__class__.__name__)
+            if self._dispatcher:
+                self._dispatcher.close()
+                self._dispatcher = None
+                
+            bet_timer.cancel_prefix(f"{self.__class__.__name__}_")
+                
+            for account in self._accounts:
+                account.close()
+            self._accounts = []
+            if self._history_store:
+                self._history_store.close()
+                self._history_store = None
+            self._prepared_bets.clear()
+            self._state = GameState()
+            self._bet_jobs = {}
+            self._bet_plan = {}
+            self._hedger = None
+            async_engine.release(self.__class__.__name__)
                 
             logger.info("M-Team菠菜助手插件已停止")
             
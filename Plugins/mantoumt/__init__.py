@@ -1,16 +1,26 @@
 # MTeam 自动下注插件
 
+import asyncio
+import time
+
 import requests
+from fastapi.responses import PlainTextResponse
 from datetime import datetime, timedelta
-from typing import Any, List, Dict, Optional
+from typing import Any, List, Dict, Optional, Set, Tuple
 
+from app.core.config import settings
 from app.plugins import _PluginBase
 from app.log import logger
-from app.scheduler import Scheduler
 from app.schemas import NotificationType
 from app.utils.http import RequestUtils
 from app.db.site_oper import SiteOper
 
+from ..mteamapi import endpoint_health, run_within, BetDispatcher, clock_sync, BetHistoryStore, \
+    SnapshotStore, Game, decode_json, game_list_client, game_feed, GameEvent, ADDED, ODDS_CHANGED, REMOVED, \
+    rate_limiter, BET, ODDS, POLL, DeadlineRetry, async_engine, AsyncResponse, Account, parse_accounts, \
+    account_summary, bet_timer, metrics, PROMETHEUS_CONTENT_TYPE, BET_REQUEST_SECONDS, BET_DEADLINE_SLACK_SECONDS, \
+    BetTrace, tracing, trace_rows, trace_verdict, STARTED, SENT, ACKED
+
 class ManToumt(_PluginBase):
     plugin_name = "mt自动助手"
     plugin_desc = "mt自动助手"
@@ -28,10 +38,32 @@ class ManToumt(_PluginBase):
     _onlyonce: bool = False
 
     _api_key: Optional[str] = None
+    # 多账号配置，每行一个账号：名称|API Key|下注金额|策略
+    _accounts_text: str = ""
     _bet_seconds_before: int = 10
     _bet_amount: int = 1000
+    _warmup_seconds: int = 5
+    _odds_refresh_ms: int = 300
+    _async_engine: bool = False
+    # 每个账号连接池的连接数与同一批下注同时发送的请求数上限
+    _pool_size: int = 4
+    _bet_max_parallel: int = 8
 
     _siteoper = None
+    _dispatcher: Optional[BetDispatcher] = None
+    # 下注账号，各自使用独立的长连接池
+    _accounts: List[Account] = []
+    # 预热阶段构建好的下注请求及其选项ID，按比赛ID与账号索引
+    _prepared_bets: Dict[Tuple[str, str], Tuple[str, requests.PreparedRequest]] = {}
+    # 下注记录，保存在数据目录下的SQLite中
+    _history_store: Optional[BetHistoryStore] = None
+    # 比赛快照与下注计划，插件重启后据此恢复下注任务
+    _snapshot: Optional[SnapshotStore] = None
+    _bet_plan: Dict[str, Dict[str, Any]] = {}
+    # 从快照恢复、尚未与事件源的比赛列表核对的比赛ID
+    _restored: Set[str] = set()
+    # 最近一批下注前刷新的时间与比赛列表
+    _batch_refresh: Tuple[float, Optional[List[Game]]] = (float("-inf"), None)
 
     # 初始化插件配置并根据配置启动任务
     def init_plugin(self, config: Optional[dict] = None) -> None:
@@ -43,8 +75,56 @@ class ManToumt(_PluginBase):
             self._notify = config.get("notify", True)
             self._onlyonce = config.get("onlyonce", False)
             self._api_key = config.get("api_key", "")
+            self._accounts_text = config.get("accounts", "")
             self._bet_seconds_before = int(config.get("bet_seconds_before", 10))
             self._bet_amount = int(config.get("bet_amount", 1000))
+            self._warmup_seconds = int(config.get("warmup_seconds", 5))
+            self._odds_refresh_ms = int(config.get("odds_refresh_ms", 300))
+            self._async_engine = config.get("async_engine", False)
+
+        # 每个账号使用独立的长连接池，配置变更时重建；默认策略沿用赔率最高的选项
+        for account in self._accounts:
+            account.close()
+        self._accounts = parse_accounts(self._accounts_text, self._api_key, self._bet_amount, default_strategy="best",
+                                        pool_size=self._pool_size)
+        if not self._history_store:
+            try:
+                self._history_store = BetHistoryStore(self.get_data_path() / "bet_history.db")
+            except Exception as e:
+                logger.error(f"打开下注历史存储失败：{e}")
+        endpoint_health.configure(proxies=self._get_proxies())
+        # 异步引擎：刷新赔率与下注以协程在共享的事件循环线程上执行
+        if self._enabled and self._async_engine and not async_engine.use(self.__class__.__name__):
+            logger.warning("未安装 aiohttp，异步引擎不可用，继续使用线程执行下注")
+            self._async_engine = False
+        if not (self._enabled and self._async_engine):
+            async_engine.release(self.__class__.__name__)
+        # 同一时刻截止的比赛合并为一个调度任务并发下注；
+        # 每个账号的连接池最多同时使用 pool_size 个连接，更高的并发只会排队等待连接
+        max_parallel = min(self._bet_max_parallel, self._pool_size * max(len(self._accounts), 1))
+        if not self._dispatcher:
+            restore = True
+            self._dispatcher = BetDispatcher(
+                schedule=lambda job_id, func, run_date: bet_timer.add(self._timer_id(job_id), run_date, func),
+                unschedule=lambda job_id: bet_timer.cancel(self._timer_id(job_id)),
+                max_parallel=max_parallel,
+                job_prefix="batch",
+                prepare=self._refresh_batch
+            )
+        else:
+            restore = False
+            # 账号数可能已变化，按新的账号数调整并发上限
+            self._dispatcher.configure(max_parallel=max_parallel)
+        if not self._snapshot:
+            self._snapshot = SnapshotStore(self.get_data_path() / "snapshot.json")
+        if restore and self._enabled and not self._onlyonce:
+            self._restore_snapshot()
+        # 订阅共享的比赛事件源，新比赛出现或赔率变化时自动安排下注
+        if self._enabled:
+            game_feed.subscribe(self.__class__.__name__, self._on_game_events,
+                                api_key=self._list_key(), proxies=self._get_proxies(), replay=True)
+        else:
+            game_feed.unsubscribe(self.__class__.__name__)
 
         if self._onlyonce:
             logger.info("MTeam 自动下注助手 - 立即执行一次任务")
@@ -56,54 +136,332 @@ class ManToumt(_PluginBase):
     def _run_once_or_schedule(self):
         games = self.fetch_games()
         logger.info(f"共获取 {len(games)} 场 LIVE 比赛")
+        self._schedule_games(games)
+        self._save_snapshot(games)
+
+    # 处理比赛事件：为新出现或有变化的比赛安排下注，比赛消失时取消下注。
+    def _on_game_events(self, events: List[GameEvent]):
+        if not self._dispatcher:
+            return
+        current = {game.id: game for game in game_feed.games}
+        if self._restored:
+            # 消失事件只涵盖上一次列表中的比赛，快照恢复的比赛若不在首次拿到的列表中同样取消
+            for game_id in self._restored - current.keys():
+                self._cancel_game(game_id)
+            self._restored = set()
+        touched = {}
+        for event in events:
+            game_id = event.game.id
+            if event.kind == REMOVED and game_id not in current:
+                self._cancel_game(game_id)
+            elif event.kind in (ADDED, ODDS_CHANGED) and game_id in current:
+                # 同一批事件可能跨越多次轮询，以事件源的最新比赛为准
+                touched[game_id] = current[game_id]
+        self._schedule_games(list(touched.values()))
+        self._save_snapshot(list(current.values()))
+
+    # 取消比赛已安排的下注与预热任务。
+    def _cancel_game(self, game_id: str):
+        for account in self._accounts:
+            self._dispatcher.cancel(f"{game_id}@{account.name}")
+        bet_timer.cancel(self._timer_id(f"warmup_{game_id}"))
+        self._bet_plan.pop(game_id, None)
+
+    # 为比赛安排下注，跳过下注时间已过的比赛。
+    def _schedule_games(self, games: List[Game]):
         for game in games:
             try:
-                end_time = datetime.strptime(game["endtime"], "%Y-%m-%d %H:%M:%S")
+                # 截止时间为服务器时间，按校准的时钟偏差换算为本地时间
+                if not game.deadline:
+                    continue
+                end_time = datetime.fromtimestamp(clock_sync.to_local(game.deadline))
                 bet_time = end_time - timedelta(seconds=self._bet_seconds_before)
-                Scheduler().add_date_job(
-                    job_id=f"MTeamBetHelper_{game['id']}",
-                    func=self.auto_bet,
-                    kwargs={"game": game},
-                    run_date=bet_time
-                )
-                logger.info(f"已安排比赛 {game['heading']} 的下注任务于 {bet_time}")
+                if bet_time <= datetime.now():
+                    continue
+                self._plan_bet(game, bet_time.timestamp())
+                logger.info(f"已安排比赛 {game.heading} 的下注任务于 {bet_time}")
             except Exception as e:
                 logger.error(f"下注任务安排失败: {e}")
-      
-    # 负责调用 M-Team API 获取当前 LIVE 比赛数据列表。
-    def fetch_games(self) -> List[Dict[str, Any]]:
-        url = self._get_base_url() + "/api/bet/findBetgameList"
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "x-api-key": self._api_key
-        }
-        data = {"active": "LIVE", "fix": 0}
+
+    # 保存比赛快照与下注计划。
+    def _save_snapshot(self, games: List[Game]):
         try:
-            res = requests.post(url, headers=headers, data=data, proxies=self._get_proxies())
-            return res.json().get("data", [])
+            self._snapshot.save([game.raw for game in games], list(self._bet_plan.values()), meta={
+                "bet_seconds_before": self._bet_seconds_before
+            })
         except Exception as e:
-            logger.error(f"获取比赛失败：{e}")
+            logger.error(f"保存比赛快照失败：{e}")
+
+    # 按计划的触发时间为每个账号安排下注，同一场比赛的下注在同一批次中并发发出，并安排预热任务。
+    def _plan_bet(self, game: Game, fire_time: float, scheduled_at: Optional[float] = None):
+        bet_time = datetime.fromtimestamp(fire_time)
+        scheduled_at = scheduled_at or time.time()
+        for account in self._accounts:
+            self._dispatcher.submit(f"{game.id}@{account.name}", bet_time, self.auto_bet, game, account.name,
+                                    BetTrace(planned=fire_time, scheduled=scheduled_at))
+        warmup_time = bet_time - timedelta(seconds=self._warmup_seconds)
+        if self._warmup_seconds > 0 and warmup_time > datetime.now():
+            bet_timer.add(self._timer_id(f"warmup_{game.id}"), warmup_time, self.warm_up_bet, game)
+        self._bet_plan[game.id] = {"game": game.raw, "fire_time": fire_time, "scheduled_at": scheduled_at}
+
+    # 从快照恢复尚未到期的下注计划，已过触发时间的计划直接丢弃；恢复的计划在收到首批比赛事件时核对。
+    def _restore_snapshot(self):
+        _, plan, meta = self._snapshot.load()
+        self._bet_plan = {}
+        self._restored = set()
+        if meta.get("bet_seconds_before") != self._bet_seconds_before:
+            # 提前下注秒数已变更，旧计划的触发时间不再适用
+            return
+        for entry in plan:
+            try:
+                self._plan_bet(Game(entry["game"]), entry["fire_time"], entry.get("scheduled_at"))
+            except Exception as e:
+                logger.error(f"恢复下注计划失败：{e}")
+        self._restored = set(self._bet_plan)
+        if self._bet_plan:
+            logger.info(f"已从快照恢复 {len(self._bet_plan)} 个下注计划")
+      
+    # 获取当前 LIVE 比赛列表，与其他插件共用同一份结果；max_age 为可接受的缓存时长，kind 为限速类别。
+    def fetch_games(self, timeout: Optional[float] = 30, max_age: Optional[float] = None,
+                    kind: str = POLL) -> List[Game]:
+        games = game_list_client.fetch(self._list_key(), proxies=self._get_proxies(), timeout=timeout,
+                                       max_age=max_age, kind=kind)
+        if games is None:
+            logger.error("获取比赛失败")
             return []
-    # 执行实际的下注操作，选择赔率最高的选项并发送下注请求。
-    def auto_bet(self, game: Dict[str, Any]):
+        return games
+    # 比赛列表使用的 API Key，未配置时使用第一个账号的。
+    def _list_key(self) -> str:
+        return self._api_key or (self._accounts[0].api_key if self._accounts else "")
+    # 按名称查找下注账号，未指定时使用第一个账号。
+    def _account(self, name: Optional[str]) -> Optional[Account]:
+        if not name:
+            return self._accounts[0] if self._accounts else None
+        return next((account for account in self._accounts if account.name == name), None)
+    # 共享定时器中的任务ID，以插件类名为前缀区分各插件的任务。
+    def _timer_id(self, job_id: str) -> str:
+        return f"{self.__class__.__name__}_{job_id}"
+    # 下注前预热：在各账号的连接池中解析DNS并建立TLS连接，同时预先构建下注请求。
+    # 预热窗口内已预热过的账号与地址不再重复请求，多场比赛先后截止时不会集中消耗限速额度。
+    def warm_up_bet(self, game: Game):
         try:
-            best_option = max(game["optionsList"], key=lambda x: float(x["odds"]))
-            url = self._get_base_url() + "/api/bet/betgameOdds"
-            headers = {
-                "Content-Type": "application/x-www-form-urlencoded",
-                "x-api-key": self._api_key
-            }
-            data = {"optId": best_option["id"], "bonus": self._bet_amount}
-            res = requests.post(url, headers=headers, data=data, proxies=self._get_proxies())
-            logger.info(f"下注成功: {res.text}")
-            if self._notify:
-                self.post_message(
-                    mtype=NotificationType.SiteMessage,
-                    title="M-Team 自动下注",
-                    text=f"✅ 比赛 {game['heading']} 成功下注 {best_option['text']}，赔率 {best_option['odds']}"
-                )
+            base_url = self._get_base_url()
+            if self._async_engine and async_engine.running:
+                # 异步下注使用引擎会话中的连接，预构建的请求不适用
+                async_engine.submit(async_engine.warm_up(base_url, proxies=self._get_proxies(),
+                                                         max_age=self._warmup_seconds))
+                return
+            for account in self._accounts:
+                if not account.pool.warm_up(base_url, proxies=self._get_proxies(), max_age=self._warmup_seconds):
+                    logger.warning(f"下注预热连接失败: {account.name} {base_url}")
+                option = account.choose(game)
+                if not option:
+                    continue
+                self._prepared_bets[(game.id, account.name)] = (option.id, account.pool.prepare(
+                    base_url,
+                    url=base_url + "/api/bet/betgameOdds",
+                    headers=account.headers,
+                    data={"optId": option.id, "bonus": account.bonus}
+                ))
+        except Exception as e:
+            logger.error(f"下注预热失败：{e}")
+    # 每批下注发出前在时间预算内刷新一次比赛列表，同一批下注的赔率刷新直接使用这次结果，
+    # 不再逐笔排队请求。异步引擎中同时发起的刷新本就合并为一次，不需要提前刷新。
+    def _refresh_batch(self):
+        budget = self._refresh_budget()
+        if budget <= 0 or (self._async_engine and async_engine.running):
+            return
+        games = run_within(lambda: self.fetch_games(timeout=budget, max_age=budget, kind=ODDS), budget)
+        self._batch_refresh = (time.monotonic(), games)
+    # 在时间预算内重新获取比赛的最新赔率，超时或未找到时返回None；limit 为预算上限（秒）。
+    def refresh_game(self, game: Game, limit: Optional[float] = None) -> Optional[Game]:
+        budget = self._refresh_budget(limit)
+        if budget <= 0:
+            return None
+        refreshed_at, games = self._batch_refresh
+        if time.monotonic() - refreshed_at > self._refresh_budget():
+            # 不在批次中执行（如立即运行一次）时单独刷新，预算内获取的列表可以直接使用
+            games = run_within(lambda: self.fetch_games(timeout=budget, max_age=budget, kind=ODDS), budget)
+        return self._find_fresh(game, games)
+    # refresh_game 的协程版本，与线程中的刷新共用比赛列表缓存，同时截止的下注共用一次刷新。
+    async def _refresh_game_async(self, game: Game, limit: Optional[float] = None) -> Optional[Game]:
+        budget = self._refresh_budget(limit)
+        if budget <= 0:
+            return None
+        try:
+            games = await asyncio.wait_for(
+                game_list_client.fetch_async(self._list_key(), proxies=self._get_proxies(), timeout=budget,
+                                             max_age=budget, kind=ODDS), budget
+            )
+        except asyncio.TimeoutError:
+            return None
+        return self._find_fresh(game, games)
+    # 刷新赔率的时间预算（秒）。
+    def _refresh_budget(self, limit: Optional[float] = None) -> float:
+        budget = self._odds_refresh_ms / 1000
+        if limit is not None:
+            budget = min(budget, limit)
+        return budget
+    # 从刷新结果中找出同一场比赛。
+    @staticmethod
+    def _find_fresh(game: Game, games: Optional[List[Game]]) -> Optional[Game]:
+        for fresh in games or []:
+            if fresh.id == game.id and fresh.options:
+                return fresh
+        return None
+    # 按比赛截止时间建立下注预算，截止时间未知时沿用30秒。
+    @staticmethod
+    def _bet_retry(game: Game) -> DeadlineRetry:
+        if game.deadline:
+            return DeadlineRetry(clock_sync.to_local(game.deadline))
+        return DeadlineRetry.within(30)
+    # 执行实际的下注操作，按账号策略选择选项并发送下注请求；启用异步引擎时交由事件循环执行并返回Future。
+    # trace 记录下注时间线，由安排任务时创建。
+    def auto_bet(self, game: Game, account_name: Optional[str] = None, trace: Optional[BetTrace] = None):
+        trace = trace or BetTrace()
+        trace.mark(STARTED)
+        account = self._account(account_name)
+        if not account:
+            logger.warning(f"下注账号 {account_name} 已被移除，跳过比赛 {game.heading}")
+            return
+        if self._async_engine and async_engine.running:
+            return async_engine.submit(self._auto_bet_async(game, account, trace))
+        best_option = None
+        odds_source = "stale"
+        success = False
+        # 刷新赔率与下注请求共用截止前的剩余时间
+        retry = self._bet_retry(game)
+        try:
+            # 赔率在截止前变化频繁，下注前刷新一次，超出时间预算则使用安排任务时的快照
+            # 刷新赔率至少给下注请求留出一次尝试的时间
+            fresh = self.refresh_game(game, limit=retry.remaining() - retry.min_attempt)
+            if fresh:
+                game, odds_source = fresh, "fresh"
+            best_option = account.choose(game)
+            if not best_option:
+                raise ValueError(f"比赛 {game.heading} 没有可投注的选项")
+            base_url = self._get_base_url()
+            url = base_url + "/api/bet/betgameOdds"
+            prepared_opt_id, prepared = self._prepared_bets.pop((game.id, account.name), (None, None))
+            if not (prepared and prepared.url == url and prepared_opt_id == best_option.id):
+                prepared = None
+            res = retry.run(lambda timeout: self._send_bet(account, base_url, url, best_option.id, prepared,
+                                                           timeout, trace))
+            success = self._is_success(res)
+            trace.mark(ACKED)
+            logger.info(f"下注{'成功' if success else '失败'}: {res.text}")
         except Exception as e:
             logger.error(f"下注失败：{e}")
+            metrics.record_bet(False, type(e).__name__)
+        finally:
+            self._finish_bet(account, game, best_option, odds_source, success, retry.attempts, trace)
+    # auto_bet 的协程版本，写历史与发通知放到线程池中执行。
+    async def _auto_bet_async(self, game: Game, account: Account, trace: BetTrace):
+        best_option = None
+        odds_source = "stale"
+        success = False
+        retry = self._bet_retry(game)
+        try:
+            fresh = await self._refresh_game_async(game, limit=retry.remaining() - retry.min_attempt)
+            if fresh:
+                game, odds_source = fresh, "fresh"
+            best_option = account.choose(game)
+            if not best_option:
+                raise ValueError(f"比赛 {game.heading} 没有可投注的选项")
+            # 预热阶段构建的请求只用于线程模式
+            self._prepared_bets.pop((game.id, account.name), None)
+            base_url = self._get_base_url()
+            res = await retry.run_async(lambda timeout: self._send_bet_async(account, base_url, best_option.id,
+                                                                             timeout, trace))
+            success = self._is_success(res)
+            trace.mark(ACKED)
+            logger.info(f"下注{'成功' if success else '失败'}: {res.text}")
+        except Exception as e:
+            logger.error(f"下注失败：{e}")
+            metrics.record_bet(False, type(e).__name__)
+        await async_engine.offload(self._finish_bet, account, game, best_option, odds_source, success,
+                                   retry.attempts, trace)
+    # 下注结束后发送通知，并按账号写入下注记录及下注时间线。
+    def _finish_bet(self, account: Account, game: Game, best_option, odds_source: str, success: bool,
+                    attempts: int, trace: Optional[BetTrace] = None):
+        if success and game.deadline:
+            # 下注确认时距比赛截止还剩的时间，用于调整提前下注秒数
+            metrics.observe(BET_DEADLINE_SLACK_SECONDS, clock_sync.to_local(game.deadline) - time.time())
+        if self._notify and success:
+            self.post_message(
+                mtype=NotificationType.SiteMessage,
+                title="M-Team 自动下注",
+                text=f"✅ [{account.name}] 比赛 {game.heading} 成功下注 {best_option.text}，赔率 {best_option.odds}"
+            )
+        if self._history_store:
+            self._history_store.add({
+                "time": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                "account": account.name,
+                "game_id": game.id,
+                "heading": game.heading,
+                "option": best_option.text if best_option else None,
+                "odds": best_option.odds if best_option else None,
+                "odds_source": "最新" if odds_source == "fresh" else "快照",
+                "api_url": trace.endpoint if trace else None,
+                "attempts": attempts,
+                "success": success,
+                "trace": trace.to_dict() if trace else None
+            })
+    # 单次下注请求，通过账号自己的连接池发送，超时由截止时间预算给出，失败时抛出异常。
+    # 取得连接、发出请求与收到响应的时刻由连接池记录，建连耗时计入准备阶段。
+    def _send_bet(self, account: Account, base_url: str, url: str, opt_id: str,
+                  prepared: Optional[requests.PreparedRequest], timeout: Tuple[float, float],
+                  trace: BetTrace) -> requests.Response:
+        trace.attempt(base_url)
+        # 下注优先级最高且超时已按截止时间算好，限速时不等待，直接发送
+        if not rate_limiter.acquire(BET, timeout=0, force=True):
+            logger.warning("下注请求超出API限速，仍然发送")
+        start = time.monotonic()
+        try:
+            session = account.pool.get(base_url)
+            # 连接池无法记录时（如SOCKS代理）以此为发出时间，不记录取得连接
+            trace.mark(SENT)
+            with tracing(trace):
+                if prepared:
+                    res = session.send(prepared, proxies=self._get_proxies(), timeout=timeout)
+                else:
+                    data = {"optId": opt_id, "bonus": account.bonus}
+                    res = session.post(url, headers=account.headers, data=data,
+                                       proxies=self._get_proxies(), timeout=timeout)
+        except Exception:
+            endpoint_health.record(base_url, time.monotonic() - start, False)
+            raise
+        trace.received(res)
+        elapsed = time.monotonic() - start
+        endpoint_health.record(base_url, elapsed, res.status_code < 500)
+        metrics.observe(BET_REQUEST_SECONDS, elapsed, endpoint=base_url)
+        return res
+    # 单次异步下注请求，限速器不可在事件循环中等待，令牌不足时直接发送。
+    async def _send_bet_async(self, account: Account, base_url: str, opt_id: str,
+                              timeout: Tuple[float, float], trace: BetTrace) -> AsyncResponse:
+        trace.attempt(base_url)
+        if not rate_limiter.acquire(BET, timeout=0, force=True):
+            logger.warning("下注请求超出API限速，仍然发送")
+        start = time.monotonic()
+        res = await async_engine.post(base_url, "/api/bet/betgameOdds", headers=account.headers,
+                                      data={"optId": opt_id, "bonus": account.bonus},
+                                      proxies=self._get_proxies(), timeout=timeout, trace=trace)
+        metrics.observe(BET_REQUEST_SECONDS, time.monotonic() - start, endpoint=base_url)
+        return res
+    # 判断下注接口是否返回成功，并按失败原因记录指标。
+    @staticmethod
+    def _is_success(res: requests.Response) -> bool:
+        if res.status_code != 200:
+            metrics.record_bet(False, f"HTTP {res.status_code}")
+            return False
+        try:
+            result = decode_json(res)
+        except ValueError:
+            metrics.record_bet(False, "invalid json")
+            return False
+        success = bool(result.get("success")) or str(result.get("code")) == "0"
+        metrics.record_bet(success, result.get("message"))
+        return success
     # 用于获取系统代理配置（如启用代理时）。
     def _get_proxies(self):
         if not self._use_proxy:
@@ -114,12 +472,25 @@ class ManToumt(_PluginBase):
         except Exception as e:
             logger.error(f"获取代理失败: {e}")
             return None
-    # 该方法根据是否有 API Key 判断使用主站或备用站。
+    # 按延迟、错误率与熔断状态选择当前最快的可用站点。
     def _get_base_url(self) -> str:
-        return "https://api.m-team.io" if self._api_key else "https://api.m-team.cc"
+        return endpoint_health.best()
     # 此方法返回插件是否启用的状态。
     def get_state(self) -> bool:
         return self._enabled
+     # 注册插件API，以 Prometheus 文本格式导出请求延迟、定时器延迟与截止余量等指标。
+    def get_api(self) -> List[Dict[str, Any]]:
+        return [{
+            "path": "/metrics",
+            "endpoint": self._metrics,
+            "methods": ["GET"],
+            "summary": "M-Team下注指标",
+            "description": "Prometheus 文本格式的列表请求、下注请求、定时器延迟、截止余量与下注结果指标"
+        }]
+    # 导出指标。
+    @staticmethod
+    def _metrics() -> PlainTextResponse:
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
      # 注册需要 MoviePilot 调度器执行的任务，目前为空。
     def get_service(self) -> List[Dict[str, Any]]:
         return []
@@ -151,8 +522,15 @@ class ManToumt(_PluginBase):
                     "content": [
                         {"component": "VCardTitle", "text": "功能设置"},
                         {"component": "VTextField", "props": {"model": "api_key", "label": "API Key"}},
+                        {"component": "VTextarea", "props": {"model": "accounts", "label": "下注账号", "rows": 3,
+                                                             "placeholder": "每行一个账号：名称|API Key|下注金额|策略",
+                                                             "hint": "策略可选 first、best、favorite，留空时使用上方的 API Key",
+                                                             "persistent-hint": True}},
                         {"component": "VTextField", "props": {"model": "bet_seconds_before", "label": "提前下注秒数", "type": "number"}},
                         {"component": "VTextField", "props": {"model": "bet_amount", "label": "下注积分", "type": "number"}},
+                        {"component": "VTextField", "props": {"model": "warmup_seconds", "label": "下注预热秒数", "type": "number"}},
+                        {"component": "VTextField", "props": {"model": "odds_refresh_ms", "label": "下注前刷新赔率时限（毫秒）", "type": "number"}},
+                        {"component": "VSwitch", "props": {"model": "async_engine", "label": "异步引擎（需要 aiohttp）"}},
                     ]
                 }
             ]
@@ -163,41 +541,162 @@ class ManToumt(_PluginBase):
         "notify": True,
         "onlyonce": False,
         "api_key": "",
+        "accounts": "",
         "bet_seconds_before": 10,
-        "bet_amount": 1000
+        "bet_amount": 1000,
+        "warmup_seconds": 5,
+        "odds_refresh_ms": 300,
+        "async_engine": False
     }
-   #  构建插件的查询结果页面，目前未实现内容。
+   #  构建插件的查询结果页面，展示下注记录及所用赔率是否为最新。
     def get_page(self) -> List[dict]:
-    return [
-        {
-            "component": "VCard",
-            "props": {"variant": "flat", "class": "mb-4"},
+        clock_alert = {
+            "component": "VAlert",
+            "props": {
+                "type": "info",
+                "variant": "tonal",
+                "density": "compact",
+                "class": "mb-4",
+                "text": f"服务器时钟偏差：{clock_sync.summary()}；{bet_timer.summary()}；"
+                        f"{self._dispatcher.summary() + '；' if self._dispatcher else ''}指标：{metrics.summary()}"
+            }
+        }
+        history = self._history_store.recent() if self._history_store else []
+        if len(self._accounts) > 1:
+            clock_alert["props"]["text"] += f"；各账号：{account_summary(history)}"
+        if history:
+            return [
+                clock_alert,
+                {
+                    "component": "VCard",
+                    "props": {"variant": "flat", "class": "mb-4"},
+                    "content": [
+                        {
+                            "component": "VCardTitle",
+                            "props": {"class": "text-h6"},
+                            "text": "下注记录"
+                        },
+                        {
+                            "component": "VDataTable",
+                            "props": {
+                                "headers": [
+                                    {"title": "时间", "key": "time"},
+                                    {"title": "账号", "key": "account"},
+                                    {"title": "比赛", "key": "heading"},
+                                    {"title": "选项", "key": "option"},
+                                    {"title": "赔率", "key": "odds"},
+                                    {"title": "赔率来源", "key": "odds_source"},
+                                    {"title": "结果", "key": "success"},
+                                    {"title": "尝试", "key": "attempts"},
+                                    {"title": "耗时", "key": "verdict"}
+                                ],
+                                "items": [dict(record, verdict=trace_verdict(record.get("trace"))) for record in history],
+                                "density": "compact",
+                                "hover": True
+                            }
+                        }
+                    ]
+                },
+                {
+                    "component": "VCard",
+                    "props": {"variant": "flat", "class": "mb-4"},
+                    "content": [
+                        {
+                            "component": "VCardTitle",
+                            "props": {"class": "text-h6"},
+                            "text": "下注时间线"
+                        },
+                        {
+                            "component": "VExpansionPanels",
+                            "props": {"variant": "accordion"},
+                            "content": [self._trace_panel(record) for record in history[:20] if record.get("trace")]
+                        }
+                    ]
+                }
+            ]
+        return [
+            clock_alert,
+            {
+                "component": "VCard",
+                "props": {"variant": "flat", "class": "mb-4"},
+                "content": [
+                    {
+                        "component": "VCardTitle",
+                        "props": {"class": "text-h6"},
+                        "text": "M-Team 当前状态"
+                    },
+                    {
+                        "component": "VCardText",
+                        "content": [
+                            {
+                                "component": "div",
+                                "props": {"class": "text-body-1"},
+                                "text": "暂无比赛数据。请先启用插件并配置 API Key。"
+                            }
+                        ]
+                    }
+                ]
+            }
+        ]
+    # 单笔下注的时间线面板：标题给出结果与最慢的环节，展开后列出各阶段的时刻与耗时。
+    @staticmethod
+    def _trace_panel(record: Dict[str, Any]) -> dict:
+        trace = record.get("trace") or {}
+        status = "成功" if record.get("success") else "失败"
+        return {
+            "component": "VExpansionPanel",
             "content": [
                 {
-                    "component": "VCardTitle",
-                    "props": {"class": "text-h6"},
-                    "text": "M-Team 当前状态"
+                    "component": "VExpansionPanelTitle",
+                    "text": f"{record.get('time')} {record.get('account') or ''} {record.get('heading') or ''} "
+                            f"{status}，{trace_verdict(trace)}"
                 },
                 {
-                    "component": "VCardText",
+                    "component": "VExpansionPanelText",
                     "content": [
+                        {
+                            "component": "VDataTable",
+                            "props": {
+                                "headers": [
+                                    {"title": "阶段", "key": "stage"},
+                                    {"title": "时刻", "key": "time"},
+                                    {"title": "相对计划(ms)", "key": "offset_ms"},
+                                    {"title": "阶段耗时(ms)", "key": "delta_ms"}
+                                ],
+                                "items": trace_rows(trace),
+                                "density": "compact",
+                                "hide-default-footer": True
+                            }
+                        },
                         {
                             "component": "div",
-                            "props": {"class": "text-body-1"},
-                            "text": "暂无比赛数据。请先启用插件并配置 API Key。"
+                            "props": {"class": "text-caption mt-2"},
+                            "text": f"API地址：{trace.get('endpoint') or '-'}，尝试 {trace.get('attempts', 0)} 次"
                         }
                     ]
                 }
             ]
         }
-    ]
         # 插件关闭清理任务
     def stop_service(self) -> None:
-    """
-    插件停止时清理所有任务
-    """
-    try:
-        Scheduler().remove_plugin_jobs(self.__class__.__name__)
-        logger.info("M-Team 自动下注助手任务已停止")
-    except Exception as e:
-        logger.error("退出插件失败：%s" % str(e))
+        """
+        插件停止时清理所有任务
+        """
+        try:
+            game_feed.unsubscribe(self.__class__.__name__)
+            bet_timer.cancel_prefix(f"{self.__class__.__name__}_")
+            if self._dispatcher:
+                self._dispatcher.close()
+                self._dispatcher = None
+            for account in self._accounts:
+                account.close()
+            self._accounts = []
+            if self._history_store:
+                self._history_store.close()
+                self._history_store = None
+            async_engine.release(self.__class__.__name__)
+            self._prepared_bets.clear()
+            self._bet_plan = {}
+            logger.info("M-Team 自动下注助手任务已停止")
+        except Exception as e:
+            logger.error("退出插件失败：%s" % str(e))
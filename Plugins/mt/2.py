@@ -12,7 +12,8 @@ from app.helper.system import SystemHelper
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas import NotificationType
-from app.utils.http import RequestUtils
+
+from ..mteamapi import game_feed, GameEvent, ADDED, ODDS_CHANGED
 
 class BetGameNotify(_PluginBase):
     plugin_name = "BetGame比赛通知"
@@ -31,6 +32,11 @@ class BetGameNotify(_PluginBase):
     _notify = False
     _api_key = ""  # 存储API Key
 
+    _adaptive = False
+    _min_interval = 60
+    _max_interval = 3600
+    _hourly_budget = 30
+
     _scheduler: Optional[BackgroundScheduler] = None
 
     def init_plugin(self, config: dict = None):
@@ -42,45 +48,45 @@ class BetGameNotify(_PluginBase):
             self._cron = config.get("cron")
             self._notify = config.get("notify")
             self._api_key = config.get("api_key", "")  # 从配置中获取API Key
+            self._adaptive = config.get("adaptive", False)
+            self._min_interval = int(config.get("min_interval", 60))
+            self._max_interval = int(config.get("max_interval", 3600))
+            self._hourly_budget = int(config.get("hourly_budget", 30))
 
-    def __fetch_and_notify(self):
+        # 订阅共享的比赛事件源，只推送新出现或有变化的比赛；
+        # 自适应检查由事件源按最近的截止时间安排，否则按cron周期驱动检查
+        if self._enabled:
+            game_feed.subscribe(self.__class__.__name__, self.__on_game_events,
+                                api_key=self._api_key,
+                                proxies=settings.PROXY,
+                                auto_poll=self._adaptive,
+                                min_interval=self._min_interval,
+                                max_interval=self._max_interval,
+                                hourly_budget=self._hourly_budget)
+
+    @staticmethod
+    def __poll():
         """
-        获取新比赛并推送通知
+        按cron周期检查比赛，新比赛通过比赛事件推送
         """
-        # 请求获取比赛列表
-        response = self.__get_bet_game_list()
-        if response and response.get('code') == '0':
-            games = response.get('data', [])
-            for game in games:
-                # 生成比赛标题和内容
-                title = game.get('heading', '未知比赛')
-                endtime = game.get('endtime', '未知时间')
-                options_list = game.get('optionsList', [])
-                options = '\n'.join([f"{option['text']} - {option['odds']}" for option in options_list])
-
-                # 推送通知
-                self.__notify_game(title, endtime, options)
-        else:
+        if game_feed.poll() is None:
             logger.error("获取比赛列表失败或返回数据不正确")
 
-    def __get_bet_game_list(self) -> dict:
+    def __on_game_events(self, events: List[GameEvent]):
         """
-        调用API获取比赛列表
+        推送新出现或有变化的比赛
         """
-        url = "https://api.m-team.io/api/bet/findBetgameList"  # 主接口
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "x-api-key": self._api_key  # 使用配置中的API Key
-        }
-        data = {
-            "active": "LIVE",
-            "fix": 0
-        }
-        response = RequestUtils(
-            proxies=settings.PROXY,
-            headers=headers
-        ).post_res(url, data)
-        return response.json() if response else {}
+        for event in events:
+            if event.kind not in (ADDED, ODDS_CHANGED):
+                continue
+            game = event.game
+            # 生成比赛标题和内容
+            title = game.heading or '未知比赛'
+            endtime = game.end_text or '未知时间'
+            options = '\n'.join([f"{option.text} - {option.odds:g}" for option in game.options])
+
+            # 推送通知
+            self.__notify_game(title, endtime, options)
 
     def __notify_game(self, title: str, endtime: str, options: str):
         """
@@ -104,13 +110,13 @@ class BetGameNotify(_PluginBase):
         """
         注册插件公共服务
         """
-        if self._enabled and self._cron:
+        if self._enabled and self._cron and not self._adaptive:
             return [
                 {
                     "id": "BetGameNotify",
                     "name": "MT菠菜推送",
                     "trigger": CronTrigger.from_crontab(self._cron),
-                    "func": self.__fetch_and_notify,
+                    "func": self.__poll,
                     "kwargs": {}
                 }
             ]
@@ -200,6 +206,78 @@ class BetGameNotify(_PluginBase):
                                 ]
                             },
                         ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'adaptive',
+                                            'label': '自适应检查',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'min_interval',
+                                            'label': '最短检查间隔（秒）',
+                                            'placeholder': '60'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'max_interval',
+                                            'label': '最长检查间隔（秒）',
+                                            'placeholder': '3600'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'hourly_budget',
+                                            'label': '每小时检查上限',
+                                            'placeholder': '30'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
                     }
                 ]
             }
@@ -208,6 +286,10 @@ class BetGameNotify(_PluginBase):
             "notify": False,
             "cron": "0 9 * * *",
             "api_key": "",  # 默认空API Key
+            "adaptive": False,
+            "min_interval": 60,
+            "max_interval": 3600,
+            "hourly_budget": 30
         }
 
     
@@ -219,6 +301,7 @@ class BetGameNotify(_PluginBase):
         退出插件
         """
         try:
+            game_feed.unsubscribe(self.__class__.__name__)
             if self._scheduler:
                 self._scheduler.remove_all_jobs()
                 if self._scheduler.running:
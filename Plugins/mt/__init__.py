@@ -1,12 +1,11 @@
-import datetime
-import pytz
-from apscheduler.schedulers.background import BackgroundScheduler
+from typing import Any, List, Dict, Tuple
+
 from apscheduler.triggers.cron import CronTrigger
 from app.plugins import _PluginBase
 from app.schemas import NotificationType
-from app.utils.http import RequestUtils
 from app.log import logger
-from app.core.config import settings
+
+from ..mteamapi import Game, game_feed, GameEvent, ADDED, ODDS_CHANGED, CLOSING
 
 class BetGameNotify(_PluginBase):
     # 插件名称
@@ -30,7 +29,11 @@ class BetGameNotify(_PluginBase):
     _notify = False
     _cron = None
     _api_key = None
-    _scheduler: Optional[BackgroundScheduler] = None
+    _adaptive = False
+    _min_interval = 60
+    _max_interval = 3600
+    _hourly_budget = 30
+    _closing_minutes = 0
 
     def init_plugin(self, config: dict = None):
         """
@@ -44,44 +47,55 @@ class BetGameNotify(_PluginBase):
             self._notify = config.get("notify", False)
             self._cron = config.get("cron", "0 * * * *")  # 默认每小时检查一次
             self._api_key = config.get("api_key", "")
+            self._adaptive = config.get("adaptive", False)
+            self._min_interval = int(config.get("min_interval", 60))
+            self._max_interval = int(config.get("max_interval", 3600))
+            self._hourly_budget = int(config.get("hourly_budget", 30))
+            self._closing_minutes = int(config.get("closing_minutes", 0))
+
+        # 订阅共享的比赛事件源，只推送新出现或赔率有变化的比赛；
+        # 自适应检查由事件源按最近的截止时间安排，否则按cron周期驱动检查
+        if self._enabled:
+            game_feed.subscribe(self.__class__.__name__, self.__on_game_events,
+                                api_key=self._api_key,
+                                closing_window=self._closing_minutes * 60,
+                                auto_poll=self._adaptive,
+                                min_interval=self._min_interval,
+                                max_interval=self._max_interval,
+                                hourly_budget=self._hourly_budget)
 
-    def __fetch_game_data(self):
+    @staticmethod
+    def __poll():
         """
-        获取比赛信息并推送通知
+        按cron周期检查比赛，变化通过比赛事件推送
         """
-        if not self._enabled:
-            return
-
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "x-api-key": self._api_key
-        }
-
-        data = {
-            "active": "LIVE",
-            "fix": 0
-        }
+        if game_feed.poll() is None:
+            logger.error("获取比赛列表失败")
 
-        url = "https://api.m-team.io/api/bet/findBetgameList"
-        response = RequestUtils().post_res(url, headers=headers, data=data)
-
-        if response and response.json()['code'] == "0":
-            games = response.json().get('data', [])
-            for game in games:
-                self.__notify_game(game)
+    def __on_game_events(self, events: List[GameEvent]):
+        """
+        推送新出现、赔率变化及即将截止的比赛
+        """
+        for event in events:
+            if event.kind in (ADDED, ODDS_CHANGED):
+                self.__notify_game(event.game)
+            elif event.kind == CLOSING:
+                self.__notify_game(event.game, closing=True)
 
-    def __notify_game(self, game):
+    def __notify_game(self, game: Game, closing: bool = False):
         """
         推送比赛信息
         """
         if not self._notify:
             return
 
-        heading = game.get('heading', '无标题')
-        options = game.get('optionsList', [])
-        odds = "\n".join([f"{option['text']}: {option['odds']}" for option in options])
+        heading = game.heading or '无标题'
+        odds = "\n".join([f"{option.text}: {option.odds:g}" for option in game.options])
 
-        message = f"【比赛信息】\n{heading}\n赔率:\n{odds}"
+        if closing:
+            message = f"【即将截止】\n{heading}\n截止时间: {game.end_text}\n赔率:\n{odds}"
+        else:
+            message = f"【比赛信息】\n{heading}\n赔率:\n{odds}"
 
         # 推送通知
         self.post_message(
@@ -94,13 +108,13 @@ class BetGameNotify(_PluginBase):
         """
         获取定时任务服务配置
         """
-        if self._enabled and self._cron:
+        if self._enabled and self._cron and not self._adaptive:
             return [
                 {
                     "id": "BetGameNotify",
                     "name": "比赛信息检查服务",
                     "trigger": CronTrigger.from_crontab(self._cron),
-                    "func": self.__fetch_game_data,
+                    "func": self.__poll,
                     "kwargs": {}
                 }
             ]
@@ -182,6 +196,97 @@ class BetGameNotify(_PluginBase):
                                         }
                                     }
                                 ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'adaptive',
+                                            'label': '自适应检查',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'min_interval',
+                                            'label': '最短检查间隔（秒）',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'max_interval',
+                                            'label': '最长检查间隔（秒）',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'hourly_budget',
+                                            'label': '每小时检查上限',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
+                    },
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'closing_minutes',
+                                            'label': '截止提醒（分钟）',
+                                            'hint': '比赛截止前N分钟推送提醒，0为不提醒',
+                                            'persistent-hint': True,
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
                             }
                         ]
                     }
@@ -191,7 +296,12 @@ class BetGameNotify(_PluginBase):
             "enabled": False,
             "notify": False,
             "api_key": "",
-            "cron": "0 * * * *"  # 默认每小时检查一次
+            "cron": "0 * * * *",  # 默认每小时检查一次
+            "adaptive": False,
+            "min_interval": 60,
+            "max_interval": 3600,
+            "hourly_budget": 30,
+            "closing_minutes": 0
         }
 
     def stop_service(self):
@@ -199,11 +309,7 @@ class BetGameNotify(_PluginBase):
         退出插件
         """
         try:
-            if self._scheduler:
-                self._scheduler.remove_all_jobs()
-                if self._scheduler.running:
-                    self._scheduler.shutdown()
-                self._scheduler = None
+            game_feed.unsubscribe(self.__class__.__name__)
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
 
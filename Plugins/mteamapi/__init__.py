@@ -0,0 +1,24 @@
+# M-Team API 公共组件，供菠菜相关插件共用
+
+from .session import SessionPool
+from .hedge import Hedger, request_not_sent
+from .health import EndpointHealth, endpoint_health, MTEAM_API_URLS
+from .models import Game, Option, parse_games, parse_deadline
+from .diff import GameDiff, diff_games
+from .poller import AdaptivePoller
+from .budget import run_within
+from .dispatcher import BetDispatcher, BET_WORKERS
+from .clock import ClockSync, clock_sync
+from .history import BetHistoryStore
+from .snapshot import SnapshotStore
+from .jsonlib import decode_json, JSON_BACKEND
+from .client import GameListClient, game_list_client
+from .feed import GameFeed, GameEvent, game_feed, ADDED, ODDS_CHANGED, CLOSING, REMOVED
+from .state import GameState
+from .ratelimit import RateLimiter, rate_limiter, BET, ODDS, POLL, NOTIFY, PRIORITY_NAMES
+from .retry import DeadlineRetry, RETRY_STATUS
+from .aio import AsyncEngine, AsyncResponse, async_engine, AIO_AVAILABLE
+from .accounts import Account, parse_accounts, account_summary, STRATEGIES
+from .timer import DeadlineTimer, bet_timer
+from .metrics import Metrics, metrics, PROMETHEUS_CONTENT_TYPE, BET_REQUEST_SECONDS, BET_DEADLINE_SLACK_SECONDS
+from .trace import BetTrace, tracing, trace_rows, trace_segments, trace_verdict, STARTED, CONNECTED, SENT, ACKED
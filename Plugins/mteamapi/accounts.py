@@ -0,0 +1,101 @@
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from .models import Game, Option
+from .session import SessionPool
+
+logger = logging.getLogger(__name__)
+
+# 下注策略：选择哪个投注选项
+STRATEGIES = {"first": "第一个选项", "best": "最高赔率", "favorite": "最低赔率"}
+
+
+class Account:
+    """
+    下注账号：API Key、下注金额、选项策略，以及账号独享的长连接池
+    """
+
+    __slots__ = ("name", "api_key", "bonus", "strategy", "pool")
+
+    def __init__(self, name: str, api_key: str, bonus: Any, strategy: str = "first",
+                 pool_size: int = 4, idle_timeout: int = 60):
+        self.name = name
+        self.api_key = api_key
+        self.bonus = bonus
+        self.strategy = strategy if strategy in STRATEGIES else "first"
+        self.pool = SessionPool(pool_size=pool_size, idle_timeout=idle_timeout)
+
+    @property
+    def headers(self) -> Dict[str, str]:
+        return {
+            "Content-Type": "application/x-www-form-urlencoded",
+            "x-api-key": self.api_key
+        }
+
+    def choose(self, game: Game) -> Optional[Option]:
+        """
+        按账号策略选择投注选项
+        """
+        if not game.options:
+            return None
+        if self.strategy == "best":
+            return game.best_option()
+        if self.strategy == "favorite":
+            return min(game.options, key=lambda option: option.odds)
+        return game.options[0]
+
+    def signature(self) -> List[Any]:
+        """
+        影响下注计划的配置，用于判断快照中的计划是否仍然有效
+        """
+        return [self.name, str(self.bonus), self.strategy]
+
+    def close(self):
+        self.pool.close()
+
+
+def parse_accounts(text: Optional[str], default_key: str, default_bonus: Any, default_strategy: str = "first",
+                   pool_size: int = 4, idle_timeout: int = 60) -> List[Account]:
+    """
+    解析账号配置，每行一个账号：名称|API Key|下注金额|策略，下注金额与策略可省略；
+    未配置账号时以插件的 API Key 与下注金额作为唯一账号
+    """
+    accounts: List[Account] = []
+    for number, line in enumerate((text or "").splitlines(), start=1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [part.strip() for part in line.split("|")]
+        if len(parts) < 2 or not parts[1]:
+            logger.warning(f"账号配置第 {number} 行缺少 API Key，已忽略")
+            continue
+        name = parts[0] or f"账号{len(accounts) + 1}"
+        if any(account.name == name for account in accounts):
+            logger.warning(f"账号配置第 {number} 行名称 {name} 重复，已忽略")
+            continue
+        bonus = default_bonus
+        if len(parts) > 2 and parts[2]:
+            try:
+                bonus = type(default_bonus)(parts[2])
+            except ValueError:
+                logger.warning(f"账号 {name} 的下注金额无效，使用默认金额")
+        strategy = parts[3] if len(parts) > 3 and parts[3] in STRATEGIES else default_strategy
+        accounts.append(Account(name, parts[1], bonus, strategy, pool_size=pool_size, idle_timeout=idle_timeout))
+    if not accounts and default_key:
+        accounts.append(Account("默认", default_key, default_bonus, default_strategy,
+                                pool_size=pool_size, idle_timeout=idle_timeout))
+    return accounts
+
+
+def account_summary(records: Iterable[dict]) -> str:
+    """
+    按账号统计下注记录的成功数
+    """
+    stats: Dict[str, List[int]] = {}
+    for record in records:
+        counts = stats.setdefault(record.get("account") or "默认", [0, 0])
+        counts[0] += int(bool(record.get("success")))
+        counts[1] += 1
+    if not stats:
+        return "暂无下注记录"
+    return "，".join(f"{name} 成功 {ok}/{total}" for name, (ok, total) in stats.items())
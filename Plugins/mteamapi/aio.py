@@ -0,0 +1,233 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Coroutine, Dict, Optional, Set, Tuple
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .health import endpoint_health
+from .ratelimit import rate_limiter, ODDS
+from .trace import BetTrace, CONNECTED, SENT, FIRST_BYTE
+
+# 安装了 aiohttp 时才能启用异步引擎
+AIO_AVAILABLE = aiohttp is not None
+
+
+class AsyncResponse:
+    """
+    异步请求读取完毕后的响应，与 requests.Response 一样提供状态码、响应头与原始内容
+    """
+
+    __slots__ = ("status_code", "headers", "content")
+
+    def __init__(self, status_code: int, headers: Dict[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def text(self) -> str:
+        return self.content.decode("utf-8", errors="replace")
+
+
+def _proxy_url(proxies: Optional[dict]) -> Optional[str]:
+    """
+    aiohttp 只接受单个代理地址，优先使用https代理
+    """
+    if not proxies:
+        return None
+    return proxies.get("https") or proxies.get("http")
+
+
+class AsyncEngine:
+    """
+    异步请求引擎：在独立的事件循环线程上以协程执行比赛列表请求、赔率刷新与下注，
+    所有请求共用一个 aiohttp 会话，大量同时截止的下注只占用一个线程
+    """
+
+    def __init__(self, limit: int = 100):
+        # 会话的最大并发连接数
+        self._limit = max(int(limit), 1)
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._users: Set[str] = set()
+        # 以下状态只在事件循环线程中读写
+        self._session = None
+        self._active = 0
+        self._peak = 0
+        self._completed = 0
+        # 各API地址最近一次预热成功的时间
+        self._warmed: Dict[str, float] = {}
+
+    @property
+    def running(self) -> bool:
+        return self._loop is not None
+
+    def in_loop(self) -> bool:
+        """
+        当前线程是否为事件循环线程，在其中不能同步等待协程的结果
+        """
+        return self._thread is not None and threading.current_thread() is self._thread
+
+    def use(self, name: str) -> bool:
+        """
+        登记使用引擎的插件，首次使用时启动事件循环线程；未安装 aiohttp 时返回False
+        """
+        if not AIO_AVAILABLE:
+            return False
+        with self._lock:
+            self._users.add(name)
+            if self._loop is None:
+                loop = asyncio.new_event_loop()
+                ready = threading.Event()
+                thread = threading.Thread(target=self.__run_loop, args=(loop, ready),
+                                          name="mteam-aio", daemon=True)
+                thread.start()
+                ready.wait()
+                self._loop, self._thread = loop, thread
+        return True
+
+    def release(self, name: str):
+        """
+        注销插件，没有插件使用时关闭会话并停止事件循环
+        """
+        with self._lock:
+            self._users.discard(name)
+            if self._users or self._loop is None:
+                return
+            loop, thread = self._loop, self._thread
+            self._loop = self._thread = None
+            # 等待旧循环清理完毕，避免与随后重新启动的循环争用会话
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout=5)
+
+    def __run_loop(self, loop: asyncio.AbstractEventLoop, ready: threading.Event):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+        # 停止后取消未完成的协程并关闭会话
+        tasks = asyncio.all_tasks(loop)
+        for task in tasks:
+            task.cancel()
+        loop.run_until_complete(asyncio.gather(*tasks, return_exceptions=True))
+        if self._session:
+            loop.run_until_complete(self._session.close())
+            self._session = None
+        loop.close()
+
+    def submit(self, coro: Coroutine) -> Future:
+        """
+        把协程交给事件循环执行，返回可在其它线程等待的Future
+        """
+        loop = self._loop
+        if loop is None:
+            coro.close()
+            raise RuntimeError("异步引擎未启动")
+        return asyncio.run_coroutine_threadsafe(self.__track(coro), loop)
+
+    async def __track(self, coro: Coroutine) -> Any:
+        self._active += 1
+        self._peak = max(self._peak, self._active)
+        try:
+            return await coro
+        finally:
+            self._active -= 1
+            self._completed += 1
+
+    async def offload(self, func: Callable, *args) -> Any:
+        """
+        在线程池中执行阻塞调用（写历史、发通知），不占用事件循环
+        """
+        return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+    def __session(self):
+        if self._session is None or self._session.closed:
+            # 新会话没有已建立的连接
+            self._warmed.clear()
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self._limit, keepalive_timeout=60),
+                trace_configs=[self.__trace_config()]
+            )
+        return self._session
+
+    @staticmethod
+    def __trace_config():
+        """
+        请求携带 BetTrace 时记录取得连接、发出请求与收到响应头的时刻
+        """
+        def marker(stage: str):
+            async def on_event(session, context, params):
+                trace = context.trace_request_ctx
+                if isinstance(trace, BetTrace):
+                    trace.mark(stage)
+            return on_event
+
+        config = aiohttp.TraceConfig()
+        config.on_connection_create_end.append(marker(CONNECTED))
+        config.on_connection_reuseconn.append(marker(CONNECTED))
+        # 旧版本 aiohttp 没有请求头发出事件，以请求体发出时刻代替
+        sent = getattr(config, "on_request_headers_sent", None) or config.on_request_chunk_sent
+        sent.append(marker(SENT))
+        config.on_request_end.append(marker(FIRST_BYTE))
+        return config
+
+    async def post(self, base_url: str, path: str, headers: dict, data: dict,
+                   proxies: Optional[dict] = None, timeout: Tuple[float, float] = (5, 30),
+                   trace: Optional[BetTrace] = None) -> AsyncResponse:
+        """
+        发送POST请求并读取完整响应，同时记录API地址的健康状况；超时为(连接超时, 读取超时)，
+        与 requests 一致，整个请求以二者之和为总时限；trace 用于记录下注时间线
+        """
+        connect, read = timeout
+        start = time.monotonic()
+        try:
+            async with self.__session().post(f"{base_url}{path}", headers=headers, data=data,
+                                             proxy=_proxy_url(proxies), trace_request_ctx=trace,
+                                             timeout=aiohttp.ClientTimeout(total=connect + read, connect=connect)) as res:
+                response = AsyncResponse(res.status, dict(res.headers), await res.read())
+        except Exception:
+            endpoint_health.record(base_url, time.monotonic() - start, False)
+            raise
+        endpoint_health.record(base_url, time.monotonic() - start, response.status_code < 500)
+        return response
+
+    async def warm_up(self, base_url: str, proxies: Optional[dict] = None, timeout: float = 5,
+                      max_age: float = 0) -> bool:
+        """
+        预热连接，建立的连接保留在会话的连接池中；max_age 秒内已预热过同一地址时不再重复请求
+        """
+        warmed_at = self._warmed.get(base_url)
+        if max_age > 0 and warmed_at is not None and time.monotonic() - warmed_at < max_age:
+            return True
+        if not rate_limiter.acquire(ODDS, timeout=0):
+            return False
+        try:
+            async with self.__session().head(base_url, proxy=_proxy_url(proxies), allow_redirects=False,
+                                             timeout=aiohttp.ClientTimeout(total=timeout)):
+                pass
+        except Exception:
+            return False
+        self._warmed[base_url] = time.monotonic()
+        return True
+
+    def stats(self) -> Dict[str, int]:
+        """
+        正在执行、峰值并发与已完成的协程数
+        """
+        return {"active": self._active, "peak": self._peak, "completed": self._completed}
+
+    def summary(self) -> str:
+        if not self.running:
+            return "异步引擎未启用"
+        stats = self.stats()
+        return (f"异步引擎：执行中 {stats['active']}，峰值并发 {stats['peak']}，"
+                f"已完成 {stats['completed']}")
+
+
+# 所有插件共用的异步引擎，按需启动
+async_engine = AsyncEngine()
@@ -0,0 +1,18 @@
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+# 限时调用使用的共享线程池，超时的调用在后台自行结束
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mteam-budget")
+
+
+def run_within(func: Callable[[], Any], budget: float) -> Optional[Any]:
+    """
+    在时间预算内执行调用，超时或出错时返回None，不阻塞调用方
+    """
+    future = _executor.submit(func)
+    try:
+        return future.result(timeout=max(budget, 0))
+    except FutureTimeoutError:
+        return None
+    except Exception:
+        return None
@@ -0,0 +1,233 @@
+import asyncio
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .aio import async_engine
+from .clock import clock_sync
+from .health import endpoint_health
+from .hedge import Hedger
+from .jsonlib import decode_json
+from .metrics import metrics, LIST_FETCH_SECONDS, LIST_PAYLOAD_BYTES, LIST_GAMES
+from .models import Game, parse_games
+from .ratelimit import rate_limiter, POLL
+from .session import SessionPool
+
+
+class GameListClient:
+    """
+    findBetgameList 的共享客户端：各插件共用同一份比赛列表，
+    有效期内直接返回缓存，同时发起的请求合并为一次实际请求；
+    启用异步引擎时请求以协程在事件循环上执行，线程与协程共用缓存与进行中的请求
+    """
+
+    def __init__(self, ttl: float = 10, pool_size: int = 2):
+        self.ttl = ttl
+        self._pool = SessionPool(pool_size=pool_size)
+        self._lock = Lock()
+        self._games: Optional[List[Game]] = None
+        self._fetched_at = 0.0
+        self._inflight: Optional[Future] = None
+        self._hits = 0
+        self._misses = 0
+        self._coalesced = 0
+
+    def fetch(self, api_key: str, proxies: Optional[dict] = None, timeout: Optional[float] = 30,
+              max_age: Optional[float] = None, hedger: Optional[Hedger] = None,
+              kind: str = POLL, on_request: Optional[Callable[[], None]] = None) -> Optional[List[Game]]:
+        """
+        获取LIVE比赛列表，max_age 为可接受的缓存时长（默认为ttl，0表示不使用已完成的缓存），
+        kind 为限速类别，请求失败或被限速丢弃时返回None；
+        on_request 在每次实际发出请求时调用（命中缓存、合并等待与被限速丢弃时不调用）
+        """
+        games, flight, leader = self.__join(max_age)
+        if flight is None:
+            return games
+        if not leader:
+            # 已有相同请求在进行，等待其结果
+            try:
+                return flight.result(timeout=timeout)
+            except FutureTimeoutError:
+                return None
+        games = None
+        try:
+            if async_engine.running and not async_engine.in_loop():
+                # 列表请求交给异步引擎执行，与下注共用事件循环与 aiohttp 会话
+                games = async_engine.submit(self.__load_async(api_key, proxies, timeout, kind, on_request)).result()
+            else:
+                games = self.__load(api_key, proxies, timeout, hedger, kind, on_request)
+        except Exception:
+            games = None
+        finally:
+            self.__land(flight, games)
+        return games
+
+    async def fetch_async(self, api_key: str, proxies: Optional[dict] = None, timeout: Optional[float] = 30,
+                          max_age: Optional[float] = None, kind: str = POLL) -> Optional[List[Game]]:
+        """
+        fetch 的协程版本，在异步引擎的事件循环中调用，与 fetch 共用缓存并合并同时发起的请求；
+        调用方超时取消时请求继续进行，结果仍写入缓存
+        """
+        games, flight, leader = self.__join(max_age)
+        if flight is None:
+            return games
+        if leader:
+            task = asyncio.ensure_future(self.__load_async(api_key, proxies, timeout, kind, None))
+            task.add_done_callback(
+                lambda done: self.__land(flight, None if done.cancelled() or done.exception() else done.result())
+            )
+        return await asyncio.shield(asyncio.wrap_future(flight))
+
+    def __join(self, max_age: Optional[float]) -> Tuple[Optional[List[Game]], Optional[Future], bool]:
+        """
+        命中缓存时返回缓存的列表；否则返回进行中的请求，没有时新建并由调用方负责发出请求
+        """
+        max_age = self.ttl if max_age is None else max_age
+        with self._lock:
+            if self._games is not None and time.monotonic() - self._fetched_at <= max_age:
+                self._hits += 1
+                return self._games, None, False
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                flight = self._inflight = Future()
+                self._misses += 1
+            else:
+                self._coalesced += 1
+            return None, flight, leader
+
+    def __land(self, flight: Future, games: Optional[List[Game]]):
+        """
+        请求结束：成功时更新缓存，唤醒等待同一请求的线程与协程
+        """
+        with self._lock:
+            if games is not None:
+                self._games = games
+                self._fetched_at = time.monotonic()
+            self._inflight = None
+        flight.set_result(games)
+
+    def __load(self, api_key: str, proxies: Optional[dict], timeout: Optional[float],
+               hedger: Optional[Hedger], kind: str,
+               on_request: Optional[Callable[[], None]]) -> Optional[List[Game]]:
+        """
+        按健康状况依次请求各API地址，启用对冲时主地址在延迟内未返回则并发请求备用地址
+        """
+        urls = endpoint_health.ordered()
+        if hedger and len(urls) > 1:
+            games, _ = hedger.race(
+                "poll",
+                lambda: self.__request(urls[0], api_key, proxies, timeout, kind, on_request),
+                lambda: self.__request(urls[1], api_key, proxies, timeout, kind, on_request),
+                accept=lambda result: result is not None
+            )
+            return games
+        for url in urls:
+            games = self.__request(url, api_key, proxies, timeout, kind, on_request)
+            if games is not None:
+                return games
+        return None
+
+    def __request(self, base_url: str, api_key: str, proxies: Optional[dict],
+                  timeout: Optional[float], kind: str,
+                  on_request: Optional[Callable[[], None]]) -> Optional[List[Game]]:
+        if not rate_limiter.acquire(kind):
+            return None
+        if on_request:
+            on_request()
+        start = time.monotonic()
+        sent_at = time.time()
+        try:
+            res = self._pool.get(base_url).post(
+                f"{base_url}/api/bet/findBetgameList",
+                headers={
+                    "Content-Type": "application/x-www-form-urlencoded",
+                    "x-api-key": api_key
+                },
+                data={"active": "LIVE", "fix": 0},
+                proxies=proxies,
+                timeout=timeout
+            )
+        except Exception:
+            endpoint_health.record(base_url, time.monotonic() - start, False)
+            return None
+        elapsed = time.monotonic() - start
+        endpoint_health.record(base_url, elapsed, res.status_code < 500)
+        return self.__parse(base_url, res, elapsed, sent_at)
+
+    async def __load_async(self, api_key: str, proxies: Optional[dict], timeout: Optional[float], kind: str,
+                           on_request: Optional[Callable[[], None]]) -> Optional[List[Game]]:
+        """
+        __load 的协程版本，按健康状况依次请求各API地址；异步请求不做对冲
+        """
+        for url in endpoint_health.ordered():
+            games = await self.__request_async(url, api_key, proxies, timeout, kind, on_request)
+            if games is not None:
+                return games
+        return None
+
+    async def __request_async(self, base_url: str, api_key: str, proxies: Optional[dict],
+                              timeout: Optional[float], kind: str,
+                              on_request: Optional[Callable[[], None]]) -> Optional[List[Game]]:
+        # 限速器会阻塞等待令牌，放到线程池中执行，不占用事件循环
+        if not await async_engine.offload(rate_limiter.acquire, kind):
+            return None
+        if on_request:
+            on_request()
+        timeout = 30 if timeout is None else timeout
+        start = time.monotonic()
+        sent_at = time.time()
+        try:
+            res = await async_engine.post(base_url, "/api/bet/findBetgameList",
+                                          headers={
+                                              "Content-Type": "application/x-www-form-urlencoded",
+                                              "x-api-key": api_key
+                                          },
+                                          data={"active": "LIVE", "fix": 0},
+                                          proxies=proxies,
+                                          timeout=(min(timeout, 5), max(timeout - 5, 0)))
+        except Exception:
+            return None
+        return self.__parse(base_url, res, time.monotonic() - start, sent_at)
+
+    @staticmethod
+    def __parse(base_url: str, res: Any, elapsed: float, sent_at: float) -> Optional[List[Game]]:
+        """
+        解析列表响应并记录指标，requests 与异步引擎的响应都适用
+        """
+        metrics.observe(LIST_FETCH_SECONDS, elapsed, endpoint=base_url)
+        # 借助列表请求的Date头校准服务器时钟
+        clock_sync.observe(res.headers.get("Date"), sent_at, time.time())
+        if res.status_code != 200:
+            return None
+        try:
+            result = decode_json(res)
+        except ValueError:
+            return None
+        if not result.get("success") and str(result.get("code")) != "0":
+            return None
+        games = parse_games(result.get("data"))
+        metrics.observe(LIST_PAYLOAD_BYTES, len(res.content))
+        metrics.observe(LIST_GAMES, len(games))
+        return games
+
+    def stats(self) -> Dict[str, int]:
+        """
+        缓存命中、实际请求与合并等待的次数
+        """
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "coalesced": self._coalesced}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        total = sum(stats.values())
+        if not total:
+            return "暂无请求"
+        saved = stats["hits"] + stats["coalesced"]
+        return (f"共享比赛列表：命中缓存 {stats['hits']} 次，合并等待 {stats['coalesced']} 次，"
+                f"实际请求 {stats['misses']} 次，节省 {saved / total:.0%}")
+
+
+# 所有插件共用的比赛列表客户端
+game_list_client = GameListClient()
@@ -0,0 +1,37 @@
+from typing import Dict, List
+
+from .models import Game
+
+
+class GameDiff:
+    """
+    两次同步之间比赛列表的差异
+    """
+
+    def __init__(self):
+        self.added: List[Game] = []
+        self.changed: List[Game] = []
+        self.removed: List[Game] = []
+        self.unchanged: int = 0
+
+    def summary(self) -> str:
+        return f"新增 {len(self.added)}，变更 {len(self.changed)}，移除 {len(self.removed)}，未变 {self.unchanged}"
+
+
+def diff_games(old: Dict[str, Game], new: List[Game]) -> GameDiff:
+    """
+    按比赛ID比较新旧比赛列表，以内容摘要判断比赛是否变更
+    """
+    diff = GameDiff()
+    seen = set()
+    for game in new:
+        seen.add(game.id)
+        previous = old.get(game.id)
+        if previous is None:
+            diff.added.append(game)
+        elif previous.digest != game.digest:
+            diff.changed.append(game)
+        else:
+            diff.unchanged += 1
+    diff.removed = [game for key, game in old.items() if key not in seen]
+    return diff
@@ -0,0 +1,232 @@
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta
+from threading import Lock
+from typing import Any, Callable, Deque, Dict, List, Optional, Tuple
+
+# 所有插件的下注调度器共用的线程池，线程数固定，不随插件与批次数量增长
+BET_WORKERS = 16
+_bet_executor = ThreadPoolExecutor(max_workers=BET_WORKERS, thread_name_prefix="mteam-bet")
+
+
+class _Batch:
+    """
+    同一时刻触发的一批下注
+    """
+
+    def __init__(self, job_id: str, fire_time: datetime):
+        self.job_id = job_id
+        self.fire_time = fire_time
+        self.entries: Dict[str, Tuple[Callable, tuple]] = {}
+
+
+class _Run:
+    """
+    正在执行的一批下注：开始时间、触发延迟与各笔耗时，最后一笔完成时记录统计
+    """
+
+    def __init__(self, size: int, started: float, lateness: float):
+        self.size = size
+        self.started = started
+        self.lateness = lateness
+        self.remaining = size
+        self.durations: List[float] = []
+
+
+class BetDispatcher:
+    """
+    合并下注：触发时间落在同一窗口内的下注合并为一个调度任务，在有限并发下同时发送，
+    使整批耗时取决于最慢的请求而不是所有请求之和
+    """
+
+    def __init__(self, schedule: Callable[[str, Callable, datetime], Any],
+                 unschedule: Optional[Callable[[str], Any]] = None,
+                 window: float = 0.2, max_parallel: int = 8, job_prefix: str = "bet_batch",
+                 prepare: Optional[Callable[[], Any]] = None):
+        # 添加与移除调度任务的方法，由插件按自身使用的调度器提供
+        self._schedule = schedule
+        self._unschedule = unschedule
+        # 每批下注发出前执行一次（如刷新赔率），同一批下注共用其结果
+        self._prepare = prepare
+        self._window = timedelta(seconds=max(float(window), 0.0))
+        self._job_prefix = job_prefix
+        # 本调度器同时执行的下注数上限，超出的下注排队，由先完成的下注接续发出
+        self._max_parallel = max(int(max_parallel), 1)
+        self._running = 0
+        self._queue: Deque[Tuple[_Run, Callable, tuple]] = deque()
+        self._batches: Dict[str, _Batch] = {}
+        # 下注所在的批次
+        self._index: Dict[str, str] = {}
+        self._seq = 0
+        self._stats = deque(maxlen=50)
+        self._lock = Lock()
+
+    def submit(self, key: str, fire_time: datetime, func: Callable, *args) -> str:
+        """
+        安排一笔下注，已存在相同标识的下注时先取消；返回所在批次的任务ID
+        """
+        self.cancel(key)
+        with self._lock:
+            batch = self.__find_batch(fire_time)
+            if not batch:
+                self._seq += 1
+                batch = _Batch(f"{self._job_prefix}_{self._seq}", fire_time)
+                self._batches[batch.job_id] = batch
+            batch.entries[key] = (func, args)
+            self._index[key] = batch.job_id
+            job_id = batch.job_id
+            # 新建的批次需要安排调度任务
+            reschedule = len(batch.entries) == 1
+        if reschedule:
+            self._schedule(job_id, lambda: self.__run_batch(job_id), batch.fire_time)
+        return job_id
+
+    def __find_batch(self, fire_time: datetime) -> Optional[_Batch]:
+        """
+        查找可并入的批次：批次触发时间不晚于本笔下注且相差不超过窗口，保证下注不会被推迟
+        """
+        for batch in self._batches.values():
+            if batch.fire_time <= fire_time <= batch.fire_time + self._window:
+                return batch
+        return None
+
+    def cancel(self, key: str) -> bool:
+        """
+        取消一笔下注，批次清空后同时移除调度任务
+        """
+        with self._lock:
+            job_id = self._index.pop(key, None)
+            batch = self._batches.get(job_id) if job_id else None
+            if not batch:
+                return False
+            batch.entries.pop(key, None)
+            empty = not batch.entries
+            if empty:
+                self._batches.pop(job_id, None)
+        if empty and self._unschedule:
+            try:
+                self._unschedule(job_id)
+            except Exception:
+                pass
+        return True
+
+    def __run_batch(self, job_id: str):
+        """
+        取出到期的批次交给共享线程池执行后立即返回，不占用定时器线程等待下注完成
+        """
+        with self._lock:
+            batch = self._batches.pop(job_id, None)
+            if not batch:
+                return
+            for key in batch.entries:
+                self._index.pop(key, None)
+        started = time.time()
+        run = _Run(len(batch.entries), started, started - batch.fire_time.timestamp())
+        entries = list(batch.entries.values())
+        if self._prepare:
+            _bet_executor.submit(self.__prepare_and_start, run, entries)
+        else:
+            self.__start(run, entries)
+
+    def __prepare_and_start(self, run: _Run, entries: List[Tuple[Callable, tuple]]):
+        try:
+            self._prepare()
+        except Exception:
+            pass
+        self.__start(run, entries)
+
+    def __start(self, run: _Run, entries: List[Tuple[Callable, tuple]]):
+        with self._lock:
+            self._queue.extend((run, func, args) for func, args in entries)
+        self.__pump()
+
+    def __pump(self):
+        """
+        在并发上限内从队列中取出下注，交给共享线程池执行
+        """
+        ready = []
+        with self._lock:
+            while self._queue and self._running < self._max_parallel:
+                ready.append(self._queue.popleft())
+                self._running += 1
+        for run, func, args in ready:
+            _bet_executor.submit(self.__execute, run, func, args)
+
+    def __execute(self, run: _Run, func: Callable, args: tuple):
+        begin = time.monotonic()
+        result = None
+        try:
+            result = func(*args)
+        except Exception:
+            pass
+        finally:
+            with self._lock:
+                self._running -= 1
+            if isinstance(result, Future):
+                # 异步下注立即返回，在事件循环中执行完毕时记录耗时，不占用线程等待
+                result.add_done_callback(lambda _: self.__finish(run, time.monotonic() - begin))
+            else:
+                self.__finish(run, time.monotonic() - begin)
+            self.__pump()
+
+    def __finish(self, run: _Run, duration: float):
+        """
+        记录一笔下注的耗时，整批完成时记录批次统计
+        """
+        with self._lock:
+            run.durations.append(duration)
+            run.remaining -= 1
+            if run.remaining > 0:
+                return
+            self._stats.append({
+                "time": datetime.fromtimestamp(run.started).strftime("%Y-%m-%d %H:%M:%S"),
+                "size": run.size,
+                "lateness_ms": round(run.lateness * 1000),
+                "elapsed_ms": round((time.time() - run.started) * 1000),
+                "slowest_ms": round(max(run.durations, default=0) * 1000),
+                "total_ms": round(sum(run.durations) * 1000)
+            })
+
+    def configure(self, max_parallel: int):
+        """
+        调整同时发送的下注数上限，排队中的下注按新的上限发出
+        """
+        with self._lock:
+            self._max_parallel = max(int(max_parallel), 1)
+        self.__pump()
+
+    @property
+    def pending(self) -> int:
+        """
+        待执行的下注数
+        """
+        return len(self._index)
+
+    def summary(self) -> str:
+        """
+        并发上限与线程占用：下注在共享线程池中执行，线程总数不随插件与批次数量增长
+        """
+        return (f"同时下注上限 {self._max_parallel} 笔，正在执行 {self._running} 笔，"
+                f"各插件共用 {BET_WORKERS} 个下注线程")
+
+    def stats(self) -> List[dict]:
+        """
+        最近批次的统计：笔数、触发延迟、整批耗时、最慢一笔与逐笔耗时之和
+        """
+        return list(self._stats)
+
+    def close(self):
+        """
+        清空待执行的批次，已开始执行的批次继续完成
+        """
+        with self._lock:
+            job_ids = list(self._batches)
+            self._batches.clear()
+            self._index.clear()
+        if self._unschedule:
+            for job_id in job_ids:
+                try:
+                    self._unschedule(job_id)
+                except Exception:
+                    pass
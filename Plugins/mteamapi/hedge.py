@@ -0,0 +1,109 @@
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from threading import Lock
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import requests
+from urllib3.exceptions import NewConnectionError, ConnectTimeoutError
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+# 所有对冲器共用的线程池，落选的请求在后台自行结束
+_hedge_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="mteam-hedge")
+
+
+def request_not_sent(exc: Exception) -> bool:
+    """
+    判断请求异常是否发生在连接建立阶段，此时请求内容一定没有发出，可安全地改用其它地址重发
+    """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return True
+    if isinstance(exc, requests.exceptions.ConnectionError):
+        reason = getattr(exc.args[0], "reason", None) if exc.args else None
+        return isinstance(reason, (NewConnectionError, ConnectTimeoutError))
+    if aiohttp:
+        # 异步引擎的连接失败与连接超时
+        return isinstance(exc, (aiohttp.ClientConnectorError, getattr(aiohttp, "ConnectionTimeoutError", ())))
+    return False
+
+
+class Hedger:
+    """
+    对冲请求：主地址在指定延迟内未成功返回时，向备用地址发出同样的请求，采用先成功返回的结果
+    """
+
+    def __init__(self, delay: float = 1.0):
+        # 触发备用请求前等待主请求的秒数
+        self.delay = max(float(delay), 0.0)
+        self._stats: Dict[str, Dict[str, int]] = {}
+        self._lock = Lock()
+
+    def race(self, kind: str, primary: Callable[[], Any], backup: Callable[[], Any],
+             accept: Callable[[Any], bool] = bool) -> Tuple[Optional[Any], int]:
+        """
+        幂等请求的对冲，返回结果及其来源（0为主地址，1为备用地址，-1为均失败）
+        """
+        futures = [_hedge_executor.submit(primary)]
+        done, _ = wait(futures, timeout=self.delay)
+        if done:
+            result = self.__result(futures[0])
+            if accept(result):
+                self.__record(kind, hedged=False, won=False)
+                return result, 0
+        # 主请求未在延迟内成功，发出备用请求并采用先成功的结果
+        futures.append(_hedge_executor.submit(backup))
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = self.__result(future)
+                if accept(result):
+                    index = futures.index(future)
+                    self.__record(kind, hedged=True, won=index == 1)
+                    return result, index
+        self.__record(kind, hedged=True, won=False)
+        return None, -1
+
+    def failover_unsent(self, kind: str, primary: Callable[[Optional[float]], Any],
+                        backup: Callable[[Optional[float]], Any]) -> Tuple[Optional[Any], int]:
+        """
+        非幂等请求（下注）的对冲：主地址以对冲延迟作为连接超时，只有在确认请求未发出时才立即改发备用地址，
+        保证同一笔下注不会被两个地址同时受理
+        """
+        try:
+            result = primary(self.delay)
+            self.__record(kind, hedged=False, won=False)
+            return result, 0
+        except Exception as e:
+            if not request_not_sent(e):
+                raise
+        try:
+            result = backup(None)
+        except Exception:
+            self.__record(kind, hedged=True, won=False)
+            raise
+        self.__record(kind, hedged=True, won=bool(result))
+        return result, 1
+
+    @staticmethod
+    def __result(future) -> Any:
+        try:
+            return future.result()
+        except Exception:
+            return None
+
+    def __record(self, kind: str, hedged: bool, won: bool):
+        with self._lock:
+            stat = self._stats.setdefault(kind, {"total": 0, "hedged": 0, "won": 0})
+            stat["total"] += 1
+            stat["hedged"] += int(hedged)
+            stat["won"] += int(won)
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        各类请求的对冲统计：总数、触发备用请求次数、备用请求胜出次数
+        """
+        with self._lock:
+            return {kind: dict(stat) for kind, stat in self._stats.items()}
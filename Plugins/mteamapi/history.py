@@ -0,0 +1,101 @@
+import json
+import sqlite3
+import time
+from collections import deque
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class BetHistoryStore:
+    """
+    下注记录存储：记录写入SQLite并按时间、比赛ID与结果建立索引，内存中只保留最近若干条供页面展示，
+    过期记录按保留天数定期清理
+    """
+
+    def __init__(self, path: Union[str, Path], ring_size: int = 200, retention_days: int = 90):
+        self._retention = max(int(retention_days), 1) * 86400
+        self._lock = Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS bet_history (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                ts REAL NOT NULL,
+                game_id TEXT,
+                success INTEGER NOT NULL,
+                data TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_bet_history_ts ON bet_history (ts);
+            CREATE INDEX IF NOT EXISTS idx_bet_history_game ON bet_history (game_id);
+            CREATE INDEX IF NOT EXISTS idx_bet_history_success ON bet_history (success, ts);
+        """)
+        self._recent = deque(self.query(limit=max(int(ring_size), 1))[::-1], maxlen=max(int(ring_size), 1))
+        # 最近记录的只读副本（按时间倒序），写入时整体替换，读取无需加锁
+        self._view: Tuple[Dict[str, Any], ...] = tuple(reversed(self._recent))
+        self._compacted_at = 0.0
+        self.compact()
+
+    def add(self, record: Dict[str, Any]):
+        """
+        写入一条下注记录
+        """
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO bet_history (ts, game_id, success, data) VALUES (?, ?, ?, ?)",
+                (now, None if record.get("game_id") is None else str(record.get("game_id")),
+                 int(bool(record.get("success"))), json.dumps(record, ensure_ascii=False, default=str))
+            )
+            self._conn.commit()
+            self._recent.append(record)
+            self._view = tuple(reversed(self._recent))
+        # 每天最多清理一次过期记录
+        if now - self._compacted_at > 86400:
+            self.compact()
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """
+        最近的下注记录，按时间倒序
+        """
+        return list(self._view)
+
+    def query(self, game_id: Optional[str] = None, success: Optional[bool] = None,
+              since: Optional[float] = None, limit: int = 100) -> List[Dict[str, Any]]:
+        """
+        按比赛ID、结果与起始时间查询下注记录，按时间倒序
+        """
+        conditions, params = [], []
+        if game_id is not None:
+            conditions.append("game_id = ?")
+            params.append(str(game_id))
+        if success is not None:
+            conditions.append("success = ?")
+            params.append(int(success))
+        if since is not None:
+            conditions.append("ts >= ?")
+            params.append(since)
+        sql = "SELECT data FROM bet_history"
+        if conditions:
+            sql += " WHERE " + " AND ".join(conditions)
+        sql += " ORDER BY ts DESC, id DESC LIMIT ?"
+        params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def compact(self) -> int:
+        """
+        删除超过保留期的记录并回收空间，返回删除的条数
+        """
+        with self._lock:
+            deleted = self._conn.execute("DELETE FROM bet_history WHERE ts < ?",
+                                         (time.time() - self._retention,)).rowcount
+            self._conn.commit()
+            if deleted:
+                self._conn.execute("VACUUM")
+            self._compacted_at = time.time()
+        return deleted
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
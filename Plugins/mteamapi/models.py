@@ -0,0 +1,87 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional
+
+
+def parse_deadline(value: Any) -> Optional[float]:
+    """
+    解析比赛截止时间为时间戳，兼容 endtime 文本、ISO格式的 endTime 与数值时间戳
+    """
+    if not value:
+        return None
+    try:
+        if isinstance(value, (int, float)):
+            return float(value)
+        if "T" in value:
+            return datetime.fromisoformat(value.replace("Z", "+00:00")).timestamp()
+        return datetime.strptime(value, "%Y-%m-%d %H:%M:%S").timestamp()
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_odds(value: Any) -> float:
+    """
+    解析赔率，无法解析时视为0
+    """
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Option:
+    """
+    比赛的投注选项
+    """
+    __slots__ = ("id", "text", "odds")
+
+    def __init__(self, option_id: str, text: str, odds: float):
+        self.id = option_id
+        self.text = text
+        self.odds = odds
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Option":
+        return cls(str(data.get("id")), data.get("text") or "", parse_odds(data.get("odds")))
+
+
+class Game:
+    """
+    findBetgameList 返回的一场比赛，截止时间、赔率与内容摘要在解析时一次算好，
+    raw 保留原始数据用于落盘
+    """
+    __slots__ = ("id", "heading", "deadline", "end_text", "options", "digest", "raw")
+
+    def __init__(self, raw: Dict[str, Any]):
+        end_value = raw.get("endtime") or raw.get("endTime")
+        self.raw = raw
+        self.id = str(raw.get("id"))
+        self.heading: str = raw.get("heading") or raw.get("name") or ""
+        self.end_text: str = str(end_value) if end_value else ""
+        self.deadline: Optional[float] = parse_deadline(end_value)
+        self.options: List[Option] = [Option.from_dict(option) for option in
+                                      raw.get("optionsList") or raw.get("betOptions") or []]
+        # 影响下注安排的内容：截止时间与各选项赔率
+        self.digest = hash((self.deadline, tuple((option.id, option.odds) for option in self.options)))
+
+    def best_option(self) -> Optional[Option]:
+        """
+        赔率最高的选项
+        """
+        return max(self.options, key=lambda option: option.odds) if self.options else None
+
+    def option(self, option_id: str) -> Optional[Option]:
+        for option in self.options:
+            if option.id == str(option_id):
+                return option
+        return None
+
+
+def parse_games(items: Optional[Iterable[Dict[str, Any]]]) -> List[Game]:
+    """
+    将比赛列表接口返回的数据解析为 Game 列表，跳过无法识别的条目
+    """
+    games = []
+    for item in items or []:
+        if isinstance(item, dict) and item.get("id") is not None:
+            games.append(Game(item))
+    return games
@@ -0,0 +1,112 @@
+import time
+from threading import Condition
+from typing import Dict, Optional
+
+# 请求类别，按优先级从高到低：下注、刷新赔率、列表轮询、通知与探测
+BET = "bet"
+ODDS = "odds"
+POLL = "poll"
+NOTIFY = "notify"
+
+PRIORITIES = (BET, ODDS, POLL, NOTIFY)
+
+PRIORITY_NAMES = {BET: "下注", ODDS: "赔率", POLL: "轮询", NOTIFY: "通知"}
+
+
+class RateLimiter:
+    """
+    令牌桶限速：所有发往M-Team的请求共用一个桶，低优先级类别取令牌时必须在桶中留下
+    更多余量，令牌紧张时轮询与通知先被推迟或丢弃，为下注保留额度
+    """
+
+    # 各类别取令牌后桶中至少保留的比例
+    RESERVE = {BET: 0.0, ODDS: 0.2, POLL: 0.4, NOTIFY: 0.6}
+    # 未指定时各类别最多等待的秒数；下注等待会占用截止前的时间，与通知、探测一样拿不到令牌时不等待
+    MAX_WAIT = {BET: 0.0, ODDS: 0.5, POLL: 2.0, NOTIFY: 0.0}
+
+    def __init__(self, rate: float = 2.0, burst: int = 10):
+        self._cond = Condition()
+        self.rate = max(float(rate), 0.1)
+        self.burst = max(int(burst), 1)
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._stats: Dict[str, Dict[str, int]] = {
+            kind: {"allowed": 0, "delayed": 0, "shed": 0, "forced": 0} for kind in PRIORITIES
+        }
+
+    def configure(self, rate: Optional[float] = None, burst: Optional[int] = None):
+        """
+        设置每秒补充的令牌数与桶容量
+        """
+        with self._cond:
+            if rate is not None:
+                self.rate = max(float(rate), 0.1)
+            if burst is not None:
+                self.burst = max(int(burst), 1)
+                self._tokens = min(self._tokens, float(self.burst))
+            self._cond.notify_all()
+
+    def __refill(self, now: float):
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def acquire(self, kind: str = POLL, timeout: Optional[float] = None, force: bool = False) -> bool:
+        """
+        取一个令牌，余量不足时最多等待timeout秒（默认按类别），超时返回False；
+        force 为True时超时仍扣除令牌（余量可为负）并计为超限发送，调用方随后照常发出请求
+        """
+        if timeout is None:
+            timeout = self.MAX_WAIT.get(kind, 0.0)
+        # 余量不超过 burst-1，桶容量很小时低优先级类别在桶满时仍能取到令牌
+        floor = min(self.RESERVE.get(kind, self.RESERVE[NOTIFY]) * self.burst, self.burst - 1)
+        stats = self._stats.setdefault(kind, {"allowed": 0, "delayed": 0, "shed": 0, "forced": 0})
+        deadline = time.monotonic() + max(float(timeout or 0), 0.0)
+        waited = False
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                self.__refill(now)
+                if self._tokens - 1 >= floor - 1e-9:
+                    self._tokens -= 1
+                    stats["allowed"] += 1
+                    if waited:
+                        stats["delayed"] += 1
+                    return True
+                remaining = deadline - now
+                if remaining <= 0:
+                    if force:
+                        # 请求照常发出，扣除令牌使随后的低优先级请求为其让出额度
+                        self._tokens -= 1
+                        stats["forced"] += 1
+                    else:
+                        stats["shed"] += 1
+                    return False
+                # 等到余量足够或超时，期间有高优先级请求取走令牌时重新计算
+                waited = True
+                self._cond.wait(min(remaining, (floor + 1 - self._tokens) / self.rate))
+
+    @property
+    def tokens(self) -> float:
+        with self._cond:
+            self.__refill(time.monotonic())
+            return self._tokens
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        各类别放行、被推迟、被丢弃与超限仍发送的请求数
+        """
+        with self._cond:
+            return {kind: dict(counts) for kind, counts in self._stats.items()}
+
+    def summary(self) -> str:
+        stats = self.stats()
+        parts = []
+        for kind in PRIORITIES:
+            counts = stats[kind]
+            parts.append(f"{PRIORITY_NAMES[kind]} {counts['delayed']}/{counts['shed']}")
+        forced = sum(counts.get("forced", 0) for counts in stats.values())
+        return f"限速 {self.rate:g} 次/秒（推迟/丢弃）：" + "，".join(parts) + f"；超限仍发送 {forced}"
+
+
+# 所有插件共用的M-Team API限速器
+rate_limiter = RateLimiter()
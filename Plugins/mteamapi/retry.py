@@ -0,0 +1,146 @@
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Awaitable, Callable, Optional, Tuple
+
+from .hedge import request_not_sent
+
+# 服务端明确表示未受理、可安全重发的状态码
+RETRY_STATUS = (429, 503)
+
+# 同步尝试在该线程池中执行，调用方最多等到本次尝试的总时限
+_attempt_executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="mteam-attempt")
+
+
+class DeadlineRetry:
+    """
+    以比赛截止时间为界的请求预算：每次尝试的超时取自剩余时间，
+    请求确认未发出或被服务端拒绝受理时带抖动重试，不发起无法在截止前完成的尝试
+    """
+
+    def __init__(self, deadline: float, connect_timeout: float = 3.0, min_attempt: float = 0.3,
+                 safety: float = 0.2, base_delay: float = 0.1, max_delay: float = 1.0, max_attempts: int = 5):
+        # 本地时钟下的截止时间戳
+        self.deadline = float(deadline)
+        self.connect_timeout = max(float(connect_timeout), 0.1)
+        # 剩余时间低于该值时不再发起尝试
+        self.min_attempt = max(float(min_attempt), 0.05)
+        # 为网络传输预留的余量，请求需在截止前该秒数内完成
+        self.safety = max(float(safety), 0.0)
+        self.base_delay = max(float(base_delay), 0.0)
+        self.max_delay = max(float(max_delay), self.base_delay)
+        self.max_attempts = max(int(max_attempts), 1)
+        self.attempts = 0
+
+    @classmethod
+    def within(cls, seconds: float, **kwargs) -> "DeadlineRetry":
+        """
+        从现在起给定秒数的预算，用于无法获知截止时间的请求
+        """
+        return cls(time.time() + seconds, **kwargs)
+
+    def remaining(self) -> float:
+        """
+        距截止还可使用的秒数
+        """
+        return self.deadline - self.safety - time.time()
+
+    def timeout(self, connect_timeout: Optional[float] = None) -> Optional[Tuple[float, float]]:
+        """
+        本次尝试的(连接超时, 读取超时)，二者之和不超过剩余时间；剩余时间不足一次尝试时返回None
+        """
+        remaining = self.remaining()
+        if remaining < self.min_attempt:
+            return None
+        connect = min(connect_timeout or self.connect_timeout, remaining / 2)
+        return connect, remaining - connect
+
+    def run(self, attempt: Callable[[Tuple[float, float]], Any], max_attempts: Optional[int] = None,
+            connect_timeout: Optional[float] = None) -> Any:
+        """
+        在预算内执行请求，attempt 接收超时参数并返回响应；仅在请求确认未发出或返回可重发状态码时重试，
+        其余异常直接抛出。预算耗尽仍未发出时抛出 TimeoutError
+        """
+        max_attempts = min(max_attempts or self.max_attempts, self.max_attempts)
+        result, error = None, None
+        for n in range(max_attempts):
+            timeout = self.timeout(connect_timeout)
+            if not timeout:
+                break
+            self.attempts += 1
+            try:
+                result, error = self.__call(attempt, timeout), None
+            except Exception as e:
+                if not request_not_sent(e):
+                    raise
+                result, error = None, e
+            if not self.__should_retry(result, error):
+                return result
+            delay = self.__backoff(n, max_attempts)
+            if delay is None:
+                break
+            time.sleep(delay)
+        return self.__give_up(result, error)
+
+    async def run_async(self, attempt: Callable[[Tuple[float, float]], Awaitable[Any]],
+                        max_attempts: Optional[int] = None, connect_timeout: Optional[float] = None) -> Any:
+        """
+        run 的协程版本，退避期间不占用事件循环
+        """
+        max_attempts = min(max_attempts or self.max_attempts, self.max_attempts)
+        result, error = None, None
+        for n in range(max_attempts):
+            timeout = self.timeout(connect_timeout)
+            if not timeout:
+                break
+            self.attempts += 1
+            try:
+                result, error = await attempt(timeout), None
+            except Exception as e:
+                if not request_not_sent(e):
+                    raise
+                result, error = None, e
+            if not self.__should_retry(result, error):
+                return result
+            delay = self.__backoff(n, max_attempts)
+            if delay is None:
+                break
+            await asyncio.sleep(delay)
+        return self.__give_up(result, error)
+
+    @staticmethod
+    def __call(attempt: Callable[[Tuple[float, float]], Any], timeout: Tuple[float, float]) -> Any:
+        """
+        requests 的读取超时只限制每次socket读取，响应持续缓慢到达时可远超该值；
+        在线程池中执行尝试，超过连接与读取超时之和仍未完成时放弃等待
+        """
+        future = _attempt_executor.submit(attempt, timeout)
+        try:
+            return future.result(timeout=sum(timeout))
+        except FutureTimeout:
+            if future.done():
+                raise
+            # 仍在排队的尝试直接取消，避免过了截止时间才发出
+            future.cancel()
+            raise TimeoutError(f"请求 {sum(timeout):.1f} 秒内未完成，放弃等待")
+
+    @staticmethod
+    def __should_retry(result: Any, error: Optional[Exception]) -> bool:
+        return error is not None or getattr(result, "status_code", None) in RETRY_STATUS
+
+    def __backoff(self, n: int, max_attempts: int) -> Optional[float]:
+        """
+        全抖动退避时长，退避后剩余时间不足一次尝试时返回None
+        """
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** n))
+        if n + 1 >= max_attempts or self.remaining() - delay < self.min_attempt:
+            return None
+        return delay
+
+    def __give_up(self, result: Any, error: Optional[Exception]) -> Any:
+        if error is not None:
+            raise error
+        if result is None:
+            raise TimeoutError(f"距截止时间不足 {self.min_attempt + self.safety:.1f} 秒，放弃请求")
+        return result
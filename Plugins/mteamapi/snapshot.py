@@ -0,0 +1,49 @@
+import json
+import os
+import time
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+
+class SnapshotStore:
+    """
+    比赛快照与下注计划的落盘存储，插件重启后无需等待网络即可恢复。
+    写入时先写临时文件再原子替换，避免进程中途退出留下不完整的文件
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self._path = Path(path)
+        self._lock = Lock()
+
+    def save(self, games: List[Dict[str, Any]], plan: List[Dict[str, Any]],
+             meta: Optional[Dict[str, Any]] = None):
+        """
+        保存比赛列表与下注计划，计划条目需包含fire_time（本地时间戳）
+        """
+        content = json.dumps({
+            "saved_at": time.time(),
+            "meta": meta or {},
+            "games": games,
+            "plan": plan
+        }, ensure_ascii=False, default=str)
+        tmp = self._path.with_name(self._path.name + ".tmp")
+        with self._lock:
+            with open(tmp, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp, self._path)
+
+    def load(self) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]], Dict[str, Any]]:
+        """
+        读取比赛列表、尚未到触发时间的下注计划及保存时的附加信息，文件不存在或损坏时返回空结果
+        """
+        with self._lock:
+            try:
+                with open(self._path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+            except (OSError, ValueError):
+                return [], [], {}
+        now = time.time()
+        plan = [entry for entry in data.get("plan") or []
+                if (entry.get("fire_time") or 0) > now]
+        return data.get("games") or [], plan, data.get("meta") or {}
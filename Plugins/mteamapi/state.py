@@ -0,0 +1,32 @@
+import time
+from types import MappingProxyType
+from typing import Iterable, Optional
+
+from .diff import GameDiff
+from .models import Game
+
+
+class GameState:
+    """
+    某一时刻的比赛状态快照，创建后不可修改。更新时构建新快照并整体替换引用，
+    读取方拿到引用后无需加锁，也不会看到更新到一半的状态
+    """
+    __slots__ = ("version", "games", "by_id", "diff", "updated_at")
+
+    def __init__(self, games: Iterable[Game] = (), diff: Optional[GameDiff] = None, version: int = 0):
+        games = tuple(games)
+        object.__setattr__(self, "version", version)
+        object.__setattr__(self, "games", games)
+        object.__setattr__(self, "by_id", MappingProxyType({game.id: game for game in games}))
+        object.__setattr__(self, "diff", diff)
+        object.__setattr__(self, "updated_at", time.time())
+
+    def __setattr__(self, key, value):
+        raise AttributeError("GameState is immutable")
+
+    def evolve(self, games: Iterable[Game], diff: Optional[GameDiff] = None) -> "GameState":
+        """
+        基于当前快照生成下一个版本
+        """
+        return GameState(games, diff, self.version + 1)
+
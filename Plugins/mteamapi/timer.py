@@ -0,0 +1,183 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Callable, Dict, List, Optional, Union
+
+from .metrics import metrics, TIMER_LATENESS_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _TimerJob:
+    """
+    堆中的一个定时任务，取消时只做标记，出堆时丢弃
+    """
+
+    __slots__ = ("job_id", "fire_at", "func", "args", "cancelled")
+
+    def __init__(self, job_id: str, fire_at: float, func: Callable, args: tuple):
+        self.job_id = job_id
+        self.fire_at = fire_at
+        self.func = func
+        self.args = args
+        self.cancelled = False
+
+
+class DeadlineTimer:
+    """
+    共享的截止时间定时器：按触发时间维护最小堆，单个调度线程只在最早的任务到期时醒来，
+    到期任务交给有界线程池执行；线程数与唤醒次数不随插件和比赛数量增长
+    """
+
+    def __init__(self, max_workers: int = 8, lateness_samples: int = 200):
+        self._heap: List[tuple] = []
+        self._jobs: Dict[str, _TimerJob] = {}
+        self._seq = itertools.count()
+        # 堆中已取消但尚未出堆的任务数，超过一半时重建堆
+        self._cancelled = 0
+        self._cond = threading.Condition()
+        self._executor = ThreadPoolExecutor(max_workers=max(int(max_workers), 1),
+                                            thread_name_prefix="mteam-timer")
+        self._thread: Optional[threading.Thread] = None
+        self._lateness = deque(maxlen=lateness_samples)
+        self._fired = 0
+        self._wakeups = 0
+
+    def add(self, job_id: str, run_date: Union[datetime, float], func: Callable, *args) -> str:
+        """
+        安排任务在指定时间执行，已存在相同ID的任务时替换；插入为 O(log n)
+        """
+        fire_at = run_date.timestamp() if isinstance(run_date, datetime) else float(run_date)
+        job = _TimerJob(job_id, fire_at, func, args)
+        with self._cond:
+            self.__discard(job_id)
+            self._jobs[job_id] = job
+            heapq.heappush(self._heap, (fire_at, next(self._seq), job))
+            # 只有新任务成为最早的任务时才需要唤醒调度线程重新计算等待时间
+            if self._heap[0][2] is job:
+                self._cond.notify()
+            self.__ensure_thread()
+        return job_id
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        取消任务，返回任务是否仍在等待执行
+        """
+        with self._cond:
+            return self.__discard(job_id)
+
+    def cancel_prefix(self, prefix: str) -> int:
+        """
+        取消ID以指定前缀开头的所有任务，用于插件停止时清理自己的任务
+        """
+        with self._cond:
+            job_ids = [job_id for job_id in self._jobs if job_id.startswith(prefix)]
+            for job_id in job_ids:
+                self.__discard(job_id)
+        return len(job_ids)
+
+    def __discard(self, job_id: str) -> bool:
+        job = self._jobs.pop(job_id, None)
+        if not job:
+            return False
+        job.cancelled = True
+        self._cancelled += 1
+        if self._cancelled > len(self._heap) // 2:
+            self._heap = [entry for entry in self._heap if not entry[2].cancelled]
+            heapq.heapify(self._heap)
+            self._cancelled = 0
+        return True
+
+    def __ensure_thread(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self.__run, name="mteam-timer-dispatch", daemon=True)
+        self._thread.start()
+
+    def __run(self):
+        while True:
+            with self._cond:
+                self._wakeups += 1
+                while self._heap and self._heap[0][2].cancelled:
+                    heapq.heappop(self._heap)
+                    self._cancelled -= 1
+                if not self._heap:
+                    self._cond.wait()
+                    continue
+                delay = self._heap[0][0] - time.time()
+                if delay > 0:
+                    self._cond.wait(delay)
+                    continue
+                # 一次唤醒取出所有已到期的任务
+                due = []
+                now = time.time()
+                while self._heap and self._heap[0][0] <= now:
+                    _, _, job = heapq.heappop(self._heap)
+                    if job.cancelled:
+                        self._cancelled -= 1
+                        continue
+                    self._jobs.pop(job.job_id, None)
+                    due.append(job)
+                self._fired += len(due)
+            try:
+                for job in due:
+                    self._executor.submit(self.__execute, job)
+            except RuntimeError:
+                return
+
+    def __execute(self, job: _TimerJob):
+        # 触发延迟按任务实际开始执行的时间计算，包括在线程池中排队等待空闲线程的时间
+        lateness = time.time() - job.fire_at
+        with self._cond:
+            self._lateness.append(lateness)
+        metrics.observe(TIMER_LATENESS_SECONDS, lateness)
+        try:
+            job.func(*job.args)
+        except Exception as e:
+            logger.error(f"定时任务 {job.job_id} 执行失败: {e}")
+
+    def has_job(self, job_id: str) -> bool:
+        with self._cond:
+            return job_id in self._jobs
+
+    @property
+    def depth(self) -> int:
+        """
+        等待执行的任务数
+        """
+        with self._cond:
+            return len(self._jobs)
+
+    def stats(self) -> dict:
+        """
+        队列深度、已触发次数、调度线程唤醒次数与触发延迟
+        """
+        with self._cond:
+            lateness = list(self._lateness)
+            next_at = self._heap[0][0] if self._heap else None
+            return {
+                "depth": len(self._jobs),
+                "fired": self._fired,
+                "wakeups": self._wakeups,
+                "next": datetime.fromtimestamp(next_at).strftime("%H:%M:%S") if next_at else None,
+                "lateness_avg_ms": round(sum(lateness) / len(lateness) * 1000) if lateness else None,
+                "lateness_max_ms": round(max(lateness) * 1000) if lateness else None
+            }
+
+    def summary(self) -> str:
+        stats = self.stats()
+        text = f"定时器：等待 {stats['depth']} 个任务，已触发 {stats['fired']} 次"
+        if stats["lateness_avg_ms"] is not None:
+            text += f"，平均延迟 {stats['lateness_avg_ms']}ms，最大 {stats['lateness_max_ms']}ms"
+        if stats["next"]:
+            text += f"，下次触发 {stats['next']}"
+        return text
+
+
+# 所有下注插件共用的定时器
+bet_timer = DeadlineTimer()
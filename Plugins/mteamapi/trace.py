@@ -0,0 +1,149 @@
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional
+
+# 下注时间线上的各阶段，按发生顺序
+SCHEDULED = "scheduled"
+PLANNED = "planned"
+STARTED = "started"
+CONNECTED = "connected"
+SENT = "sent"
+FIRST_BYTE = "first_byte"
+ACKED = "acked"
+
+STAGES = (SCHEDULED, PLANNED, STARTED, CONNECTED, SENT, FIRST_BYTE, ACKED)
+
+STAGE_NAMES = {
+    SCHEDULED: "安排任务",
+    PLANNED: "计划触发",
+    STARTED: "开始执行",
+    CONNECTED: "取得连接",
+    SENT: "发出请求",
+    FIRST_BYTE: "收到响应",
+    ACKED: "确认结果",
+}
+
+# 相邻阶段之间的耗时归属，用于判断下注迟到时是哪一环慢了
+SEGMENTS = (
+    ("调度", PLANNED, STARTED),
+    ("准备", STARTED, CONNECTED),
+    ("连接", CONNECTED, SENT),
+    ("服务器", SENT, FIRST_BYTE),
+    ("读取", FIRST_BYTE, ACKED),
+)
+
+
+class BetTrace:
+    """
+    单笔下注的时间线：各阶段的本地时间戳、最终使用的API地址与尝试次数；
+    重试时连接、发送与响应阶段记录最后一次尝试
+    """
+
+    __slots__ = ("marks", "endpoint", "attempts")
+
+    def __init__(self, planned: Optional[float] = None, scheduled: Optional[float] = None):
+        self.marks: Dict[str, float] = {}
+        self.endpoint: Optional[str] = None
+        self.attempts = 0
+        if scheduled is not None:
+            self.marks[SCHEDULED] = float(scheduled)
+        if planned is not None:
+            self.marks[PLANNED] = float(planned)
+
+    def mark(self, stage: str, at: Optional[float] = None):
+        self.marks[stage] = time.time() if at is None else at
+
+    def attempt(self, endpoint: str):
+        """
+        开始一次下注请求：记录地址，清除上一次尝试的连接与响应时间
+        """
+        self.endpoint = endpoint
+        self.attempts += 1
+        for stage in (CONNECTED, SENT, FIRST_BYTE):
+            self.marks.pop(stage, None)
+
+    def received(self, response: Any):
+        """
+        requests 的响应：连接池未记录收到响应的时间时，以发出时间加上 elapsed（发出请求到解析完响应头）估算
+        """
+        elapsed = getattr(response, "elapsed", None)
+        if elapsed is not None and SENT in self.marks and FIRST_BYTE not in self.marks:
+            self.marks[FIRST_BYTE] = self.marks[SENT] + elapsed.total_seconds()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "marks": {stage: round(at, 6) for stage, at in self.marks.items()},
+            "endpoint": self.endpoint,
+            "attempts": self.attempts
+        }
+
+
+# 当前线程正在发送的下注，由会话的连接池在取得连接、发出请求与收到响应头时记录
+_current = threading.local()
+
+
+@contextmanager
+def tracing(trace: Optional[BetTrace]) -> Iterator[Optional[BetTrace]]:
+    """
+    在当前线程发送请求期间，把连接池记录的真实时刻写入下注时间线
+    """
+    previous = getattr(_current, "trace", None)
+    _current.trace = trace
+    try:
+        yield trace
+    finally:
+        _current.trace = previous
+
+
+def mark_current(stage: str):
+    """
+    记录当前线程正在发送的下注的某个阶段，没有下注在发送时忽略
+    """
+    trace = getattr(_current, "trace", None)
+    if trace is not None:
+        trace.mark(stage)
+
+
+def trace_rows(trace: Optional[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    时间线表格：各阶段的时刻、相对计划触发时间的偏移与距上一阶段的耗时（毫秒）
+    """
+    marks = (trace or {}).get("marks") or {}
+    origin = marks.get(PLANNED, marks.get(STARTED))
+    rows, previous = [], None
+    for stage in STAGES:
+        at = marks.get(stage)
+        if at is None:
+            continue
+        rows.append({
+            "stage": STAGE_NAMES[stage],
+            "time": datetime.fromtimestamp(at).strftime("%H:%M:%S.%f")[:-3],
+            "offset_ms": round((at - origin) * 1000, 1) if origin is not None and stage != SCHEDULED else None,
+            "delta_ms": round((at - previous) * 1000, 1) if previous is not None else None
+        })
+        if stage != SCHEDULED:
+            previous = at
+    return rows
+
+
+def trace_segments(trace: Optional[Dict[str, Any]]) -> Dict[str, float]:
+    """
+    调度、准备、连接、服务器与读取各环节的耗时（毫秒）
+    """
+    marks = (trace or {}).get("marks") or {}
+    return {name: round((marks[end] - marks[start]) * 1000, 1)
+            for name, start, end in SEGMENTS if start in marks and end in marks}
+
+
+def trace_verdict(trace: Optional[Dict[str, Any]]) -> str:
+    """
+    一句话说明耗时最多的环节
+    """
+    segments = trace_segments(trace)
+    if not segments:
+        return "无时间线"
+    name, cost = max(segments.items(), key=lambda item: item[1])
+    total = sum(max(value, 0) for value in segments.values())
+    return f"合计 {total:.0f}ms，{name}最慢 {cost:.0f}ms"
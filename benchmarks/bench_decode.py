@@ -0,0 +1,52 @@
+"""
+比赛列表解析基准：比较标准库 json 与 orjson 的解码耗时，以及解析为 Game 记录的总耗时。
+
+    python benchmarks/bench_decode.py                 # 使用生成的 10~5000 场比赛
+    python benchmarks/bench_decode.py a.json b.json   # 使用录制的 findBetgameList 响应
+"""
+
+import json
+import sys
+import timeit
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "Plugins"))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from mteamapi import parse_games, JSON_BACKEND  # noqa: E402
+from mteamapi.jsonlib import loads  # noqa: E402
+from payloads import dump_payload, load_payloads  # noqa: E402
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+GAME_COUNTS = [10, 100, 500, 2000, 5000]
+
+
+def measure(func, repeat: int = 5) -> float:
+    """
+    多轮取最小值，返回单次耗时（毫秒）
+    """
+    number = 10
+    return min(timeit.repeat(func, number=number, repeat=repeat)) / number * 1000
+
+
+def main():
+    if len(sys.argv) > 1:
+        payloads = load_payloads(sys.argv[1:])
+    else:
+        payloads = {f"{count} 场": dump_payload(count) for count in GAME_COUNTS}
+
+    print(f"当前解析后端: {JSON_BACKEND}")
+    print(f"{'数据':<16}{'大小(KB)':>10}{'json(ms)':>12}{'orjson(ms)':>12}{'解码+建模(ms)':>16}")
+    for name, body in payloads.items():
+        stdlib = measure(lambda: json.loads(body))
+        fast = measure(lambda: orjson.loads(body)) if orjson else float("nan")
+        total = measure(lambda: parse_games(loads(body).get("data")))
+        print(f"{name:<16}{len(body) / 1024:>10.1f}{stdlib:>12.3f}{fast:>12.3f}{total:>16.3f}")
+
+
+if __name__ == "__main__":
+    main()
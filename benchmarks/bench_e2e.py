@@ -0,0 +1,206 @@
+"""
+端到端基准：启动本地桩服务，让各插件按实际流程同步比赛列表并在截止前自动下注，
+统计同步吞吐、下注延迟（计划触发到确认结果）的 p50/p99 与错过截止的比例。
+插件依赖 MoviePilot 的 app 包，需在 MoviePilot 的运行环境中执行：
+
+    python benchmarks/bench_e2e.py                                   # 两个插件，线程模式
+    python benchmarks/bench_e2e.py --plugin ManToumt --games 50 --accounts 3
+    python benchmarks/bench_e2e.py --async --latency 0.05 --jitter 0.02 --error-rate 0.05
+"""
+
+import argparse
+import math
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from stub_server import StubServer, STYLES  # noqa: E402
+
+try:
+    from Plugins import MTeamBetHelper  # noqa: E402
+    from Plugins.mantoumt import ManToumt  # noqa: E402
+    from Plugins.mteamapi import endpoint_health, game_feed, rate_limiter, BetHistoryStore  # noqa: E402
+    from Plugins.mteamapi.trace import PLANNED, SENT, FIRST_BYTE, ACKED  # noqa: E402
+except ImportError as e:
+    sys.exit(f"无法导入插件（{e}），请在 MoviePilot 环境中运行")
+
+
+def percentile(values: List[float], q: float) -> float:
+    """
+    最近秩百分位数，无数据时返回 nan
+    """
+    if not values:
+        return float("nan")
+    ordered = sorted(values)
+    return ordered[max(math.ceil(q / 100 * len(ordered)) - 1, 0)]
+
+
+def plugin_config(name: str, args: argparse.Namespace) -> Dict[str, Any]:
+    """
+    基准使用的插件配置：每个账号使用不同的 API Key，便于桩服务区分
+    """
+    config = {
+        "enabled": True,
+        "notify": False,
+        "use_proxy": False,
+        "api_key": "bench-list",
+        "accounts": "\n".join(f"bench{i}|bench-key-{i}" for i in range(1, args.accounts + 1)),
+        "bet_seconds_before": args.bet_seconds,
+        "warmup_seconds": args.warmup,
+        "async_engine": args.use_async
+    }
+    if name == "MTeamBetHelper":
+        config.update({
+            "auto_bet": True,
+            "adaptive_poll": False,
+            "sync_min_gap": 0,
+            "rate_limit": args.rate_limit,
+            "rate_burst": args.rate_burst,
+            "bet_max_parallel": args.parallel
+        })
+    return config
+
+
+# 插件类与其同步路径
+PLUGINS: Dict[str, tuple] = {
+    "MTeamBetHelper": (MTeamBetHelper, lambda plugin: plugin.refresh_bet_games()),
+    "ManToumt": (ManToumt, lambda plugin: plugin.fetch_games(max_age=0)),
+}
+
+
+def wait_until(predicate: Callable[[], bool], timeout: float) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.005)
+    return predicate()
+
+
+def run_plugin(name: str, args: argparse.Namespace, server: StubServer, first_id: int) -> Dict[str, Any]:
+    plugin_class, sync = PLUGINS[name]
+    expected = args.games * args.accounts
+    # 所有比赛在同步完成后 lead 秒开始依次截止，覆盖提前下注秒数
+    start_at = args.bet_seconds + args.lead
+    server.reset(args.games, end_range=(start_at, start_at + args.spread), first_id=first_id, seed=first_id)
+    rate_limiter.configure(rate=args.rate_limit, burst=args.rate_burst)
+
+    data_path = Path(tempfile.mkdtemp(prefix=f"bench-{name.lower()}-"))
+    plugin = plugin_class()
+    # 下注记录与快照写入临时目录，不影响正式的插件数据
+    plugin.get_data_path = lambda: data_path
+    try:
+        plugin.init_plugin(plugin_config(name, args))
+
+        # 首次同步：从请求比赛列表到所有下注安排完毕；桩服务返回错误时像定时轮询一样重新拉取
+        begin = time.monotonic()
+        scheduled = False
+        while not scheduled and time.monotonic() - begin < 10:
+            game_feed.poll(max_age=0)
+            scheduled = wait_until(lambda: bool(plugin._dispatcher) and plugin._dispatcher.pending >= expected, 0.5)
+        first_sync = (time.monotonic() - begin) * 1000
+
+        # 重复同步：比赛未变化，只有请求与比较开销
+        sync_times = []
+        sync_begin = time.monotonic()
+        for _ in range(args.syncs):
+            begin = time.monotonic()
+            sync(plugin)
+            sync_times.append((time.monotonic() - begin) * 1000)
+        sync_elapsed = time.monotonic() - sync_begin
+
+        # 等到最后一场比赛截止，再留出写入记录的时间
+        time.sleep(max(server.last_deadline - time.time(), 0) + 0.5)
+        history = BetHistoryStore(data_path / "bet_history.db")
+        wait_until(lambda: len(history.query(limit=expected * 2)) >= expected, 5)
+        records = history.query(limit=expected * 2)
+        history.close()
+    finally:
+        plugin.stop_service()
+        shutil.rmtree(data_path, ignore_errors=True)
+
+    latencies, request_times, acked = [], [], []
+    for record in records:
+        marks = (record.get("trace") or {}).get("marks") or {}
+        if ACKED in marks and PLANNED in marks:
+            latencies.append((marks[ACKED] - marks[PLANNED]) * 1000)
+            acked.append(marks[ACKED])
+        if FIRST_BYTE in marks and SENT in marks:
+            request_times.append((marks[FIRST_BYTE] - marks[SENT]) * 1000)
+    planned = [((record.get("trace") or {}).get("marks") or {}).get(PLANNED) for record in records]
+    planned = [at for at in planned if at]
+    bet_window = max(acked) - min(planned) if acked and planned else 0
+    stats = server.bet_stats()
+    return {
+        "plugin": name,
+        "scheduled": scheduled,
+        "first_sync_ms": first_sync,
+        "sync_p50": percentile(sync_times, 50),
+        "sync_p99": percentile(sync_times, 99),
+        "sync_rate": args.syncs / sync_elapsed if sync_elapsed else float("nan"),
+        "bets": len(records),
+        "success": sum(1 for record in records if record.get("success")),
+        "bet_rate": len(acked) / bet_window if bet_window else float("nan"),
+        "latency_p50": percentile(latencies, 50),
+        "latency_p99": percentile(latencies, 99),
+        "request_p50": percentile(request_times, 50),
+        "request_p99": percentile(request_times, 99),
+        "miss_rate": max(expected - stats["on_time"], 0) / expected if expected else 0.0,
+        "duplicates": stats["duplicates"]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="M-Team 菠菜插件端到端基准")
+    parser.add_argument("--plugin", choices=list(PLUGINS) + ["all"], default="all")
+    parser.add_argument("--games", type=int, default=20, help="比赛数量")
+    parser.add_argument("--accounts", type=int, default=2, help="下注账号数量")
+    parser.add_argument("--spread", type=float, default=2.0, help="比赛截止时间分布的秒数，0 表示同时截止")
+    parser.add_argument("--lead", type=float, default=3.0, help="同步完成后到第一笔下注的秒数")
+    parser.add_argument("--bet-seconds", type=int, default=2, help="提前下注秒数")
+    parser.add_argument("--warmup", type=int, default=1, help="下注预热秒数")
+    parser.add_argument("--syncs", type=int, default=20, help="重复同步次数")
+    parser.add_argument("--parallel", type=int, default=8, help="批量下注并发数（MTeamBetHelper）")
+    parser.add_argument("--rate-limit", type=float, default=1000.0, help="每秒请求数上限")
+    parser.add_argument("--rate-burst", type=int, default=1000)
+    parser.add_argument("--async", dest="use_async", action="store_true", help="启用异步引擎（需要 aiohttp）")
+    parser.add_argument("--latency", type=float, default=0.0, help="桩服务响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="桩服务延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="桩服务返回错误状态码的比例")
+    parser.add_argument("--style", choices=STYLES, default="both", help="桩服务响应中的成功标识")
+    args = parser.parse_args()
+
+    server = StubServer(games=args.games, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        style=args.style).start()
+    endpoint_health.configure(urls=[server.url])
+    names = list(PLUGINS) if args.plugin == "all" else [args.plugin]
+    print(f"桩服务 {server.url}：{args.games} 场比赛 × {args.accounts} 个账号，"
+          f"延迟 {args.latency * 1000:.0f}±{args.jitter * 1000:.0f}ms，错误率 {args.error_rate:.0%}，"
+          f"{'异步引擎' if args.use_async else '线程模式'}")
+    print(f"{'插件':<16}{'首次同步(ms)':>14}{'同步p50/p99(ms)':>18}{'同步/秒':>10}{'下注':>8}{'成功':>6}"
+          f"{'下注/秒':>10}{'下注延迟p50/p99(ms)':>22}{'请求p50/p99(ms)':>18}{'错过截止':>10}")
+    try:
+        for index, name in enumerate(names):
+            # 每个插件使用不同的比赛ID，避免沿用上一轮的比赛与下注计划
+            result = run_plugin(name, args, server, first_id=(index + 1) * 100000)
+            print(f"{result['plugin']:<16}{result['first_sync_ms']:>14.1f}"
+                  f"{result['sync_p50']:>10.1f}/{result['sync_p99']:<7.1f}{result['sync_rate']:>10.1f}"
+                  f"{result['bets']:>8}{result['success']:>6}{result['bet_rate']:>10.1f}"
+                  f"{result['latency_p50']:>14.1f}/{result['latency_p99']:<7.1f}"
+                  f"{result['request_p50']:>10.1f}/{result['request_p99']:<7.1f}{result['miss_rate']:>10.1%}")
+            if not result["scheduled"]:
+                print(f"  {name}: 首次同步后 10 秒内未安排全部下注")
+            if result["duplicates"]:
+                print(f"  {name}: 桩服务收到 {result['duplicates']} 笔重复下注")
+    finally:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# 生成与 findBetgameList 返回结构一致的比赛列表，供基准测试与本地桩服务使用
+
+import json
+import random
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+
+def make_game(game_id: int, now: float, rng: random.Random,
+              end_range: Tuple[float, float] = (60, 2 * 86400)) -> Dict[str, Any]:
+    """
+    构造一场比赛，截止时间默认分布在未来两天内，每场2~4个选项
+    """
+    end = now + rng.uniform(*end_range)
+    options = [
+        {
+            "id": game_id * 10 + i,
+            "gameId": game_id,
+            "text": f"选项{i + 1}",
+            "odds": f"{rng.uniform(1.05, 9.5):.2f}",
+            "bonusTotal": rng.randint(0, 500000),
+            "betCount": rng.randint(0, 3000)
+        } for i in range(rng.randint(2, 4))
+    ]
+    return {
+        "id": game_id,
+        "heading": f"第{game_id}场 主队{game_id} vs 客队{game_id}",
+        "undertext": "胜负盘口，以官方赛果为准",
+        "createdDate": datetime.fromtimestamp(now - 3600).strftime("%Y-%m-%d %H:%M:%S"),
+        "endtime": datetime.fromtimestamp(end).strftime("%Y-%m-%d %H:%M:%S"),
+        "active": "LIVE",
+        "fix": 0,
+        "optionsList": options
+    }
+
+
+def make_payload(count: int, seed: int = 0, first_id: int = 1,
+                 end_range: Tuple[float, float] = (60, 2 * 86400)) -> Dict[str, Any]:
+    """
+    构造包含 count 场比赛的接口响应，比赛ID从 first_id 开始，截止时间为现在起 end_range 秒内
+    """
+    rng = random.Random(seed)
+    now = time.time()
+    return {
+        "code": "0",
+        "message": "SUCCESS",
+        "success": True,
+        "data": [make_game(first_id + i, now, rng, end_range) for i in range(count)]
+    }
+
+
+def load_payloads(paths: List[str]) -> Dict[str, bytes]:
+    """
+    读取录制的接口响应文件，按文件名索引
+    """
+    return {Path(path).name: Path(path).read_bytes() for path in paths}
+
+
+def dump_payload(count: int) -> bytes:
+    return json.dumps(make_payload(count), ensure_ascii=False).encode("utf-8")
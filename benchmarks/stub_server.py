@@ -0,0 +1,215 @@
+"""
+M-Team 菠菜接口的本地桩服务：实现 findBetgameList 与 betgameOdds，响应结构与线上一致，
+可配置延迟、抖动、错误率与比赛数量，并记录每笔下注是否在比赛截止前到达。
+
+    python benchmarks/stub_server.py --port 8080 --games 50 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from payloads import make_payload
+
+# 响应风格：线上接口同时返回 code 与 success，部分版本只返回其中之一
+STYLES = ("both", "code", "success")
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # 默认的监听队列只有5，预热与批量下注同时建连时会丢弃SYN，客户端要等1秒后重传
+    request_queue_size = 256
+
+
+class StubServer:
+    """
+    桩服务，在后台线程中运行；比赛列表固定生成一次，下注按选项ID校验比赛是否已截止
+    """
+
+    def __init__(self, games: int = 20, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 error_status: int = 503, style: str = "both", end_range: Tuple[float, float] = (60, 2 * 86400),
+                 first_id: int = 1, seed: int = 0, host: str = "127.0.0.1", port: int = 0):
+        if style not in STYLES:
+            raise ValueError(f"未知的响应风格: {style}")
+        self.latency = max(float(latency), 0.0)
+        self.jitter = max(float(jitter), 0.0)
+        self.error_rate = min(max(float(error_rate), 0.0), 1.0)
+        self.error_status = int(error_status)
+        self.style = style
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.bets: List[Dict[str, Any]] = []
+        self.requests: Dict[str, int] = {}
+        self.reset(games, end_range=end_range, first_id=first_id, seed=seed)
+        self._server = _Server((host, port), self.__handler())
+        self._thread: Optional[threading.Thread] = None
+
+    def reset(self, games: int, end_range: Tuple[float, float] = (60, 2 * 86400), first_id: int = 1,
+              seed: int = 0):
+        """
+        重新生成比赛列表并清空下注记录
+        """
+        payload = make_payload(games, seed=seed, first_id=first_id, end_range=end_range)
+        deadlines = {}
+        for game in payload["data"]:
+            end = time.mktime(time.strptime(game["endtime"], "%Y-%m-%d %H:%M:%S"))
+            for option in game["optionsList"]:
+                deadlines[str(option["id"])] = (game["id"], end)
+        with self._lock:
+            self._games = payload["data"]
+            self._options = deadlines
+            self.bets = []
+            self.requests = {}
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    @property
+    def games(self) -> List[Dict[str, Any]]:
+        return self._games
+
+    @property
+    def last_deadline(self) -> float:
+        """
+        最后一场比赛的截止时间戳
+        """
+        return max((end for _, end in self._options.values()), default=time.time())
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="mteam-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _wrap(self, data: Any, success: bool = True, message: str = "SUCCESS") -> Dict[str, Any]:
+        body: Dict[str, Any] = {"message": message, "data": data}
+        if self.style in ("both", "code"):
+            body["code"] = "0" if success else "1"
+        if self.style in ("both", "success"):
+            body["success"] = success
+        return body
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency + self._rng.uniform(-self.jitter, self.jitter)
+            fail = self._rng.random() < self.error_rate
+        if delay > 0:
+            time.sleep(delay)
+        return fail
+
+    def _bet(self, form: Dict[str, List[str]], api_key: Optional[str], received: float) -> Dict[str, Any]:
+        opt_id = (form.get("optId") or [""])[0]
+        game_id, end = self._options.get(opt_id, (None, None))
+        record = {
+            "received": received,
+            "api_key": api_key,
+            "opt_id": opt_id,
+            "bonus": (form.get("bonus") or [""])[0],
+            "game_id": game_id,
+            "deadline": end,
+            "on_time": end is not None and received < end
+        }
+        with self._lock:
+            self.bets.append(record)
+        if end is None:
+            return self._wrap(None, False, "选项不存在")
+        if not record["on_time"]:
+            return self._wrap(None, False, "比赛已截止")
+        return self._wrap(None)
+
+    def __handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_HEAD(self):
+                self.send_response(200)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def do_POST(self):
+                received = time.time()
+                length = int(self.headers.get("Content-Length") or 0)
+                form = parse_qs(self.rfile.read(length).decode("utf-8"))
+                path = self.path.split("?")[0]
+                with server._lock:
+                    server.requests[path] = server.requests.get(path, 0) + 1
+                if server._delay():
+                    self.__send(server.error_status, {"message": "Service Unavailable"})
+                    return
+                if path == "/api/bet/findBetgameList":
+                    self.__send(200, server._wrap(server.games))
+                elif path == "/api/bet/betgameOdds":
+                    self.__send(200, server._bet(form, self.headers.get("x-api-key"), received))
+                else:
+                    self.__send(404, {"message": "Not Found"})
+
+            def __send(self, status: int, body: Dict[str, Any]):
+                content = json.dumps(body, ensure_ascii=False).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json;charset=UTF-8")
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                self.wfile.write(content)
+
+        return Handler
+
+    def bet_stats(self) -> Dict[str, int]:
+        """
+        收到的下注数、截止前到达的下注数与重复下注数（同一 API Key 对同一比赛下注多次）
+        """
+        with self._lock:
+            bets = list(self.bets)
+        seen, duplicates = set(), 0
+        for bet in bets:
+            key = (bet["api_key"], bet["game_id"])
+            duplicates += key in seen
+            seen.add(key)
+        return {
+            "received": len(bets),
+            "on_time": sum(1 for bet in bets if bet["on_time"]),
+            "duplicates": duplicates
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="M-Team 菠菜接口本地桩服务")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--games", type=int, default=20, help="比赛数量")
+    parser.add_argument("--end-min", type=float, default=60, help="最早截止时间（秒后）")
+    parser.add_argument("--end-max", type=float, default=2 * 86400, help="最晚截止时间（秒后）")
+    parser.add_argument("--latency", type=float, default=0.0, help="响应延迟（秒）")
+    parser.add_argument("--jitter", type=float, default=0.0, help="延迟抖动（秒）")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="返回错误状态码的比例")
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--style", choices=STYLES, default="both", help="响应中的成功标识")
+    args = parser.parse_args()
+
+    server = StubServer(games=args.games, latency=args.latency, jitter=args.jitter, error_rate=args.error_rate,
+                        error_status=args.error_status, style=args.style, end_range=(args.end_min, args.end_max),
+                        host=args.host, port=args.port).start()
+    print(f"桩服务已启动: {server.url}（{args.games} 场比赛），Ctrl+C 退出")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
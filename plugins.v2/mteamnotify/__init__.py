@@ -1,10 +1,10 @@
 import datetime
 import re
-from typing import Any, List, Dict, Tuple, Optional
+from typing import Any, List, Dict, Tuple
 
 import pytz
-from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from fastapi.responses import PlainTextResponse
 
 from app.chain.system import SystemChain
 from app.core.config import settings
@@ -12,13 +12,23 @@ from app.helper.system import SystemHelper
 from app.log import logger
 from app.plugins import _PluginBase
 from app.schemas import NotificationType
-from app.utils.http import RequestUtils
+
+try:
+    # 已安装 M-Team菠菜助手 时使用其公共组件，与下注插件共用比赛列表、事件源、限速器与指标
+    from app.plugins.mteambethelper.mteamapi import Game, GameEvent, game_feed, game_list_client, \
+        rate_limiter, metrics, PROMETHEUS_CONTENT_TYPE, ADDED, ODDS_CHANGED, CLOSING
+    SHARED_MTEAMAPI = True
+except ImportError:
+    # 插件市场按目录单独安装插件，未安装下注插件时使用随插件分发的副本，列表请求与限速单独计算
+    from .mteamapi import Game, GameEvent, game_feed, game_list_client, rate_limiter, metrics, \
+        PROMETHEUS_CONTENT_TYPE, ADDED, ODDS_CHANGED, CLOSING
+    SHARED_MTEAMAPI = False
 
 class MteamNotify(_PluginBase):
     plugin_name = "mteam比赛通知"
     plugin_desc = "获取新比赛并推送通知"
     plugin_icon = "https://raw.githubusercontent.com/litaobo/MoviePilot-Plugins/main/icons/mteam_bet.png"
-    plugin_version = "1.0"
+    plugin_version = "1.2"
     plugin_author = "litaobo"
     author_url = "https://github.com/litaobo"
     plugin_config_prefix = "mteamnotify_"
@@ -30,8 +40,13 @@ class MteamNotify(_PluginBase):
     _cron = None
     _notify = False
     _api_key = ""  # 存储API Key
-
-    _scheduler: Optional[BackgroundScheduler] = None
+    # 自适应检查：由比赛事件源按最近的截止时间安排检查，不再使用cron
+    _adaptive = False
+    _min_interval = 60
+    _max_interval = 3600
+    _hourly_budget = 30
+    # 比赛截止前N分钟推送提醒，0为不提醒
+    _closing_minutes = 0
 
     def init_plugin(self, config: dict = None):
         # 停止现有任务
@@ -42,51 +57,52 @@ class MteamNotify(_PluginBase):
             self._cron = config.get("cron")
             self._notify = config.get("notify")
             self._api_key = config.get("api_key", "")  # 从配置中获取API Key
+            self._adaptive = config.get("adaptive", False)
+            self._min_interval = int(config.get("min_interval", 60))
+            self._max_interval = int(config.get("max_interval", 3600))
+            self._hourly_budget = int(config.get("hourly_budget", 30))
+            self._closing_minutes = int(config.get("closing_minutes", 0))
+
+        # 订阅比赛事件源，只推送新出现、赔率有变化及即将截止的比赛；
+        # 比赛列表与其他订阅者共用一次请求，自适应检查时由事件源安排，否则按cron周期检查
+        if self._enabled:
+            game_feed.subscribe(self.__class__.__name__, self.__on_game_events,
+                                api_key=self._api_key,
+                                proxies=settings.PROXY,
+                                closing_window=self._closing_minutes * 60,
+                                auto_poll=self._adaptive,
+                                min_interval=self._min_interval,
+                                max_interval=self._max_interval,
+                                hourly_budget=self._hourly_budget)
 
-    def __fetch_and_notify(self):
+    @staticmethod
+    def __poll():
         """
-        获取新比赛并推送通知
+        按cron周期检查比赛，变化通过比赛事件推送
         """
-        # 请求获取比赛列表
-        response = self.__get_bet_game_list()
-        if response and response.get('code') == '0':
-            games = response.get('data', [])
-            for game in games:
-                # 生成比赛标题和内容
-                title = game.get('heading', '未知比赛')
-                endtime = game.get('endtime', '未知时间')
-                options_list = game.get('optionsList', [])
-                options = '\n'.join([f"{option['text']} - {option['odds']}" for option in options_list])
-
-                # 推送通知
-                self.__notify_game(title, endtime, options)
-        else:
+        if game_feed.poll() is None:
             logger.error("获取比赛列表失败或返回数据不正确")
 
-    def __get_bet_game_list(self) -> dict:
+    def __on_game_events(self, events: List[GameEvent]):
         """
-        调用API获取比赛列表
+        推送新出现、赔率变化及即将截止的比赛
         """
-        url = "https://api.m-team.io/api/bet/findBetgameList"  # 主接口
-        headers = {
-            "Content-Type": "application/x-www-form-urlencoded",
-            "x-api-key": self._api_key  # 使用配置中的API Key
-        }
-        data = {
-            "active": "LIVE",
-            "fix": 0
-        }
-        response = RequestUtils(
-            proxies=settings.PROXY,
-            headers=headers
-        ).post_res(url, data)
-        return response.json() if response else {}
+        for event in events:
+            if event.kind in (ADDED, ODDS_CHANGED):
+                self.__notify_game(event.game)
+            elif event.kind == CLOSING:
+                self.__notify_game(event.game, closing=True)
 
-    def __notify_game(self, title: str, endtime: str, options: str):
+    def __notify_game(self, game: Game, closing: bool = False):
         """
         推送比赛通知
         """
         if self._notify:
+            title = game.heading or '未知比赛'
+            if closing:
+                title = f"【即将截止】{title}"
+            options = '\n'.join([f"{option.text} - {option.odds:g}" for option in game.options])
+            endtime = game.end_text or '未知时间'
             message = f"\n{title}\n┄┄┄┄┄┄┄┄┄┄┄┄┄┄┄\n{options}\n┄┄┄┄┄┄┄┄┄┄┄┄┄┄┄\n{endtime}"
             self.post_message(
                 mtype=NotificationType.SiteMessage,
@@ -98,19 +114,35 @@ class MteamNotify(_PluginBase):
         return self._enabled
 
     def get_api(self) -> List[Dict[str, Any]]:
-        pass
+        """
+        注册插件API，以 Prometheus 文本格式导出列表请求与下注相关指标
+        """
+        return [{
+            "path": "/metrics",
+            "endpoint": self.__metrics,
+            "methods": ["GET"],
+            "summary": "M-Team菠菜指标",
+            "description": "Prometheus 文本格式的列表请求延迟、响应大小、比赛数量等指标"
+        }]
+
+    @staticmethod
+    def __metrics() -> PlainTextResponse:
+        """
+        导出指标
+        """
+        return PlainTextResponse(metrics.render(), media_type=PROMETHEUS_CONTENT_TYPE)
 
     def get_service(self) -> List[Dict[str, Any]]:
         """
         注册插件公共服务
         """
-        if self._enabled and self._cron:
+        if self._enabled and self._cron and not self._adaptive:
             return [
                 {
                     "id": "BetGameNotify",
                     "name": "MT菠菜推送",
                     "trigger": CronTrigger.from_crontab(self._cron),
-                    "func": self.__fetch_and_notify,
+                    "func": self.__poll,
                     "kwargs": {}
                 }
             ]
@@ -200,6 +232,98 @@ class MteamNotify(_PluginBase):
                                 ]
                             },
                         ]
+                    },
+                    # 第三行：自适应检查与截止提醒
+                    {
+                        'component': 'VRow',
+                        'content': [
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VSwitch',
+                                        'props': {
+                                            'model': 'adaptive',
+                                            'label': '自适应检查',
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'min_interval',
+                                            'label': '最短检查间隔（秒）',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'max_interval',
+                                            'label': '最长检查间隔（秒）',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'hourly_budget',
+                                            'label': '每小时检查上限',
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            },
+                            {
+                                'component': 'VCol',
+                                'props': {
+                                    'cols': 12,
+                                    'md': 3
+                                },
+                                'content': [
+                                    {
+                                        'component': 'VTextField',
+                                        'props': {
+                                            'model': 'closing_minutes',
+                                            'label': '截止提醒（分钟）',
+                                            'hint': '比赛截止前N分钟推送提醒，0为不提醒',
+                                            'persistent-hint': True,
+                                            'type': 'number'
+                                        }
+                                    }
+                                ]
+                            }
+                        ]
                     }
                 ]
             }
@@ -208,21 +332,46 @@ class MteamNotify(_PluginBase):
             "notify": False,
             "cron": "0 9 * * *",
             "api_key": "",  # 默认空API Key
+            "adaptive": False,
+            "min_interval": 60,
+            "max_interval": 3600,
+            "hourly_budget": 30,
+            "closing_minutes": 0
         }
 
     
     def get_page(self) -> List[dict]:
-        pass
+        """
+        插件详情页：共享比赛列表的请求统计、限速情况与指标摘要，完整指标见 /metrics 接口
+        """
+        next_poll = game_feed.next_poll_time
+        texts = [
+            '与 M-Team菠菜助手 共用比赛列表、事件源与限速器' if SHARED_MTEAMAPI else
+            '未安装 M-Team菠菜助手，使用插件自带的公共组件副本：比赛列表请求与API限速与下注插件分开计算',
+            f'比赛列表：{game_list_client.summary()}'
+            + (f'，下次检查 {datetime.datetime.fromtimestamp(next_poll).strftime("%H:%M:%S")}'
+               if self._adaptive and next_poll else ''),
+            rate_limiter.summary(),
+            f'指标：{metrics.summary()}'
+        ]
+        return [
+            {
+                'component': 'VAlert',
+                'props': {
+                    'type': 'info',
+                    'variant': 'tonal',
+                    'density': 'compact',
+                    'class': 'mb-4',
+                    'text': text
+                }
+            } for text in texts
+        ]
 
     def stop_service(self):
         """
-        退出插件
+        退出插件，取消比赛事件订阅；cron 任务由 get_service 注册到系统调度器
         """
         try:
-            if self._scheduler:
-                self._scheduler.remove_all_jobs()
-                if self._scheduler.running:
-                    self._scheduler.shutdown()
-                self._scheduler = None
+            game_feed.unsubscribe(self.__class__.__name__)
         except Exception as e:
             logger.error("退出插件失败：%s" % str(e))
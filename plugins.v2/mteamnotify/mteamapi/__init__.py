@@ -0,0 +1,18 @@
+# M-Team API 公共组件的副本：插件市场按目录单独安装插件，无法引用仓库中的 Plugins/mteamapi，
+# 这里只保留比赛列表、比赛事件源、限速与指标所需的模块。已安装 M-Team菠菜助手 时插件改用其公共组件，
+# 本副本只在单独安装时使用。
+# 各模块与 Plugins/mteamapi 中的同名文件保持一致，修改时先改 Plugins/mteamapi 再原样复制过来，
+# 提交前运行 python tools/check_vendored.py 检查。
+
+from .session import SessionPool
+from .hedge import Hedger, request_not_sent
+from .health import EndpointHealth, endpoint_health, MTEAM_API_URLS
+from .models import Game, Option, parse_games, parse_deadline
+from .diff import GameDiff, diff_games
+from .poller import AdaptivePoller
+from .clock import ClockSync, clock_sync
+from .jsonlib import decode_json, JSON_BACKEND
+from .client import GameListClient, game_list_client
+from .feed import GameFeed, GameEvent, game_feed, ADDED, ODDS_CHANGED, CLOSING, REMOVED
+from .ratelimit import RateLimiter, rate_limiter, BET, ODDS, POLL, NOTIFY, PRIORITY_NAMES
+from .metrics import Metrics, metrics, PROMETHEUS_CONTENT_TYPE
@@ -0,0 +1,95 @@
+import time
+from collections import deque
+from email.utils import parsedate_to_datetime
+from threading import Lock
+from typing import Optional
+
+
+class ClockSync:
+    """
+    服务器时钟校准：根据响应的Date头与请求往返时间估计服务器与本地的时钟偏差。
+    每个样本给出偏差的一个区间（Date头精确到秒，且生成于请求发出到收到响应之间），
+    对近期样本的区间取交集得到偏差与不确定度
+    """
+
+    def __init__(self, max_samples: int = 30, max_age: float = 3600):
+        self._samples = deque(maxlen=max_samples)
+        # 超过该秒数的样本不再参与计算，以适应本地时钟漂移
+        self._max_age = max_age
+        self._rtt: Optional[float] = None
+        self._lock = Lock()
+
+    def observe(self, date_header: Optional[str], sent_at: float, received_at: float) -> bool:
+        """
+        记录一次请求：date_header为响应的Date头，sent_at与received_at为本地发送与接收时间戳
+        """
+        if not date_header or received_at < sent_at:
+            return False
+        try:
+            server_time = parsedate_to_datetime(date_header).timestamp()
+        except (TypeError, ValueError):
+            return False
+        # 服务器时间位于[Date, Date+1)，对应的本地时间位于[发送, 接收]
+        low, high = server_time - received_at, server_time + 1 - sent_at
+        rtt = received_at - sent_at
+        with self._lock:
+            self._samples.append((received_at, low, high))
+            self._rtt = rtt if self._rtt is None else self._rtt + 0.2 * (rtt - self._rtt)
+        return True
+
+    def __bounds(self):
+        now = time.time()
+        with self._lock:
+            samples = [sample for sample in self._samples if now - sample[0] <= self._max_age]
+        if not samples:
+            return None
+        low = max(sample[1] for sample in samples)
+        high = min(sample[2] for sample in samples)
+        if low > high:
+            # 区间无交集说明时钟发生跳变，仅采用最新样本并丢弃旧样本
+            latest = samples[-1]
+            with self._lock:
+                self._samples.clear()
+                self._samples.append(latest)
+            low, high = latest[1], latest[2]
+        return low, high
+
+    @property
+    def offset(self) -> float:
+        """
+        服务器时间减本地时间（秒），尚无样本时为0
+        """
+        bounds = self.__bounds()
+        return (bounds[0] + bounds[1]) / 2 if bounds else 0.0
+
+    @property
+    def uncertainty(self) -> Optional[float]:
+        """
+        偏差估计的不确定度（秒），尚无样本时为None
+        """
+        bounds = self.__bounds()
+        return (bounds[1] - bounds[0]) / 2 if bounds else None
+
+    @property
+    def rtt(self) -> Optional[float]:
+        """
+        请求往返时间的平滑值（秒）
+        """
+        return self._rtt
+
+    def to_local(self, server_timestamp: float) -> float:
+        """
+        将服务器时间换算为本地时间，并按不确定度提前，保证不会晚于服务器上的对应时刻
+        """
+        return server_timestamp - self.offset - (self.uncertainty or 0.0)
+
+    def summary(self) -> str:
+        uncertainty = self.uncertainty
+        if uncertainty is None:
+            return "尚未校准"
+        rtt = f"{self._rtt * 1000:.0f}ms" if self._rtt is not None else "-"
+        return f"{self.offset:+.3f}s ±{uncertainty:.3f}s（往返 {rtt}，样本 {len(self._samples)}）"
+
+
+# 各插件共享的M-Team服务器时钟校准
+clock_sync = ClockSync()
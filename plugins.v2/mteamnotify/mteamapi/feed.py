@@ -0,0 +1,315 @@
+import logging
+import time
+from collections import deque
+from concurrent.futures import Future
+from threading import Condition, Event, Lock, Thread
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+from .client import GameListClient, game_list_client
+from .clock import clock_sync
+from .diff import diff_games
+from .hedge import Hedger
+from .models import Game
+from .poller import AdaptivePoller
+
+logger = logging.getLogger(__name__)
+
+# 事件类型：新比赛、赔率或截止时间变化、进入截止前窗口、比赛消失
+ADDED = "added"
+ODDS_CHANGED = "odds_changed"
+CLOSING = "closing"
+REMOVED = "removed"
+
+
+class GameEvent:
+    """
+    比赛事件，previous 为变化前的比赛（仅 ODDS_CHANGED）
+    """
+    __slots__ = ("kind", "game", "previous")
+
+    def __init__(self, kind: str, game: Game, previous: Optional[Game] = None):
+        self.kind = kind
+        self.game = game
+        self.previous = previous
+
+
+class _Subscriber:
+    """
+    订阅者：独立的事件队列与投递线程，处理缓慢时只会积压自己的队列，不会阻塞轮询
+    """
+
+    def __init__(self, name: str, callback: Callable[[List[GameEvent]], None], api_key: str,
+                 proxies: Optional[dict], hedger: Optional[Hedger], closing_window: float,
+                 auto_poll: bool, min_interval: float, max_interval: float, hourly_budget: int,
+                 max_queue: int):
+        self.name = name
+        self.callback = callback
+        self.api_key = api_key
+        self.proxies = proxies
+        self.hedger = hedger
+        self.closing_window = closing_window
+        self.auto_poll = auto_poll
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.hourly_budget = hourly_budget
+        # 已发送过截止事件的比赛
+        self.closing_sent: Set[str] = set()
+        self.delivered = 0
+        self.dropped = 0
+        self._queue = deque()
+        self._max_queue = max(int(max_queue), 1)
+        self._cond = Condition()
+        self._running = True
+        self._thread = Thread(target=self.__run, name=f"game-feed-{name}", daemon=True)
+        self._thread.start()
+
+    def put(self, events: List[GameEvent]):
+        with self._cond:
+            self._queue.extend(events)
+            # 队列超限时丢弃最早的事件
+            while len(self._queue) > self._max_queue:
+                self._queue.popleft()
+                self.dropped += 1
+            self._cond.notify()
+
+    @property
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._queue)
+
+    def stop(self):
+        with self._cond:
+            self._running = False
+            self._queue.clear()
+            self._cond.notify()
+
+    def __run(self):
+        while True:
+            with self._cond:
+                while self._running and not self._queue:
+                    self._cond.wait()
+                if not self._running:
+                    return
+                events = list(self._queue)
+                self._queue.clear()
+            try:
+                self.callback(events)
+            except Exception as e:
+                logger.error(f"比赛事件处理失败（{self.name}）：{str(e)}")
+            self.delivered += len(events)
+
+
+class GameFeed:
+    """
+    比赛事件源：统一轮询比赛列表，与上次结果比较后向各订阅者发布事件，
+    比赛进入订阅者设定的截止前窗口时另外发布截止事件。
+    有订阅者要求自动轮询时，由后台线程按最近的截止时间自适应轮询，否则由订阅者调用 poll() 驱动；
+    有订阅者设定了截止前窗口时，后台线程即使不轮询也会按时发布截止事件
+    """
+
+    def __init__(self, client: GameListClient = game_list_client):
+        self._client = client
+        self._lock = Lock()
+        # 正在进行的轮询，并发调用 poll() 时共用其结果
+        self._inflight: Optional[Future] = None
+        self._subscribers: Dict[str, _Subscriber] = {}
+        self._games: Dict[str, Game] = {}
+        self._poller = AdaptivePoller()
+        self._wake = Event()
+        self._thread: Optional[Thread] = None
+        # 自动轮询连续失败的次数，用于退避
+        self._failures = 0
+        # 下次自动轮询的时间戳
+        self.next_poll_time: Optional[float] = None
+
+    def subscribe(self, name: str, callback: Callable[[List[GameEvent]], None], api_key: str,
+                  proxies: Optional[dict] = None, closing_window: float = 0, auto_poll: bool = True,
+                  min_interval: float = 30, max_interval: float = 900, hourly_budget: int = 60,
+                  hedger: Optional[Hedger] = None, max_queue: int = 10000, replay: bool = False):
+        """
+        订阅比赛事件，同名订阅会被替换；replay 为True且已有比赛数据时，立即向新订阅者补发新比赛事件，
+        供需要按现有比赛安排任务的订阅者使用，只关心新比赛的订阅者不补发，避免每次保存配置都重复处理
+        """
+        subscriber = _Subscriber(name, callback, api_key, proxies, hedger, closing_window, auto_poll,
+                                 min_interval, max_interval, hourly_budget, max_queue)
+        with self._lock:
+            previous = self._subscribers.pop(name, None)
+            self._subscribers[name] = subscriber
+            games = list(self._games.values())
+            self.__configure_poller()
+        if previous:
+            previous.stop()
+        if replay and games:
+            subscriber.put([GameEvent(ADDED, game) for game in games])
+        self.__ensure_thread()
+
+    def unsubscribe(self, name: str):
+        with self._lock:
+            subscriber = self._subscribers.pop(name, None)
+            self.__configure_poller()
+        if subscriber:
+            subscriber.stop()
+        self._wake.set()
+
+    @property
+    def games(self) -> List[Game]:
+        """
+        最近一次轮询得到的比赛列表
+        """
+        with self._lock:
+            return list(self._games.values())
+
+    def poll(self, max_age: Optional[float] = None) -> Optional[List[Game]]:
+        """
+        立即轮询一次并发布事件，请求失败时返回None。已有轮询在进行时等待并返回其结果，
+        max_age 内已获取过的列表直接复用，不会重复请求
+        """
+        with self._lock:
+            flight = self._inflight
+            leader = flight is None
+            if leader:
+                flight = self._inflight = Future()
+        if not leader:
+            return flight.result()
+        games = None
+        try:
+            games = self.__poll(max_age)
+        finally:
+            with self._lock:
+                self._inflight = None
+            flight.set_result(games)
+        return games
+
+    def __poll(self, max_age: Optional[float]) -> Optional[List[Game]]:
+        with self._lock:
+            api_key, proxies, hedger = self.__request_options()
+        # 只有实际发出的请求计入每小时请求预算
+        games = self._client.fetch(api_key, proxies=proxies, max_age=max_age, hedger=hedger,
+                                   on_request=self._poller.record)
+        if games is None:
+            return None
+        with self._lock:
+            diff = diff_games(self._games, games)
+            previous = self._games
+            self._games = {game.id: game for game in games}
+            subscribers = list(self._subscribers.values())
+        events = [GameEvent(ADDED, game) for game in diff.added]
+        events += [GameEvent(ODDS_CHANGED, game, previous.get(game.id)) for game in diff.changed]
+        events += [GameEvent(REMOVED, game) for game in diff.removed]
+        if events:
+            for subscriber in subscribers:
+                # 截止时间可能已变化，允许重新发布截止事件
+                for event in events:
+                    if event.kind != ADDED:
+                        subscriber.closing_sent.discard(event.game.id)
+                subscriber.put(events)
+        self.__publish_closing()
+        # 比赛列表已更新，唤醒后台线程重新计算下一场比赛进入截止窗口的时间
+        self._wake.set()
+        return games
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """
+        各订阅者已投递、待处理与丢弃的事件数
+        """
+        with self._lock:
+            return {name: {"delivered": sub.delivered, "pending": sub.pending, "dropped": sub.dropped}
+                    for name, sub in self._subscribers.items()}
+
+    def __request_options(self) -> Tuple[str, Optional[dict], Optional[Hedger]]:
+        """
+        使用最近订阅且配置了API Key的订阅者的请求参数，对冲器取任一启用了对冲的订阅者
+        """
+        api_key, proxies, hedger = "", None, None
+        for subscriber in reversed(list(self._subscribers.values())):
+            if not api_key and subscriber.api_key:
+                api_key, proxies = subscriber.api_key, subscriber.proxies
+            if not hedger and subscriber.hedger:
+                hedger = subscriber.hedger
+        return api_key, proxies, hedger
+
+    def __configure_poller(self):
+        """
+        多个订阅者要求自动轮询时，取最短的间隔与最大的请求预算
+        """
+        subscribers = [sub for sub in self._subscribers.values() if sub.auto_poll]
+        if not subscribers:
+            return
+        self._poller.min_interval = max(min(sub.min_interval for sub in subscribers), 1.0)
+        self._poller.max_interval = max(min(sub.max_interval for sub in subscribers), self._poller.min_interval)
+        self._poller.hourly_budget = max(max(sub.hourly_budget for sub in subscribers), 1)
+
+    def __publish_closing(self) -> Optional[float]:
+        """
+        向订阅者发布进入截止前窗口的比赛，返回下一场比赛进入窗口的时间
+        """
+        now = time.time()
+        upcoming = None
+        with self._lock:
+            games = list(self._games.values())
+            subscribers = [sub for sub in self._subscribers.values() if sub.closing_window > 0]
+        for subscriber in subscribers:
+            events = []
+            for game in games:
+                if not game.deadline or game.id in subscriber.closing_sent:
+                    continue
+                deadline = clock_sync.to_local(game.deadline)
+                if deadline <= now:
+                    continue
+                enter_at = deadline - subscriber.closing_window
+                if enter_at <= now:
+                    subscriber.closing_sent.add(game.id)
+                    events.append(GameEvent(CLOSING, game))
+                elif upcoming is None or enter_at < upcoming:
+                    upcoming = enter_at
+            if events:
+                subscriber.put(events)
+        return upcoming
+
+    def __needs_thread(self) -> bool:
+        return any(sub.auto_poll or sub.closing_window > 0 for sub in self._subscribers.values())
+
+    def __ensure_thread(self):
+        with self._lock:
+            if not self.__needs_thread():
+                return
+            if self._thread and self._thread.is_alive():
+                self._wake.set()
+                return
+            self._thread = Thread(target=self.__run, name="game-feed", daemon=True)
+            self._thread.start()
+
+    def __run(self):
+        while True:
+            self._wake.clear()
+            with self._lock:
+                if not self.__needs_thread():
+                    self._thread = None
+                    self.next_poll_time = None
+                    return
+                auto_poll = any(sub.auto_poll for sub in self._subscribers.values())
+            if not auto_poll:
+                # 只需发布截止事件，比赛列表由订阅者调用 poll() 更新
+                self.next_poll_time = None
+            elif self.next_poll_time is None or time.time() >= self.next_poll_time:
+                try:
+                    # 自动轮询的间隔可能短于客户端缓存有效期，只接受半个最短间隔内的缓存
+                    games = self.poll(max_age=self._poller.min_interval / 2)
+                except Exception as e:
+                    games = None
+                    logger.error(f"轮询比赛列表失败：{str(e)}")
+                # 请求失败或被限速丢弃时在请求预算内指数退避
+                if games is not None:
+                    self._failures = 0
+                    interval = self._poller.next_interval(self.games)
+                else:
+                    self._failures += 1
+                    interval = self._poller.retry_interval(self._failures)
+                self.next_poll_time = time.time() + interval
+            upcoming = self.__publish_closing()
+            wake_times = [at for at in (self.next_poll_time, upcoming) if at is not None]
+            self._wake.wait(max(min(wake_times) - time.time(), 0) if wake_times else None)
+
+
+# 所有插件共用的比赛事件源
+game_feed = GameFeed()
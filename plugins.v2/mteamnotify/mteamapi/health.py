@@ -0,0 +1,180 @@
+import threading
+import time
+from typing import Dict, List, Optional
+
+import requests
+
+from .ratelimit import rate_limiter, NOTIFY
+
+# M-Team API 主站与备用站
+MTEAM_API_URLS = ["https://api.m-team.io", "https://api.m-team.cc"]
+
+
+class _Endpoint:
+    """
+    单个API地址的健康统计
+    """
+
+    def __init__(self, url: str):
+        self.url = url
+        # 延迟的指数加权平均（秒），None表示尚无样本
+        self.latency: Optional[float] = None
+        # 错误率的指数加权平均
+        self.error_rate: float = 0.0
+        # 连续失败次数
+        self.failures: int = 0
+        # 熔断打开的时间，0表示未熔断
+        self.opened_at: float = 0.0
+        # 当前熔断冷却时间
+        self.cooldown: float = 0.0
+        self.requests: int = 0
+
+
+class EndpointHealth:
+    """
+    API地址健康状态跟踪：记录延迟与错误率，连续失败时熔断，并在后台探测恢复，
+    请求时按健康状况选择最快的可用地址
+    """
+
+    def __init__(self, urls: List[str], alpha: float = 0.3, failure_threshold: int = 3,
+                 cooldown: float = 30, max_cooldown: float = 600):
+        self._alpha = alpha
+        self._failure_threshold = failure_threshold
+        self._base_cooldown = cooldown
+        self._max_cooldown = max_cooldown
+        self._endpoints: Dict[str, _Endpoint] = {url: _Endpoint(url) for url in urls}
+        self._proxies: Optional[dict] = None
+        self._lock = threading.Lock()
+        self._probe_thread: Optional[threading.Thread] = None
+
+    def configure(self, proxies: Optional[dict] = None, urls: Optional[List[str]] = None):
+        """
+        设置后台探测使用的代理；指定 urls 时替换API地址列表（如指向本地桩服务），保留已有地址的统计
+        """
+        self._proxies = proxies
+        if urls:
+            with self._lock:
+                self._endpoints = {url: self._endpoints.get(url) or _Endpoint(url)
+                                   for url in (url.rstrip("/") for url in urls)}
+
+    def record(self, url: str, latency: float, ok: bool):
+        """
+        记录一次请求的结果
+        """
+        endpoint = self._endpoints.get(url.rstrip("/"))
+        if not endpoint:
+            return
+        with self._lock:
+            endpoint.requests += 1
+            endpoint.error_rate += self._alpha * ((0.0 if ok else 1.0) - endpoint.error_rate)
+            if ok:
+                if endpoint.latency is None:
+                    endpoint.latency = latency
+                else:
+                    endpoint.latency += self._alpha * (latency - endpoint.latency)
+                endpoint.failures = 0
+                endpoint.opened_at = 0.0
+                endpoint.cooldown = 0.0
+                return
+            endpoint.failures += 1
+            if endpoint.failures >= self._failure_threshold and not endpoint.opened_at:
+                endpoint.opened_at = time.monotonic()
+                endpoint.cooldown = self._base_cooldown
+        if endpoint.opened_at:
+            self.__ensure_probing()
+
+    def available(self, url: str) -> bool:
+        """
+        地址是否可用（熔断未打开）
+        """
+        endpoint = self._endpoints.get(url.rstrip("/"))
+        return bool(endpoint) and not endpoint.opened_at
+
+    def ordered(self) -> List[str]:
+        """
+        按健康状况排序的地址列表：未熔断的在前并按延迟升序，熔断中的排在最后
+        """
+        with self._lock:
+            endpoints = list(self._endpoints.values())
+        index = {url: i for i, url in enumerate(self._endpoints)}
+        # 尚无成功样本的地址按已知最慢的延迟计算，只有失败记录的地址不会因延迟为0排到健康地址之前
+        worst = max((endpoint.latency for endpoint in endpoints if endpoint.latency is not None), default=0.0)
+
+        def key(endpoint: _Endpoint):
+            latency = endpoint.latency if endpoint.latency is not None else worst
+            # 错误率折算为延迟惩罚，避免偶发失败的地址仍被优先选中；延迟相同（如均无样本）时按错误率排序
+            return (bool(endpoint.opened_at), latency * (1 + endpoint.error_rate * 4), endpoint.error_rate,
+                    index[endpoint.url])
+
+        return [endpoint.url for endpoint in sorted(endpoints, key=key)]
+
+    def best(self) -> str:
+        """
+        当前最优地址
+        """
+        return self.ordered()[0]
+
+    def snapshot(self) -> List[dict]:
+        """
+        各地址的健康统计
+        """
+        with self._lock:
+            return [{
+                "url": endpoint.url,
+                "latency_ms": round(endpoint.latency * 1000) if endpoint.latency is not None else None,
+                "error_rate": round(endpoint.error_rate, 3),
+                "failures": endpoint.failures,
+                "open": bool(endpoint.opened_at),
+                "requests": endpoint.requests
+            } for endpoint in self._endpoints.values()]
+
+    def __ensure_probing(self):
+        """
+        有地址熔断时启动后台探测线程，全部恢复后线程自动退出
+        """
+        with self._lock:
+            if self._probe_thread and self._probe_thread.is_alive():
+                return
+            self._probe_thread = threading.Thread(target=self.__probe_loop, name="mteam-health-probe",
+                                                  daemon=True)
+            self._probe_thread.start()
+
+    def __probe_loop(self):
+        while True:
+            now = time.monotonic()
+            with self._lock:
+                opened = [endpoint for endpoint in self._endpoints.values() if endpoint.opened_at]
+                due = [endpoint for endpoint in opened if now - endpoint.opened_at >= endpoint.cooldown]
+                if not opened:
+                    self._probe_thread = None
+                    return
+            for endpoint in due:
+                self.__probe(endpoint)
+            time.sleep(1)
+
+    def __probe(self, endpoint: _Endpoint):
+        """
+        半开探测：探测成功则关闭熔断，失败则加倍冷却时间；限速时跳过本轮探测
+        """
+        if not rate_limiter.acquire(NOTIFY):
+            return
+        start = time.monotonic()
+        try:
+            response = requests.head(endpoint.url, proxies=self._proxies, timeout=5, allow_redirects=False)
+            ok = response.status_code < 500
+        except Exception:
+            ok = False
+        latency = time.monotonic() - start
+        with self._lock:
+            if ok:
+                endpoint.latency = latency
+                endpoint.failures = 0
+                endpoint.opened_at = 0.0
+                endpoint.cooldown = 0.0
+            else:
+                endpoint.opened_at = time.monotonic()
+                endpoint.cooldown = min(endpoint.cooldown * 2 or self._base_cooldown, self._max_cooldown)
+
+
+# 各插件共享的M-Team API健康状态
+endpoint_health = EndpointHealth(MTEAM_API_URLS)
@@ -0,0 +1,28 @@
+import json
+from typing import Any, Union
+
+import requests
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# 当前使用的JSON解析后端，安装了 orjson 时优先使用
+JSON_BACKEND = "orjson" if orjson else "json"
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """
+    解析JSON文本，解析失败时抛出 ValueError
+    """
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def decode_json(response: requests.Response) -> Any:
+    """
+    解析响应体，直接对原始字节解码，避免 response.json() 的编码探测与重复解析
+    """
+    return loads(response.content)
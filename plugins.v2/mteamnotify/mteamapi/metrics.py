@@ -0,0 +1,185 @@
+import math
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Prometheus 文本格式的 Content-Type
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+COUNTER = "counter"
+HISTOGRAM = "histogram"
+
+LIST_FETCH_SECONDS = "mteam_list_fetch_seconds"
+LIST_PAYLOAD_BYTES = "mteam_list_payload_bytes"
+LIST_GAMES = "mteam_list_games"
+BET_REQUEST_SECONDS = "mteam_bet_request_seconds"
+TIMER_LATENESS_SECONDS = "mteam_timer_lateness_seconds"
+BET_DEADLINE_SLACK_SECONDS = "mteam_bet_deadline_slack_seconds"
+BET_RESULTS = "mteam_bet_results_total"
+
+# 指标名 -> (类型, 说明, 直方图分桶上界)
+DEFINITIONS: Dict[str, Tuple[str, str, Tuple[float, ...]]] = {
+    LIST_FETCH_SECONDS: (HISTOGRAM, "findBetgameList request latency in seconds",
+                         (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    LIST_PAYLOAD_BYTES: (HISTOGRAM, "findBetgameList response size in bytes",
+                         (1024, 4096, 16384, 65536, 262144, 1048576)),
+    LIST_GAMES: (HISTOGRAM, "Number of games returned by findBetgameList",
+                 (0, 1, 2, 5, 10, 20, 50, 100)),
+    BET_REQUEST_SECONDS: (HISTOGRAM, "betgameOdds request latency in seconds",
+                          (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)),
+    TIMER_LATENESS_SECONDS: (HISTOGRAM, "Actual minus planned fire time of timer jobs in seconds",
+                             (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)),
+    BET_DEADLINE_SLACK_SECONDS: (HISTOGRAM, "Seconds between bet acknowledgment and game end time",
+                                 (-1, 0, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30)),
+    BET_RESULTS: (COUNTER, "Bet request outcomes by result and reason", ()),
+}
+
+
+class _Histogram:
+    """
+    累积分桶直方图，另记录最小值与最大值用于页面摘要
+    """
+
+    __slots__ = ("bounds", "buckets", "count", "sum", "min", "max")
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        self.buckets = [0] * len(bounds)
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.buckets[i] += 1
+        self.count += 1
+        self.sum += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    # repr 保留浮点数的全部精度，累计值很大时不会被截断为6位有效数字
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(pairs: Iterable[Tuple[str, str]]) -> str:
+    text = ",".join(f'{key}="{_escape(value)}"' for key, value in pairs)
+    return f"{{{text}}}" if text else ""
+
+
+class Metrics:
+    """
+    进程内的计数器与直方图，所有插件共用，按 Prometheus 文本格式导出
+    """
+
+    # 失败原因作为标签值，过长的服务端消息截断，避免标签过多过长
+    MAX_REASON = 64
+
+    def __init__(self):
+        self._lock = Lock()
+        self._series: Dict[str, Dict[Tuple[Tuple[str, str], ...], object]] = {name: {} for name in DEFINITIONS}
+
+    def observe(self, name: str, value: float, **labels: str):
+        """
+        向直方图记录一个观测值
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._series[name]
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = _Histogram(DEFINITIONS[name][2])
+            histogram.observe(float(value))
+
+    def inc(self, name: str, value: float = 1, **labels: str):
+        """
+        计数器加值
+        """
+        key = tuple(sorted((k, str(v)) for k, v in labels.items()))
+        with self._lock:
+            series = self._series[name]
+            series[key] = series.get(key, 0) + value
+
+    def record_bet(self, success: bool, reason: Optional[str] = None):
+        """
+        记录一次下注请求的结果，失败时按原因（服务端消息、状态码或异常类型）分类
+        """
+        reason = "" if success else (reason or "unknown")[:self.MAX_REASON]
+        self.inc(BET_RESULTS, result="success" if success else "failure", reason=reason)
+
+    def render(self) -> str:
+        """
+        导出 Prometheus 文本格式
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, (kind, description, _) in DEFINITIONS.items():
+                lines.append(f"# HELP {name} {description}")
+                lines.append(f"# TYPE {name} {kind}")
+                for key, value in self._series[name].items():
+                    if kind == COUNTER:
+                        lines.append(f"{name}{_labels(key)} {_format_value(value)}")
+                        continue
+                    for bound, count in zip(value.bounds + (math.inf,), value.buckets + [value.count]):
+                        lines.append(f"{name}_bucket{_labels(key + (('le', _format_value(float(bound))),))} {count}")
+                    lines.append(f"{name}_sum{_labels(key)} {_format_value(value.sum)}")
+                    lines.append(f"{name}_count{_labels(key)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+    def histogram(self, name: str) -> Optional[dict]:
+        """
+        合并各标签的直方图，返回次数、平均、最小与最大值，尚无观测时返回None
+        """
+        with self._lock:
+            series = [h for h in self._series[name].values() if h.count]
+            if not series:
+                return None
+            count = sum(h.count for h in series)
+            return {
+                "count": count,
+                "avg": sum(h.sum for h in series) / count,
+                "min": min(h.min for h in series),
+                "max": max(h.max for h in series)
+            }
+
+    def bet_results(self) -> Dict[str, int]:
+        """
+        下注成功数与按原因统计的失败数
+        """
+        results: Dict[str, int] = {}
+        with self._lock:
+            for key, count in self._series[BET_RESULTS].items():
+                labels = dict(key)
+                reason = "成功" if labels.get("result") == "success" else labels.get("reason") or "unknown"
+                results[reason] = results.get(reason, 0) + int(count)
+        return results
+
+    def summary(self) -> str:
+        parts = []
+        fetch = self.histogram(LIST_FETCH_SECONDS)
+        if fetch:
+            parts.append(f"列表请求 {fetch['count']} 次，平均 {fetch['avg'] * 1000:.0f}ms")
+        bet = self.histogram(BET_REQUEST_SECONDS)
+        if bet:
+            parts.append(f"下注请求 {bet['count']} 次，平均 {bet['avg'] * 1000:.0f}ms，"
+                         f"最慢 {bet['max'] * 1000:.0f}ms")
+        slack = self.histogram(BET_DEADLINE_SLACK_SECONDS)
+        if slack:
+            parts.append(f"距截止余量平均 {slack['avg'] * 1000:.0f}ms，最少 {slack['min'] * 1000:.0f}ms")
+        results = self.bet_results()
+        if results:
+            parts.append("下注结果：" + "，".join(f"{reason} {count}" for reason, count in
+                                              sorted(results.items(), key=lambda item: -item[1])))
+        return "；".join(parts) if parts else "暂无指标数据"
+
+
+# 所有插件共用的指标
+metrics = Metrics()
@@ -0,0 +1,60 @@
+import time
+from collections import deque
+from threading import Lock
+from typing import Iterable, Optional
+
+from .models import Game
+
+
+class AdaptivePoller:
+    """
+    按最近的比赛截止时间决定下一次轮询时间：截止临近时加快，空闲时放慢，
+    间隔限制在最小与最大值之间，并受每小时请求预算约束
+    """
+
+    def __init__(self, min_interval: float = 30, max_interval: float = 900,
+                 hourly_budget: int = 60, divisor: float = 4):
+        self.min_interval = max(float(min_interval), 1.0)
+        self.max_interval = max(float(max_interval), self.min_interval)
+        self.hourly_budget = max(int(hourly_budget), 1)
+        # 截止前剩余时间内希望轮询的次数
+        self._divisor = max(float(divisor), 1.0)
+        self._polls = deque()
+        self._lock = Lock()
+
+    def record(self, now: Optional[float] = None):
+        """
+        记录一次实际轮询
+        """
+        with self._lock:
+            self._polls.append(now or time.time())
+
+    def next_interval(self, games: Iterable[Game], now: Optional[float] = None) -> float:
+        """
+        计算距下一次轮询的秒数
+        """
+        now = now or time.time()
+        deadlines = [game.deadline for game in games if game.deadline and game.deadline > now]
+        if deadlines:
+            interval = (min(deadlines) - now) / self._divisor
+        else:
+            interval = self.max_interval
+        interval = min(max(interval, self.min_interval), self.max_interval)
+        return self.__within_budget(interval, now)
+
+    def retry_interval(self, failures: int, now: Optional[float] = None) -> float:
+        """
+        连续失败后距下次轮询的秒数：从最短间隔起按失败次数指数退避，同样受每小时请求预算约束
+        """
+        now = now or time.time()
+        interval = min(self.min_interval * 2 ** max(failures - 1, 0), self.max_interval)
+        return self.__within_budget(interval, now)
+
+    def __within_budget(self, interval: float, now: float) -> float:
+        # 一小时内的轮询次数已达预算时，等到最早的一次移出窗口
+        with self._lock:
+            while self._polls and now - self._polls[0] >= 3600:
+                self._polls.popleft()
+            if len(self._polls) >= self.hourly_budget:
+                interval = max(interval, self._polls[0] + 3600 - now)
+        return interval
@@ -0,0 +1,178 @@
+import socket
+import time
+from threading import Lock
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .ratelimit import rate_limiter, ODDS
+from .trace import mark_current, CONNECTED, SENT, FIRST_BYTE
+
+
+class _TracedConnection:
+    """
+    记录建立连接、写完请求与解析完响应头的时刻，写入当前线程正在发送的下注时间线
+    """
+
+    def connect(self):
+        super().connect()
+        mark_current(CONNECTED)
+
+    def request(self, *args, **kwargs):
+        result = super().request(*args, **kwargs)
+        mark_current(SENT)
+        return result
+
+    def getresponse(self, *args, **kwargs):
+        response = super().getresponse(*args, **kwargs)
+        mark_current(FIRST_BYTE)
+        return response
+
+
+class _TracedHTTPConnection(_TracedConnection, HTTPConnection):
+    pass
+
+
+class _TracedHTTPSConnection(_TracedConnection, HTTPSConnection):
+    pass
+
+
+class _TracedPool:
+    """
+    从池中取出已建立的连接时即视为取得连接，新连接在建立完成时记录
+    """
+
+    def _get_conn(self, *args, **kwargs):
+        conn = super()._get_conn(*args, **kwargs)
+        if getattr(conn, "sock", None) is not None:
+            mark_current(CONNECTED)
+        return conn
+
+
+class _TracedHTTPConnectionPool(_TracedPool, HTTPConnectionPool):
+    ConnectionCls = _TracedHTTPConnection
+
+
+class _TracedHTTPSConnectionPool(_TracedPool, HTTPSConnectionPool):
+    ConnectionCls = _TracedHTTPSConnection
+
+
+_TRACED_POOLS = {"http": _TracedHTTPConnectionPool, "https": _TracedHTTPSConnectionPool}
+
+
+class TracingAdapter(HTTPAdapter):
+    """
+    使用可记录时间线的连接池，直连与经HTTP代理的请求都能记录真实的连接与发送时刻；
+    SOCKS代理使用自己的连接池，不记录
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _TRACED_POOLS
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        if not proxy.lower().startswith("socks"):
+            manager.pool_classes_by_scheme = _TRACED_POOLS
+        return manager
+
+
+class SessionPool:
+    """
+    按API地址复用的长连接会话池，插件生命周期内共享，避免每次请求重新进行DNS、TCP和TLS握手
+    """
+
+    def __init__(self, pool_size: int = 4, idle_timeout: int = 60):
+        # 每个API地址保持的最大连接数
+        self._pool_size = max(int(pool_size), 1)
+        # 会话空闲超过该秒数后重建，避免复用已被服务端关闭的连接
+        self._idle_timeout = max(int(idle_timeout), 0)
+        self._sessions: Dict[str, Tuple[requests.Session, float]] = {}
+        # 各API地址最近一次预热成功的时间
+        self._warmed: Dict[str, float] = {}
+        self._lock = Lock()
+
+    def get(self, base_url: str) -> requests.Session:
+        """
+        获取指定API地址的会话，不存在或空闲超时时重新创建
+        """
+        base_url = base_url.rstrip("/")
+        now = time.monotonic()
+        with self._lock:
+            session, last_used = self._sessions.get(base_url, (None, 0.0))
+            if session and self._idle_timeout and now - last_used > self._idle_timeout:
+                session.close()
+                session = None
+            if not session:
+                session = self.__new_session()
+            self._sessions[base_url] = (session, now)
+            return session
+
+    def __new_session(self) -> requests.Session:
+        """
+        创建带连接池的会话，不做自动重试，由调用方决定是否切换地址
+        """
+        session = requests.Session()
+        adapter = TracingAdapter(pool_connections=1,
+                                 pool_maxsize=self._pool_size,
+                                 max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def warm_up(self, base_url: str, proxies: Optional[dict] = None, timeout: float = 5,
+                max_age: float = 0) -> bool:
+        """
+        预热连接：提前完成DNS解析并建立TLS连接，连接保留在池中供随后的请求直接使用；
+        max_age 秒内已预热过同一地址时不再重复请求，多场比赛先后截止时只预热一次
+        """
+        base_url = base_url.rstrip("/")
+        with self._lock:
+            warmed_at = self._warmed.get(base_url)
+        if max_age > 0 and warmed_at is not None and time.monotonic() - warmed_at < max_age:
+            return True
+        parsed = urlparse(base_url)
+        try:
+            if not proxies:
+                socket.getaddrinfo(parsed.hostname, parsed.port or 443, type=socket.SOCK_STREAM)
+            if not rate_limiter.acquire(ODDS):
+                # 令牌紧张时不发预热请求，把额度留给下注
+                return False
+            self.get(base_url).head(base_url, proxies=proxies, timeout=timeout, allow_redirects=False)
+        except Exception:
+            return False
+        with self._lock:
+            self._warmed[base_url] = time.monotonic()
+        return True
+
+    def prepare(self, base_url: str, url: str, headers: dict, data: dict) -> requests.PreparedRequest:
+        """
+        预先构建POST请求，发送时无需再序列化表单和请求头
+        """
+        return self.get(base_url).prepare_request(
+            requests.Request(method="POST", url=url, headers=headers, data=data)
+        )
+
+    def send(self, base_url: str, prepared: requests.PreparedRequest,
+             proxies: Optional[dict] = None, timeout: float = 30) -> requests.Response:
+        """
+        通过已有连接发送预构建的请求
+        """
+        return self.get(base_url).send(prepared, proxies=proxies, timeout=timeout)
+
+    def close(self):
+        """
+        关闭所有会话并释放连接
+        """
+        with self._lock:
+            for session, _ in self._sessions.values():
+                try:
+                    session.close()
+                except Exception:
+                    pass
+            self._sessions.clear()
+            self._warmed.clear()
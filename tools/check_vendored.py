@@ -0,0 +1,47 @@
+"""
+检查 mteam比赛通知 随插件分发的公共组件副本是否与 Plugins/mteamapi 一致，
+有文件不同或缺失时列出并以非零状态退出：
+
+    python tools/check_vendored.py
+"""
+
+import filecmp
+import sys
+from pathlib import Path
+from typing import List
+
+ROOT = Path(__file__).resolve().parent.parent
+SOURCE = ROOT / "Plugins" / "mteamapi"
+# 各副本目录，__init__.py 只导出副本包含的模块，不参与比较
+COPIES = [ROOT / "plugins.v2" / "mteamnotify" / "mteamapi"]
+
+
+def check(copy: Path) -> List[str]:
+    """
+    副本中与源文件不一致或源文件已不存在的模块
+    """
+    problems = []
+    for path in sorted(copy.glob("*.py")):
+        if path.name == "__init__.py":
+            continue
+        source = SOURCE / path.name
+        if not source.exists():
+            problems.append(f"{path.relative_to(ROOT)}：Plugins/mteamapi 中已没有该模块")
+        elif not filecmp.cmp(source, path, shallow=False):
+            problems.append(f"{path.relative_to(ROOT)}：与 {source.relative_to(ROOT)} 不一致")
+    return problems
+
+
+def main() -> int:
+    problems = [problem for copy in COPIES for problem in check(copy)]
+    for problem in problems:
+        print(problem)
+    if problems:
+        print(f"{len(problems)} 个副本文件需要从 Plugins/mteamapi 重新复制")
+        return 1
+    print("公共组件副本与 Plugins/mteamapi 一致")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())